@@ -1,34 +1,75 @@
 """The Reaper component."""
 from __future__ import annotations
 
+import asyncio
+from dataclasses import replace
 from datetime import timedelta
 import logging
+import math
+from time import monotonic
 from typing import Any, Final
 
-from aiohttp import ClientSession
-from aiohttp.client_exceptions import ClientConnectorError
+from aiohttp import ClientConnectionError, ClientError, ClientSession
 import async_timeout
-from reaperdaw import Reaper, ReaperError
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
+from .api import ReaperClient, ReaperError
+from .breaker import ReaperCircuitBreaker
+from .commands import ReaperCommandQueue
 from .const import (
     CONF_HOSTNAME,
+    CONF_INSTRUMENTATION,
+    CONF_METER_INTERVAL,
+    CONF_OSC_PORT,
     CONF_PASSWORD,
+    CONF_POLLING_PROFILE,
     CONF_PORT,
+    CONF_TRACK_ENTITIES,
     CONF_UPDATE_INTERVAL,
     CONF_USERNAME,
+    DATA_FLEET,
+    DEFAULT_INSTRUMENTATION,
+    DEFAULT_METER_INTERVAL,
+    DEFAULT_OSC_PORT,
+    DEFAULT_POLLING_PROFILE,
     DEFAULT_PORT,
+    DEFAULT_TRACK_ENTITIES,
     DEFAULT_UPDATE_INTERVAL,
     DOMAIN,
+    PLAY_STATE_STOPPED,
+    POLLING_PROFILE_FIXED,
 )
+from .fleet import ReaperFleet
+from .instrumentation import ReaperInstrumentation
+from .meters import ReaperMeterMonitor
+from .models import (
+    ReaperMarkerIndex,
+    ReaperSnapshot,
+    ReaperTrackTable,
+    ReaperTransport,
+)
+from .osc import PUSH_LIVE_WINDOW, OscMessage, ReaperOscListener, apply_messages
+from .polling import ROLLING_PLAY_STATES, ReaperPollingPolicy
+from .scenes import SCENE_STORAGE_VERSION, ReaperScenes
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: Final[list[str]] = ["sensor", "switch", "media_player"]
+PLATFORMS: Final[list[str]] = ["sensor", "switch", "media_player", "number"]
+
+# Seconds to wait after the last command before confirming its result
+RECONCILE_COOLDOWN: Final = 0.5
+
+SNAPSHOT_STORAGE_VERSION: Final = 1
+# Seconds to collect snapshots before the last one is written to disk
+SNAPSHOT_SAVE_DELAY: Final = 60
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -37,19 +78,52 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     port = entry.data[CONF_PORT]
     username = entry.data[CONF_USERNAME]
     password = entry.data[CONF_PASSWORD]
-    update_interval = entry.data[CONF_UPDATE_INTERVAL]
-    websession = async_get_clientsession(hass)
+    update_interval = entry.options.get(
+        CONF_UPDATE_INTERVAL, entry.data[CONF_UPDATE_INTERVAL]
+    )
+    polling_profile = entry.options.get(
+        CONF_POLLING_PROFILE,
+        entry.data.get(CONF_POLLING_PROFILE, DEFAULT_POLLING_PROFILE),
+    )
+    track_entities = entry.options.get(CONF_TRACK_ENTITIES, DEFAULT_TRACK_ENTITIES)
+    meter_interval = entry.options.get(CONF_METER_INTERVAL, DEFAULT_METER_INTERVAL)
+    instrumentation = entry.options.get(CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION)
+    osc_port = entry.options.get(CONF_OSC_PORT, DEFAULT_OSC_PORT)
+    if (fleet := hass.data.get(DATA_FLEET)) is None:
+        fleet = hass.data[DATA_FLEET] = ReaperFleet()
 
     coordinator = ReaperDataUpdateCoordinator(
         hass,
-        websession,
+        async_create_clientsession(hass),
         hostname,
         port,
         username,
         password,
         update_interval,
+        polling_profile,
+        track_entities,
+        meter_interval,
+        fleet,
+        instrumentation,
+        _snapshot_store(hass, entry),
+        osc_port,
+        ReaperScenes(_scene_store(hass, entry)),
     )
-    await coordinator.async_config_entry_first_refresh()
+    if await coordinator.async_restore():
+        # Entities start from the last known snapshot and the host is polled
+        # in the background, so setup never waits for the network
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} {hostname} first refresh"
+        )
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await _async_close_coordinator(hass, coordinator)
+            raise
+    if coordinator.meters is not None:
+        coordinator.meters.async_start()
+    await coordinator.async_start_push()
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
@@ -59,20 +133,69 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             hass.config_entries.async_forward_entry_setup(entry, component)
         )
 
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    return True
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate a config entry from an older version."""
+    if entry.version == 1:
+        data = {**entry.data}
+        if (
+            CONF_POLLING_PROFILE not in data
+            and CONF_POLLING_PROFILE not in entry.options
+        ):
+            # Entries from before polling profiles keep polling at the update
+            # interval they were set up with
+            data[CONF_POLLING_PROFILE] = POLLING_PROFILE_FIXED
+        hass.config_entries.async_update_entry(entry, data=data, version=2)
+        _LOGGER.debug("Migrated %s to version 2", entry.title)
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok: bool = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await _async_close_coordinator(hass, coordinator)
 
     return unload_ok
 
 
-class ReaperDataUpdateCoordinator(DataUpdateCoordinator):
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored snapshot and scenes of a deleted config entry."""
+    await _snapshot_store(hass, entry).async_remove()
+    await _scene_store(hass, entry).async_remove()
+
+
+def _snapshot_store(hass: HomeAssistant, entry: ConfigEntry) -> Store[dict[str, Any]]:
+    return Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+
+
+def _scene_store(hass: HomeAssistant, entry: ConfigEntry) -> Store[dict[str, Any]]:
+    return Store(hass, SCENE_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.scenes")
+
+
+async def _async_close_coordinator(
+    hass: HomeAssistant, coordinator: ReaperDataUpdateCoordinator
+) -> None:
+    """Stop a host's coordinator and take it off the fleet schedule."""
+    await coordinator.async_shutdown()
+    if coordinator.fleet is not None and coordinator.fleet.async_unregister(
+        coordinator
+    ):
+        hass.data.pop(DATA_FLEET)
+
+
+class ReaperDataUpdateCoordinator(DataUpdateCoordinator[ReaperSnapshot]):
     """Class to manage fetching Reaper data API."""
 
     def __init__(  # pylint: disable=R0913
@@ -84,25 +207,598 @@ class ReaperDataUpdateCoordinator(DataUpdateCoordinator):
         username: str = "",
         password: str = "",
         update_interval: int = DEFAULT_UPDATE_INTERVAL,
+        polling_profile: str = DEFAULT_POLLING_PROFILE,
+        track_entities: bool = DEFAULT_TRACK_ENTITIES,
+        meter_interval: float = DEFAULT_METER_INTERVAL,
+        fleet: ReaperFleet | None = None,
+        instrumentation: bool = DEFAULT_INSTRUMENTATION,
+        store: Store[dict[str, Any]] | None = None,
+        osc_port: int = DEFAULT_OSC_PORT,
+        scenes: ReaperScenes | None = None,
     ) -> None:
         """Initialize."""
         self.hostname = hostname
         self.port = port
-        self.update_interval = update_interval
-        self.reaperdaw = Reaper(session, hostname, port, username, password)
+        self.track_entities = track_entities
+        self.fleet = fleet
+        self.session = session
+        self._store = store
+        self.scenes = scenes
+        self.device_info = DeviceInfo(
+            identifiers={(DOMAIN, hostname)},
+            name=hostname,
+            manufacturer="Cockos Reaper",
+            configuration_url=f"http://{hostname}:{port}",
+        )
+        self.client = ReaperClient(session, hostname, port, username, password)
+        self.instrumentation: ReaperInstrumentation | None = None
+        if instrumentation:
+            self.instrumentation = ReaperInstrumentation()
+            self.client.instrumentation = self.instrumentation
+        self.polling = ReaperPollingPolicy(polling_profile, update_interval)
+        self.push: ReaperOscListener | None = None
+        self._push_check: asyncio.TimerHandle | None = None
+        if osc_port:
+            self.push = ReaperOscListener(
+                hass, hostname, osc_port, self._async_push_received
+            )
+        self.suppressed_writes = 0
+        self.coalesced_refreshes = 0
+        self._fetch: asyncio.Task[ReaperSnapshot] | None = None
+        self._failures = 0
+        self._scheduled_interval: timedelta | None = None
+        self._notified_data: ReaperSnapshot | None = None
+        self._notified_success = True
+        self._optimistic: dict[str, Any] = {}
+        self._optimistic_pending = 0
+        self._optimistic_sent_at = -math.inf
+        self._tracks_fetched_at = -math.inf
+        self._tracks_stale = True
+        self._markers_stale = True
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=update_interval),
+            update_interval=self.polling.interval(None),
+        )
+
+        self.commands = ReaperCommandQueue(hass, self._async_send_chain)
+        self.breaker = ReaperCircuitBreaker(
+            hass, self.client.async_probe, self._async_breaker_changed
+        )
+        if fleet is not None:
+            fleet.async_register(self)
+        self.meters: ReaperMeterMonitor | None = None
+        if track_entities:
+            self.meters = ReaperMeterMonitor(
+                hass,
+                self._async_sample_meters,
+                self.async_notify_listeners,
+                meter_interval,
+            )
+        self._reconcile = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=RECONCILE_COOLDOWN,
+            immediate=False,
+            function=self.async_refresh,
+        )
+
+    async def async_restore(self) -> bool:
+        """Take the last snapshot stored before a restart, if there is one."""
+        if self._store is None or (data := await self._store.async_load()) is None:
+            return False
+        try:
+            self.data = ReaperSnapshot.from_dict(data)
+        except (KeyError, TypeError, ValueError) as error:
+            _LOGGER.debug("Ignoring stored snapshot of %s: %s", self.hostname, error)
+            return False
+        self.update_interval = self.polling.interval(self.data.play_state)
+        return True
+
+    async def async_start_push(self) -> None:
+        """Listen for OSC pushes, or keep polling if the port cannot be bound."""
+        if self.push is None:
+            return
+        try:
+            await self.push.async_start()
+        except OSError as error:
+            _LOGGER.warning(
+                "Cannot listen for OSC on port %s, polling %s instead: %s",
+                self.push.port,
+                self.hostname,
+                error,
+            )
+            self.push = None
+
+    @property
+    def pushed(self) -> bool:
+        """Return if the host pushes its state, so that polls can be rare."""
+        return self.push is not None and self.push.live(monotonic())
+
+    @callback
+    def _async_check_push(self) -> None:
+        """Poll at the profile interval again once the host stops pushing."""
+        self._push_check = None
+        if self.push is None or self.push.received_at is None:
+            return
+        if self.pushed:
+            self._push_check = self.hass.loop.call_later(
+                self.push.received_at + PUSH_LIVE_WINDOW - monotonic(),
+                self._async_check_push,
+            )
+            return
+        _LOGGER.debug("%s stopped pushing, polling it again", self.hostname)
+        if self.data is not None:
+            self.async_transport_changed(self.data.play_state)
+
+    @callback
+    def _async_push_received(self, messages: list[OscMessage]) -> None:
+        """Apply pushed messages and notify the listeners of what they changed."""
+        if self._push_check is None:
+            self._push_check = self.hass.loop.call_later(
+                PUSH_LIVE_WINDOW, self._async_check_push
+            )
+        if self.data is None:
+            return
+        previous = self.data
+        snapshot, resync = apply_messages(previous, messages)
+        if resync:
+            # Tracks were added, removed or renamed
+            self.async_invalidate_tracks()
+            self.hass.async_create_task(self.async_request_refresh())
+        if (
+            snapshot.play_state == PLAY_STATE_STOPPED
+            and previous.play_state != PLAY_STATE_STOPPED
+        ):
+            # Like a poll that sees the transport stop, without waiting for
+            # the next sweep
+            self._markers_stale = True
+            if self._markers_wanted():
+                self.hass.async_create_task(self.async_request_refresh())
+        self.async_transport_changed(snapshot.play_state)
+        if snapshot is not previous:
+            self.data = snapshot
+            self.async_update_listeners()
+
+    async def async_send_command(self, command: str, priority: bool = False) -> None:
+        """Send a command through the coalescing command queue.
+
+        Transport commands should set priority so that they are not held
+        back by queued bulk actions. Track commands get the track table
+        refetched with the next poll. Commands fail right away while the
+        host is unreachable.
+        """
+        if not self.breaker.closed:
+            raise ReaperError("unreachable", f"{self.hostname} is unreachable")
+        if "TRACK/" in command:
+            self.async_invalidate_tracks()
+        await self.commands.async_send(command, priority)
+
+    async def async_send_commands(self, commands: list[str]) -> None:
+        """Send bulk commands together, as one chain unless it gets too long."""
+        if not self.breaker.closed:
+            raise ReaperError("unreachable", f"{self.hostname} is unreachable")
+        if any("TRACK/" in command for command in commands):
+            self.async_invalidate_tracks()
+        await asyncio.gather(
+            *(self.commands.async_send(command) for command in commands)
+        )
+
+    async def _async_send_chain(self, command: str) -> str:
+        """Send a command chain, recording its round-trip time and failures."""
+        started = monotonic()
+        try:
+            response = await self.client.async_send_command(command)
+        except (ClientConnectionError, asyncio.TimeoutError):
+            self.breaker.async_record_failure()
+            raise
+        finally:
+            if self.instrumentation is not None:
+                self.instrumentation.record_command(command, monotonic() - started)
+        self.breaker.async_record_success()
+        return response
+
+    async def _async_sample_meters(self) -> dict[str, int] | None:
+        """Fetch the meter peaks of the tracks with a meter entity, by track key.
+
+        Meters only move while the transport rolls, and nothing is sampled
+        while the host is unreachable. Only the range of tracks whose meters
+        are rendered is fetched. A sample of the whole table also serves as
+        the track tier once that is due, so polls skip the track table while
+        meters run without every sample replacing the snapshot.
+        """
+        if (
+            not self.breaker.closed
+            or self.data is None
+            or self.data.play_state not in ROLLING_PLAY_STATES
+        ):
+            return None
+        keys = self.data.track_keys
+        if not (indexes := self._metered_tracks(keys)):
+            return None
+        first, last = indexes[0], indexes[-1]
+        tracks = await self.client.async_get_tracks(first, last)
+        if (
+            first == 0
+            and last == len(keys) - 1
+            and self.polling.tracks_due(self._tracks_fetched_at, monotonic())
+        ):
+            self._async_apply_tracks(tracks)
+        if self.data is None or self.data.track_keys != keys:
+            return None
+        names = self.data.tracks.name
+        return {
+            keys[index]: peak
+            for index, name, peak in zip(
+                tracks.index, tracks.name, tracks.last_meter_peak
+            )
+            if index < len(keys) and names[index] == name
+        }
+
+    def _metered_tracks(self, keys: tuple[str, ...]) -> list[int]:
+        """Return the indexes of the tracks whose meters a listener renders."""
+        metered = {
+            key
+            for context in self.async_contexts()
+            for key in context
+            if key.endswith("/meter")
+        }
+        return [
+            index for index, key in enumerate(keys) if f"track/{key}/meter" in metered
+        ]
+
+    @callback
+    def _async_breaker_changed(self, state: str) -> None:
+        """Refresh as soon as the host is back, and update the breaker sensor."""
+        if self.breaker.closed:
+            self._failures = 0
+            self.hass.async_create_task(self.async_request_refresh())
+        self.async_notify_listeners(frozenset({"breaker"}))
+
+    @callback
+    def async_invalidate_tracks(self) -> None:
+        """Fetch the track table with the next poll, e.g. after a track command."""
+        self._tracks_stale = True
+
+    @callback
+    def async_invalidate_project(self) -> None:
+        """Fetch the track table and markers with the next poll.
+
+        Actions, undo and redo can change anything in the project.
+        """
+        self._tracks_stale = True
+        self._markers_stale = True
+
+    async def async_get_markers(self) -> ReaperMarkerIndex:
+        """Return the markers and regions, fetching them if they may be stale."""
+        if self.data is None or self._markers_stale:
+            if not self.breaker.closed:
+                raise ReaperError("unreachable", f"{self.hostname} is unreachable")
+            markers = await self.client.async_get_markers()
+            self._markers_stale = False
+            if self.data is None:
+                return markers
+            self.data = self.data.with_markers(markers)
+            self.async_update_listeners()
+        return self.data.markers
+
+    async def async_get_tracks(self) -> ReaperTrackTable:
+        """Fetch the track table now, e.g. to diff against it before a recall."""
+        if not self.breaker.closed:
+            raise ReaperError("unreachable", f"{self.hostname} is unreachable")
+        tracks = await self.client.async_get_tracks()
+        self._async_apply_tracks(tracks)
+        return tracks
+
+    @callback
+    def _async_apply_tracks(self, tracks: ReaperTrackTable) -> None:
+        """Take a freshly fetched track table into the snapshot."""
+        self._tracks_fetched_at = monotonic()
+        if self.data is not None:
+            snapshot = self.data.with_tracks(tracks)
+            if snapshot.track_keys != self.data.track_keys:
+                self._markers_stale = True
+            self.data = snapshot
+            self.async_update_listeners()
+
+    def _markers_wanted(self) -> bool:
+        """Return if any listener renders the markers."""
+        return any("markers" in context for context in self.async_contexts())
+
+    async def async_send_optimistic(
+        self, command: str, priority: bool = False, **changes: Any
+    ) -> None:
+        """Send a command and show its expected result until REAPER confirms it.
+
+        The changes are applied to the current snapshot before the command is
+        sent, and rolled back if it fails. A single refresh is scheduled once
+        commands stop arriving. That refresh replaces the optimistic values,
+        which rolls them back if REAPER disagrees.
+        """
+        previous = self.data
+        if previous is not None:
+            self._optimistic.update(changes)
+            self._optimistic_pending += 1
+            self._async_apply(_with_changes(previous, changes))
+        try:
+            await self.async_send_command(command, priority)
+        except (ReaperError, ClientError, asyncio.TimeoutError):
+            if previous is not None:
+                self._async_roll_back(previous, changes)
+            raise
+        finally:
+            if previous is not None:
+                self._optimistic_pending -= 1
+                self._optimistic_sent_at = monotonic()
+
+        await self.async_request_reconcile()
+
+    @callback
+    def _async_roll_back(
+        self, previous: ReaperSnapshot, changes: dict[str, Any]
+    ) -> None:
+        """Restore the values of failed changes that no later change replaced."""
+        rollback = {}
+        for key, value in changes.items():
+            if key in self._optimistic and self._optimistic[key] == value:
+                del self._optimistic[key]
+                rollback[key] = getattr(previous, key)
+        if rollback and self.data is not None:
+            self._async_apply(_with_changes(self.data, rollback))
+
+    @callback
+    def _async_apply(self, snapshot: ReaperSnapshot) -> None:
+        """Replace the snapshot and notify the listeners of what changed."""
+        if self.data is None or snapshot.play_state != self.data.play_state:
+            self.async_transport_changed(snapshot.play_state)
+        self.data = snapshot
+        self.async_update_listeners()
+
+    async def async_request_reconcile(self) -> None:
+        """Refresh once the current burst of commands is over."""
+        await self._reconcile.async_call()
+
+    async def async_shutdown(self) -> None:
+        """Cancel any scheduled refresh."""
+        await super().async_shutdown()
+        self._reconcile.async_shutdown()
+        self.commands.async_shutdown()
+        self.breaker.async_stop()
+        if self.meters is not None:
+            self.meters.async_stop()
+        if self.push is not None:
+            self.push.async_stop()
+        if self._push_check is not None:
+            self._push_check.cancel()
+            self._push_check = None
+
+    @callback
+    def async_transport_changed(self, play_state: str) -> None:
+        """Switch to the poll interval of a transport state set by a command or push."""
+        interval = self.polling.interval(play_state, self.pushed)
+        if interval == self.update_interval:
+            return
+
+        self.update_interval = interval
+        if self._listeners:
+            self._schedule_refresh()
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next poll at this host's phase of the fleet schedule.
+
+        Only steady-state polls keep the phase. The first poll after the
+        interval changed, e.g. when the transport starts rolling, comes
+        within the new interval, so the host switches intervals right away.
+        """
+        interval, self._scheduled_interval = (
+            self._scheduled_interval,
+            self.update_interval,
         )
+        if (
+            self.fleet is None
+            or self.update_interval is None
+            or (self.config_entry and self.config_entry.pref_disable_polling)
+        ):
+            super()._schedule_refresh()
+            return
+
+        self._async_unsub_refresh()
+        loop = self.hass.loop
+        seconds = self.update_interval.total_seconds()
+        if self.update_interval == interval:
+            next_refresh = self.fleet.next_refresh(self, loop.time(), seconds)
+        else:
+            next_refresh = loop.time() + seconds
+        self._unsub_refresh = loop.call_at(
+            next_refresh, self.hass.async_run_hass_job, self._job
+        ).cancel
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the listeners whose snapshot keys changed since the last update.
+
+        Entities pass the snapshot keys they render as their coordinator
+        context. Listeners without a context are always notified, and every
+        listener is notified when availability changes.
+        """
+        changed: frozenset[str] | None
+        if (
+            self._notified_data is None
+            or self.last_update_success != self._notified_success
+        ):
+            changed = None
+        elif self.last_update_success and self.data is not None:
+            changed = self.data.changed_keys(self._notified_data)
+        else:
+            changed = frozenset()
+
+        self._notified_data = self.data
+        self._notified_success = self.last_update_success
+        self.async_notify_listeners(changed)
+
+    @callback
+    def async_notify_listeners(self, changed: frozenset[str] | None) -> None:
+        """Notify the listeners of some snapshot keys, or all for None."""
+        if self.instrumentation is not None:
+            self._async_notify_listeners_timed(changed)
+            return
+
+        suppressed = 0
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or not changed.isdisjoint(context):
+                update_callback()
+            else:
+                suppressed += 1
+
+        self.suppressed_writes = suppressed
+        if suppressed:
+            _LOGGER.debug("Suppressed %s unchanged state writes", suppressed)
+
+    @callback
+    def _async_notify_listeners_timed(self, changed: frozenset[str] | None) -> None:
+        """Notify listeners like `async_notify_listeners`, timed per platform."""
+        assert self.instrumentation is not None
+        suppressed = 0
+        platforms: dict[str, float] = {}
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or not changed.isdisjoint(context):
+                entity = getattr(update_callback, "__self__", None)
+                platform = getattr(entity, "platform", None)
+                domain = "coordinator" if platform is None else platform.domain
+                started = monotonic()
+                update_callback()
+                platforms[domain] = platforms.get(domain, 0.0) + monotonic() - started
+            else:
+                suppressed += 1
+
+        self.suppressed_writes = suppressed
+        self.instrumentation.record_fan_out(platforms, suppressed)
+        if suppressed:
+            _LOGGER.debug("Suppressed %s unchanged state writes", suppressed)
+
+    async def _async_update_data(self) -> ReaperSnapshot:
+        """Update data via the REAPER web interface.
+
+        Refreshes that start while a fetch is in flight, whether scheduled,
+        requested by an entity or reconciling a command, wait for that fetch
+        instead of sending a request of their own.
+        """
+        if self._fetch is None:
+            self._fetch = self.hass.async_create_task(self._async_fetch())
+            self._fetch.add_done_callback(self._async_fetch_done)
+        else:
+            self.coalesced_refreshes += 1
+        return await asyncio.shield(self._fetch)
+
+    @callback
+    def _async_fetch_done(self, task: asyncio.Task[ReaperSnapshot]) -> None:
+        self._fetch = None
+        if not task.cancelled():
+            # Retrieved here as well, in case every waiter was cancelled
+            task.exception()
+
+    async def _async_fetch(self) -> ReaperSnapshot:
+        """Fetch a snapshot, with the track table and markers when they are due.
+
+        Markers are an on-demand tier: they are only fetched while an entity
+        renders them, and only again once the project may have changed.
+        """
+        if not self.breaker.closed:
+            raise UpdateFailed(f"{self.hostname} is unreachable")
+
+        previous = self.data
+        now = monotonic()
+        fetch_tracks = (
+            previous is None
+            or self._tracks_stale
+            or self.polling.tracks_due(self._tracks_fetched_at, now)
+        )
+        fetch_markers = previous is None or (
+            self._markers_stale and self._markers_wanted()
+        )
+        self._tracks_stale = False
 
-    async def _async_update_data(self) -> str | Any:
-        """Update data via library."""
         try:
-            with async_timeout.timeout(10):
-                status = await self.reaperdaw.getStatus()
-                return status
-        except (ReaperError, ClientConnectorError) as error:
+            async with async_timeout.timeout(10):
+                started = monotonic()
+                snapshot = await self.client.async_get_status(
+                    None if fetch_tracks else previous.tracks,
+                    None if fetch_markers else previous.markers,
+                )
+                if (
+                    not fetch_tracks
+                    and snapshot.number_of_tracks != previous.number_of_tracks
+                ):
+                    # Tracks were added or removed since the last fetch
+                    fetch_tracks = True
+                    snapshot = snapshot.with_tracks(
+                        await self.client.async_get_tracks()
+                    )
+                if previous is not None and (
+                    snapshot.track_keys != previous.track_keys
+                    or (
+                        snapshot.play_state == PLAY_STATE_STOPPED
+                        and previous.play_state != PLAY_STATE_STOPPED
+                    )
+                ):
+                    # Another project was opened, or it could have been
+                    # edited while the transport was rolling
+                    self._markers_stale = True
+                if not fetch_markers and self._markers_stale and self._markers_wanted():
+                    fetch_markers = True
+                    snapshot = snapshot.with_markers(
+                        await self.client.async_get_markers()
+                    )
+        except (ReaperError, ClientError, asyncio.TimeoutError) as error:
+            if self.instrumentation is not None:
+                self.instrumentation.record_fetch(monotonic(), None)
+            if isinstance(error, (ClientConnectionError, asyncio.TimeoutError)):
+                self.breaker.async_record_failure()
+            self._failures += 1
+            self.update_interval = self.polling.backoff(self._failures)
+            self._tracks_stale = self._tracks_stale or fetch_tracks
             raise UpdateFailed(error) from error
+
+        if fetch_markers:
+            self._markers_stale = False
+        self._failures = 0
+        self.breaker.async_record_success()
+        finished = monotonic()
+        if self.fleet is not None:
+            self.fleet.async_record_fetch(finished, finished - started)
+        if self.instrumentation is not None:
+            self.instrumentation.record_fetch(finished, finished - started)
+        if fetch_tracks:
+            self._tracks_fetched_at = now
+        if self._optimistic and (
+            self._optimistic_pending or started < self._optimistic_sent_at
+        ):
+            # REAPER may have answered before it ran the commands
+            snapshot = _with_changes(snapshot, self._optimistic)
+        else:
+            for key, value in self._optimistic.items():
+                if getattr(snapshot, key) != value:
+                    _LOGGER.debug(
+                        "REAPER reports %s=%s, rolling back optimistic %s",
+                        key,
+                        getattr(snapshot, key),
+                        value,
+                    )
+            self._optimistic.clear()
+        self.update_interval = self.polling.interval(snapshot.play_state, self.pushed)
+        if self._store is not None:
+            self._store.async_delay_save(snapshot.as_dict, SNAPSHOT_SAVE_DELAY)
+        return snapshot
+
+
+def _with_changes(snapshot: ReaperSnapshot, changes: dict[str, Any]) -> ReaperSnapshot:
+    """Return a snapshot with changes, mirrored into its transport section."""
+    transport = {
+        key: value for key, value in changes.items() if key in ReaperTransport.__slots__
+    }
+    if transport:
+        changes = {**changes, "transport": replace(snapshot.transport, **transport)}
+    return replace(snapshot, **changes)
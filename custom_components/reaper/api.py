@@ -0,0 +1,178 @@
+"""Client for the REAPER web interface."""
+from __future__ import annotations
+
+import logging
+from time import monotonic
+from typing import TYPE_CHECKING, Final
+
+from aiohttp import BasicAuth, ClientSession, ClientTimeout, hdrs
+from yarl import URL
+
+from .const import CMD_METRONOME, CMD_REPEAT
+from .models import (
+    ReaperMarkerIndex,
+    ReaperSnapshot,
+    ReaperStatusParser,
+    ReaperTrackTable,
+)
+
+if TYPE_CHECKING:
+    from .instrumentation import ReaperInstrumentation
+
+_LOGGER = logging.getLogger(__name__)
+
+# Small sections that change all the time
+TRANSPORT_COMMAND: Final = (
+    f"NTRACK;TRANSPORT;BEATPOS;GET/{CMD_METRONOME};GET/{CMD_REPEAT}"
+)
+# Grow with the project and rarely change
+TRACKS_COMMAND: Final = "TRACK"
+MARKERS_COMMAND: Final = "MARKER;REGION"
+STATUS_COMMAND: Final = f"{TRANSPORT_COMMAND};{TRACKS_COMMAND};{MARKERS_COMMAND}"
+# Smallest request that tells if the web interface is up
+PROBE_COMMAND: Final = "NTRACK"
+
+# Seconds to wait for a connection to a host, much less than for a response,
+# so that a host which is off fails fast
+CONNECT_TIMEOUT: Final = 2
+REQUEST_TIMEOUT: Final = ClientTimeout(total=10, sock_connect=CONNECT_TIMEOUT)
+
+
+class ReaperError(Exception):
+    """Raised when a request to the REAPER web interface failed."""
+
+    def __init__(self, status_code: int | str, status: str) -> None:
+        """Initialize."""
+        super().__init__(status_code, status)
+        self.status_code = status_code
+        self.status = status
+
+
+class ReaperClient:
+    """Talk to the `/_/` endpoint of the REAPER web interface."""
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        session: ClientSession,
+        hostname: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+    ) -> None:
+        """Initialize."""
+        self._session = session
+        self._base_url = f"http://{hostname}:{port}/_/"
+        # Built once, instead of encoding credentials and parsing URLs on
+        # every poll
+        self._headers = {hdrs.ACCEPT: "text/plain"}
+        if username:
+            self._headers[hdrs.AUTHORIZATION] = BasicAuth(username, password).encode()
+        self._urls = {
+            command: URL(self._base_url + command)
+            for command in (
+                STATUS_COMMAND,
+                TRANSPORT_COMMAND,
+                f"{TRANSPORT_COMMAND};{TRACKS_COMMAND}",
+                f"{TRANSPORT_COMMAND};{MARKERS_COMMAND}",
+                TRACKS_COMMAND,
+                MARKERS_COMMAND,
+                PROBE_COMMAND,
+            )
+        }
+        self.instrumentation: ReaperInstrumentation | None = None
+
+    async def async_send_command(self, command: str) -> str:
+        """Send one or more `;` separated commands and return the response."""
+        url = self._base_url + command
+        _LOGGER.debug("Sending request to: %s", url)
+        async with self._session.get(
+            url, headers=self._headers, timeout=REQUEST_TIMEOUT
+        ) as response:
+            text = await response.text()
+            if response.status != 200:
+                raise ReaperError(response.status, text)
+            return text
+
+    async def async_get_status(
+        self,
+        tracks: ReaperTrackTable | None = None,
+        markers: ReaperMarkerIndex | None = None,
+    ) -> ReaperSnapshot:
+        """Fetch the status in one request and parse it as it streams.
+
+        Given the tracks or markers of an earlier snapshot, those sections
+        are not fetched and the snapshot keeps them.
+        """
+        command = TRANSPORT_COMMAND
+        if tracks is None:
+            command += f";{TRACKS_COMMAND}"
+        if markers is None:
+            command += f";{MARKERS_COMMAND}"
+        parser = await self._async_parse(command)
+        try:
+            return parser.snapshot(tracks, markers)
+        except ValueError as error:
+            raise ReaperError("invalid_response", str(error)) from error
+
+    async def async_get_tracks(
+        self, first: int | None = None, last: int | None = None
+    ) -> ReaperTrackTable:
+        """Fetch only the track table, or the tracks from first to last.
+
+        A range, e.g. to sample meters, has the indexes of its tracks in
+        `index`. Its keys only tell tracks apart within the range.
+        """
+        command = TRACKS_COMMAND
+        if first is not None:
+            command += f"/{first}-{first if last is None else last}"
+        parser = await self._async_parse(command)
+        return parser.tracks()
+
+    async def async_get_markers(self) -> ReaperMarkerIndex:
+        """Fetch only the markers and regions."""
+        parser = await self._async_parse(MARKERS_COMMAND)
+        return parser.markers()
+
+    async def async_probe(self) -> None:
+        """Send the smallest request there is, to tell if the host is up."""
+        async with self._session.get(
+            self._urls[PROBE_COMMAND], headers=self._headers, timeout=REQUEST_TIMEOUT
+        ) as response:
+            if response.status != 200:
+                raise ReaperError(response.status, await response.text())
+
+    async def _async_parse(self, command: str) -> ReaperStatusParser:
+        """Send a command and feed its response to a parser as it streams.
+
+        Lines that cannot be parsed, e.g. of a truncated response, raise
+        ReaperError like any other bad response.
+        """
+        parser = ReaperStatusParser()
+        line = b""
+        async with self._session.get(
+            self._urls.get(command) or URL(self._base_url + command),
+            headers=self._headers,
+            timeout=REQUEST_TIMEOUT,
+        ) as response:
+            if response.status != 200:
+                raise ReaperError(response.status, await response.text())
+            try:
+                if (instrumentation := self.instrumentation) is None:
+                    async for line in response.content:
+                        parser.feed(line.decode())
+                    return parser
+
+                # Only the time spent in the parser counts, not waiting for lines
+                parse_time = 0.0
+                size = 0
+                async for line in response.content:
+                    started = monotonic()
+                    parser.feed(line.decode())
+                    parse_time += monotonic() - started
+                    size += len(line)
+            except (KeyError, IndexError, ValueError) as error:
+                raise ReaperError(
+                    "invalid_response", f"Cannot parse {line[:80]!r}: {error!r}"
+                ) from error
+        instrumentation.record_parse(parse_time, size)
+        return parser
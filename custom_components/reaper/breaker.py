@@ -0,0 +1,126 @@
+"""Circuit breaker for unreachable REAPER hosts."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import logging
+from typing import Awaitable, Callable, Final
+
+from aiohttp import ClientError
+import async_timeout
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .api import ReaperError
+
+_LOGGER = logging.getLogger(__name__)
+
+BREAKER_CLOSED: Final = "closed"
+BREAKER_OPEN: Final = "open"
+BREAKER_HALF_OPEN: Final = "half_open"
+BREAKER_STATES: Final = (BREAKER_CLOSED, BREAKER_OPEN, BREAKER_HALF_OPEN)
+
+# Consecutive connection failures that open the breaker
+FAILURE_THRESHOLD: Final = 2
+# Seconds between two probes of an unreachable host
+PROBE_INTERVAL: Final = 5
+# Seconds a probe may take
+PROBE_TIMEOUT: Final = 2
+
+
+class ReaperCircuitBreaker:
+    """Stop talking to a REAPER host that cannot be reached.
+
+    After `FAILURE_THRESHOLD` consecutive connection failures the breaker
+    opens: polls, meter samples and commands fail right away instead of
+    waiting out their timeouts. While open, the host is probed with a
+    single small request every `PROBE_INTERVAL` seconds, the breaker being
+    half-open during the probe. The first probe that gets any answer closes
+    the breaker again.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        probe: Callable[[], Awaitable[object]],
+        on_change: Callable[[str], None],
+        failure_threshold: int = FAILURE_THRESHOLD,
+        probe_interval: float = PROBE_INTERVAL,
+    ) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._probe = probe
+        self._on_change = on_change
+        self._failure_threshold = failure_threshold
+        self._probe_interval = probe_interval
+        self._failures = 0
+        self._unsubscribe: CALLBACK_TYPE | None = None
+        self.state = BREAKER_CLOSED
+
+    @property
+    def closed(self) -> bool:
+        """Return if requests may be sent to the host."""
+        return self.state == BREAKER_CLOSED
+
+    @callback
+    def async_record_success(self) -> None:
+        """Record a request that reached the host."""
+        self._failures = 0
+        if not self.closed:
+            self._async_close()
+
+    @callback
+    def async_record_failure(self) -> None:
+        """Record a request that could not connect or timed out."""
+        self._failures += 1
+        if self.closed and self._failures >= self._failure_threshold:
+            _LOGGER.debug(
+                "Opening circuit after %s failed requests, probing every %ss",
+                self._failures,
+                self._probe_interval,
+            )
+            self._async_set_state(BREAKER_OPEN)
+            self._unsubscribe = async_track_time_interval(
+                self._hass,
+                self._async_probe,
+                timedelta(seconds=self._probe_interval),
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop probing."""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    async def _async_probe(self, _now: object = None) -> None:
+        """Send the probe request, unless one is still in flight."""
+        if self.state != BREAKER_OPEN:
+            return
+        self._async_set_state(BREAKER_HALF_OPEN)
+        try:
+            async with async_timeout.timeout(PROBE_TIMEOUT):
+                await self._probe()
+        except ReaperError:
+            # The host answered, if only with an error status
+            pass
+        except (ClientError, asyncio.TimeoutError) as error:
+            _LOGGER.debug("Probe failed: %s", error)
+            if self.state == BREAKER_HALF_OPEN:
+                self._async_set_state(BREAKER_OPEN)
+            return
+        if not self.closed:
+            self._async_close()
+
+    @callback
+    def _async_close(self) -> None:
+        self.async_stop()
+        self._failures = 0
+        self._async_set_state(BREAKER_CLOSED)
+
+    @callback
+    def _async_set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            self._on_change(state)
@@ -0,0 +1,84 @@
+"""Transport clock for the Reaper integration."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Final
+
+from .models import ReaperSnapshot
+from .polling import ROLLING_PLAY_STATES
+
+# Seconds the reported position may be off the extrapolated one before the
+# published position is corrected
+DRIFT_THRESHOLD: Final = 0.5
+# Seconds of playback a tempo estimate spans at least, and BPM it has to
+# differ by to replace the published tempo. Positions pushed over OSC only
+# have a resolution of a hundredth of a beat, and arrive many times a second.
+TEMPO_SPAN: Final = 1.0
+TEMPO_TOLERANCE: Final = 1.0
+
+
+class ReaperTransportClock:
+    """Extrapolate the transport position between polls.
+
+    The published position is only moved when playback starts or stops, or
+    when the position REAPER reports drifts away from where it should be by
+    now. In between, consumers extrapolate from the last position and its
+    timestamp, so a moving timeline costs no state writes. The tempo is
+    estimated from how far the beat position moved over at least a second.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.position: float | None = None
+        self.beat_position: float | None = None
+        self.updated_at: datetime | None = None
+        self.bpm: float | None = None
+        self.rolling = False
+        self._last_sample: tuple[float, float] | None = None
+
+    def update(self, snapshot: ReaperSnapshot, now: datetime) -> bool:
+        """Take the position of a new snapshot, and return if it was published."""
+        position = snapshot.beatpos.position_seconds
+        beat_position = snapshot.beatpos.full_beat_position
+        rolling = snapshot.play_state in ROLLING_PLAY_STATES
+
+        bpm = self.bpm
+        if not rolling:
+            self._last_sample = None
+        elif self._last_sample is None or position < self._last_sample[0]:
+            self._last_sample = (position, beat_position)
+        elif position - self._last_sample[0] >= TEMPO_SPAN:
+            last_position, last_beat_position = self._last_sample
+            if beat_position > last_beat_position:
+                estimate = round(
+                    60
+                    * (beat_position - last_beat_position)
+                    / (position - last_position),
+                    1,
+                )
+                if bpm is None or abs(estimate - bpm) >= TEMPO_TOLERANCE:
+                    bpm = estimate
+            self._last_sample = (position, beat_position)
+
+        if (
+            rolling == self.rolling
+            and bpm == self.bpm
+            and (expected := self.expected_position(now)) is not None
+            and abs(expected - position) <= DRIFT_THRESHOLD
+        ):
+            return False
+
+        self.position = position
+        self.beat_position = beat_position
+        self.updated_at = now
+        self.bpm = bpm
+        self.rolling = rolling
+        return True
+
+    def expected_position(self, now: datetime) -> float | None:
+        """Return where the transport should be by now."""
+        if self.position is None or self.updated_at is None:
+            return None
+        if not self.rolling:
+            return self.position
+        return self.position + (now - self.updated_at).total_seconds()
@@ -0,0 +1,106 @@
+"""Command queue for the Reaper integration."""
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Final, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+
+# Seconds to collect commands before sending them as one request
+COMMAND_WINDOW: Final = 0.05
+# Longest command chain sent in one request, to keep URLs within limits
+MAX_CHAIN_LENGTH: Final = 2000
+
+_QueuedCommand = Tuple[str, "asyncio.Future[None]"]
+
+
+class ReaperCommandQueue:
+    """Chain commands issued within a short window into a single request.
+
+    The REAPER web interface runs every `;` separated command of a `/_/`
+    request in order. Bulk commands wait for the window to close so that a
+    macro of actions costs one round-trip. Priority commands are sent right
+    away, ahead of any bulk work still waiting. Each caller learns whether
+    the request that carried its command succeeded. The response of a chain
+    is not handed out, as it cannot be told apart per command.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        send: Callable[[str], Awaitable[str]],
+        window: float = COMMAND_WINDOW,
+    ) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._send = send
+        self._window = window
+        self._priority: list[_QueuedCommand] = []
+        self._bulk: list[_QueuedCommand] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._lock = asyncio.Lock()
+
+    async def async_send(self, command: str, priority: bool = False) -> None:
+        """Queue a command and wait until the request carrying it is answered."""
+        future: asyncio.Future[None] = self._hass.loop.create_future()
+
+        if priority:
+            self._priority.append((command, future))
+            self._hass.async_create_task(self._async_flush(include_bulk=False))
+        else:
+            self._bulk.append((command, future))
+            if self._timer is None:
+                self._timer = self._hass.loop.call_later(
+                    self._window, self._async_window_closed
+                )
+
+        await future
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Drop every queued command."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for _, future in self._priority + self._bulk:
+            if not future.done():
+                future.cancel()
+        self._priority.clear()
+        self._bulk.clear()
+
+    @callback
+    def _async_window_closed(self) -> None:
+        self._timer = None
+        self._hass.async_create_task(self._async_flush(include_bulk=True))
+
+    async def _async_flush(self, include_bulk: bool) -> None:
+        async with self._lock:
+            batch, self._priority = self._priority, []
+            if include_bulk:
+                batch.extend(self._bulk)
+                self._bulk = []
+
+            for chunk in _chunks(batch):
+                try:
+                    await self._send(";".join(command for command, _ in chunk))
+                except Exception as error:  # pylint: disable=broad-except
+                    for _, future in chunk:
+                        if not future.done():
+                            future.set_exception(error)
+                else:
+                    for _, future in chunk:
+                        if not future.done():
+                            future.set_result(None)
+
+
+def _chunks(batch: list[_QueuedCommand]) -> list[list[_QueuedCommand]]:
+    """Split queued commands into chains that fit in one request."""
+    chunks: list[list[_QueuedCommand]] = []
+    length = MAX_CHAIN_LENGTH
+    for item in batch:
+        if length + len(item[0]) + 1 > MAX_CHAIN_LENGTH:
+            chunks.append([])
+            length = 0
+        chunks[-1].append(item)
+        length += len(item[0]) + 1
+    return chunks
@@ -4,36 +4,143 @@ from __future__ import annotations
 import asyncio
 from typing import Any
 
-from aiohttp.client_exceptions import ClientConnectorError
+from aiohttp import ClientError
 import async_timeout
-from reaperdaw import Reaper, ReaperError
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
+from .api import ReaperClient, ReaperError
 from .const import (
     CONF_HOSTNAME,
+    CONF_INSTRUMENTATION,
+    CONF_METER_INTERVAL,
+    CONF_OSC_PORT,
     CONF_PASSWORD,
+    CONF_POLLING_PROFILE,
     CONF_PORT,
+    CONF_TRACK_ENTITIES,
     CONF_UPDATE_INTERVAL,
     CONF_USERNAME,
+    DEFAULT_INSTRUMENTATION,
+    DEFAULT_METER_INTERVAL,
+    DEFAULT_OSC_PORT,
+    DEFAULT_POLLING_PROFILE,
     DEFAULT_PORT,
+    DEFAULT_TRACK_ENTITIES,
     DEFAULT_UPDATE_INTERVAL,
     DOMAIN,
 )
+from .discovery import DiscoveredReaper, async_discover, scan_targets
+from .polling import POLLING_PROFILES
+
+CONF_SUBNET = "subnet"
+CONF_PORTS = "ports"
+CONF_HOST = "host"
+
+DEFAULT_SUBNET = "192.168.1.0/24"
 
 
 class ReaperFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
     """Config flow for Reaper."""
 
-    VERSION = 1
+    VERSION = 2
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._discovered: dict[str, DiscoveredReaper] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> ReaperOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return ReaperOptionsFlowHandler(config_entry)
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle a flow initialized by the user."""
+        if user_input is not None:
+            return await self.async_step_manual(user_input)
+        return self.async_show_menu(step_id="user", menu_options=["scan", "manual"])
+
+    async def async_step_scan(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Scan a subnet for REAPER web interfaces."""
+        errors = {}
+
+        if user_input is not None:
+            try:
+                ports = [int(port) for port in user_input[CONF_PORTS].split(",")]
+                targets = scan_targets(user_input[CONF_SUBNET], ports)
+            except ValueError:
+                errors["base"] = "invalid_subnet"
+            else:
+                configured = self._async_current_ids()
+                self._discovered = {
+                    f"{host.hostname}:{host.port}": host
+                    for host in await async_discover(targets)
+                    if host.hostname not in configured
+                }
+                if self._discovered:
+                    return await self.async_step_pick()
+                errors["base"] = "no_hosts_found"
+
+        return self.async_show_form(
+            step_id="scan",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_SUBNET, default=DEFAULT_SUBNET): str,
+                    vol.Required(CONF_PORTS, default=str(DEFAULT_PORT)): str,
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_pick(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Add one of the REAPER hosts found by a scan."""
+        if user_input is not None:
+            host = self._discovered[user_input[CONF_HOST]]
+            await self.async_set_unique_id(host.hostname)
+            self._abort_if_unique_id_configured()
+            return self.async_create_entry(
+                title=host.hostname,
+                data={
+                    CONF_HOSTNAME: host.hostname,
+                    CONF_PORT: host.port,
+                    CONF_USERNAME: "",
+                    CONF_PASSWORD: "",
+                    CONF_UPDATE_INTERVAL: DEFAULT_UPDATE_INTERVAL,
+                    CONF_POLLING_PROFILE: DEFAULT_POLLING_PROFILE,
+                },
+            )
+
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_HOST): vol.In(
+                        {
+                            key: f"{key} ({host.number_of_tracks} tracks)"
+                            for key, host in self._discovered.items()
+                        }
+                    )
+                }
+            ),
+        )
+
+    async def async_step_manual(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Add a REAPER host by its address."""
         errors = {}
 
         websession = async_get_clientsession(self.hass)
@@ -43,16 +150,16 @@ class ReaperFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):  # type: igno
             self._abort_if_unique_id_configured()
 
             try:
-                reaperdaw = Reaper(
+                client = ReaperClient(
                     websession,
                     user_input[CONF_HOSTNAME],
                     user_input[CONF_PORT],
                     user_input[CONF_USERNAME],
                     user_input[CONF_PASSWORD],
                 )
-                with async_timeout.timeout(10):
-                    await reaperdaw.getStatus()
-            except (ReaperError, ClientConnectorError, asyncio.TimeoutError):
+                async with async_timeout.timeout(10):
+                    await client.async_get_status()
+            except (ReaperError, ClientError, asyncio.TimeoutError):
                 errors["base"] = "cannot_connect"
             else:
                 return self.async_create_entry(
@@ -63,11 +170,14 @@ class ReaperFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):  # type: igno
                         CONF_USERNAME: user_input[CONF_USERNAME],
                         CONF_PASSWORD: user_input[CONF_PASSWORD],
                         CONF_UPDATE_INTERVAL: user_input[CONF_UPDATE_INTERVAL],
+                        CONF_POLLING_PROFILE: user_input.get(
+                            CONF_POLLING_PROFILE, DEFAULT_POLLING_PROFILE
+                        ),
                     },
                 )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=vol.Schema(
                 {
                     vol.Required(CONF_HOSTNAME): str,
@@ -77,7 +187,71 @@ class ReaperFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):  # type: igno
                     vol.Required(
                         CONF_UPDATE_INTERVAL, default=DEFAULT_UPDATE_INTERVAL
                     ): int,
+                    vol.Required(
+                        CONF_POLLING_PROFILE, default=DEFAULT_POLLING_PROFILE
+                    ): vol.In(list(POLLING_PROFILES)),
                 }
             ),
             errors=errors,
         )
+
+
+class ReaperOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for Reaper."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the polling and entity options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        data = self.config_entry.data
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_POLLING_PROFILE,
+                        default=options.get(
+                            CONF_POLLING_PROFILE,
+                            data.get(CONF_POLLING_PROFILE, DEFAULT_POLLING_PROFILE),
+                        ),
+                    ): vol.In(list(POLLING_PROFILES)),
+                    vol.Required(
+                        CONF_UPDATE_INTERVAL,
+                        default=options.get(
+                            CONF_UPDATE_INTERVAL, data[CONF_UPDATE_INTERVAL]
+                        ),
+                    ): int,
+                    vol.Required(
+                        CONF_TRACK_ENTITIES,
+                        default=options.get(
+                            CONF_TRACK_ENTITIES, DEFAULT_TRACK_ENTITIES
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_METER_INTERVAL,
+                        default=options.get(
+                            CONF_METER_INTERVAL, DEFAULT_METER_INTERVAL
+                        ),
+                    ): vol.All(int, vol.Range(min=1)),
+                    vol.Required(
+                        CONF_INSTRUMENTATION,
+                        default=options.get(
+                            CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_OSC_PORT,
+                        default=options.get(CONF_OSC_PORT, DEFAULT_OSC_PORT),
+                    ): vol.All(int, vol.Range(min=0, max=65535)),
+                }
+            ),
+        )
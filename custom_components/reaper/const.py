@@ -7,18 +7,71 @@ from homeassistant.components.sensor import SensorEntityDescription
 
 ATTRIBUTION: Final = "Data provided by Cockos Inc REAPER web interface."
 ATTR_ID = "action_id"
+ATTR_TRACKS = "tracks"
 
 CONF_HOSTNAME: Final = "hostname"
 CONF_PORT: Final = "port"
 CONF_USERNAME: Final = "username"
 CONF_PASSWORD: Final = "password"
 CONF_UPDATE_INTERVAL = "update_interval"
+CONF_POLLING_PROFILE: Final = "polling_profile"
+CONF_TRACK_ENTITIES: Final = "track_entities"
+CONF_METER_INTERVAL: Final = "meter_interval"
+CONF_INSTRUMENTATION: Final = "instrumentation"
+CONF_OSC_PORT: Final = "osc_port"
+
+POLLING_PROFILE_RESPONSIVE: Final = "responsive"
+POLLING_PROFILE_BALANCED: Final = "balanced"
+POLLING_PROFILE_ECO: Final = "eco"
+POLLING_PROFILE_FIXED: Final = "fixed"
 
 DEFAULT_PORT = 8080
 DEFAULT_UPDATE_INTERVAL = 30
+DEFAULT_POLLING_PROFILE = POLLING_PROFILE_BALANCED
+DEFAULT_TRACK_ENTITIES = False
+DEFAULT_METER_INTERVAL = 10
+DEFAULT_INSTRUMENTATION = False
+DEFAULT_OSC_PORT = 0  # Push updates disabled
 DEFAULT_ACTION_ID = "1016"  # Transform: Play/Stop
 
 DOMAIN: Final = "reaper"
+DATA_FLEET: Final = f"{DOMAIN}_fleet"
+
+# Tracks beyond this index get no per-track entities
+MAX_TRACK_ENTITIES: Final = 1024
+
+PLAY_STATE_STOPPED: Final = "stopped"
+PLAY_STATE_PLAYING: Final = "playing"
+PLAY_STATE_PAUSED: Final = "paused"
+PLAY_STATE_RECORDING: Final = "recording"
+PLAY_STATE_RECORD_PAUSED: Final = "recordpaused"
+
+# REAPER action command IDs
+CMD_PLAY: Final = "1007"
+CMD_PAUSE: Final = "1008"
+CMD_STOP: Final = "1016"
+CMD_RECORD: Final = "1013"
+CMD_REWIND: Final = "40172"
+CMD_FAST_FORWARD: Final = "40173"
+CMD_METRONOME: Final = "40364"
+CMD_METRONOME_ON: Final = "41745"
+CMD_METRONOME_OFF: Final = "41746"
+CMD_REPEAT: Final = "1157"
+CMD_REPEAT_ON: Final = "SET/REPEAT/1"
+CMD_REPEAT_OFF: Final = "SET/REPEAT/0"
+CMD_UNDO: Final = "40029"
+CMD_REDO: Final = "40030"
+
+# Bits of the TRACK flags field of the REAPER web interface
+FLAG_FOLDER: Final = 1
+FLAG_SELECTED: Final = 2
+FLAG_HAS_FX: Final = 4
+FLAG_MUTED: Final = 8
+FLAG_SOLOED: Final = 16
+FLAG_SOLO_IN_PLACE: Final = 32
+FLAG_RECORD_ARMED: Final = 64
+FLAG_RECORD_MONITORING_ON: Final = 128
+FLAG_RECORD_MONITORING_AUTO: Final = 256
 
 SENSORS: Final[tuple[SensorEntityDescription, ...]] = (
     SensorEntityDescription(
@@ -51,3 +104,7 @@ SERVICE_RUN_ACTION = "run_action"
 SERVICE_RECORD = "record"
 SERVICE_UNDO = "undo"
 SERVICE_REDO = "redo"
+SERVICE_SET_TRACKS = "set_tracks"
+SERVICE_CAPTURE_SCENE = "capture_scene"
+SERVICE_RECALL_SCENE = "recall_scene"
+SERVICE_GET_TRACKS = "get_tracks"
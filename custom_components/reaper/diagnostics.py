@@ -0,0 +1,71 @@
+"""Diagnostics support for the Reaper integration."""
+from __future__ import annotations
+
+from time import monotonic
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import ReaperDataUpdateCoordinator
+from .const import (
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    DATA_FLEET,
+    DOMAIN,
+    FLAG_MUTED,
+    FLAG_RECORD_ARMED,
+    FLAG_SELECTED,
+    FLAG_SOLOED,
+)
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: ReaperDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    now = monotonic()
+    data = coordinator.data
+    fleet = hass.data.get(DATA_FLEET)
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": coordinator.update_interval.total_seconds()
+            if coordinator.update_interval is not None
+            else None,
+            "coalesced_refreshes": coordinator.coalesced_refreshes,
+            "suppressed_writes": coordinator.suppressed_writes,
+            "listeners": len(coordinator._listeners),  # pylint: disable=W0212
+        },
+        "snapshot": None
+        if data is None
+        else {
+            "play_state": data.play_state,
+            "number_of_tracks": data.number_of_tracks,
+            "number_of_armed_tracks": data.number_of_armed_tracks,
+            "time_signature": data.time_signature,
+            "flagged_tracks": {
+                name: data.tracks.count(flag)
+                for name, flag in (
+                    ("armed", FLAG_RECORD_ARMED),
+                    ("muted", FLAG_MUTED),
+                    ("soloed", FLAG_SOLOED),
+                    ("selected", FLAG_SELECTED),
+                )
+            },
+        },
+        "fleet": None if fleet is None else fleet.metrics(now),
+        "push": None if coordinator.push is None else coordinator.push.as_dict(),
+        "instrumentation": None
+        if coordinator.instrumentation is None
+        else coordinator.instrumentation.as_dict(now),
+    }
@@ -0,0 +1,97 @@
+"""Discovery of REAPER web interfaces on the local network."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import ipaddress
+from typing import Final, Iterable
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+
+# Small request whose answer only the REAPER web interface gives
+SCAN_COMMAND: Final = "NTRACK;TRANSPORT"
+# Probes in flight at the same time
+SCAN_PARALLELISM: Final = 128
+# Addresses without a host are given up on after the connect timeout, a /24
+# takes two rounds of those; hosts that accept the connection get longer to
+# answer, so a busy REAPER host is not missed
+SCAN_TIMEOUT: Final = ClientTimeout(total=3, sock_connect=1)
+# Bytes of a response read to fingerprint it
+SCAN_READ_LIMIT: Final = 512
+# Largest number of addresses and ports probed in one scan
+MAX_SCAN_TARGETS: Final = 4096
+
+
+@dataclass(frozen=True)
+class DiscoveredReaper:
+    """REAPER web interface that answered a scan."""
+
+    __slots__ = ("hostname", "port", "number_of_tracks")
+
+    hostname: str
+    port: int
+    number_of_tracks: int
+
+
+def scan_targets(subnet: str, ports: Iterable[int]) -> list[tuple[str, int]]:
+    """Return every address and port of a subnet to probe.
+
+    Raises ValueError for an invalid subnet or one too large to scan.
+    """
+    network = ipaddress.ip_network(subnet.strip(), strict=False)
+    ports = tuple(ports)
+    if not ports or network.num_addresses * len(ports) > MAX_SCAN_TARGETS:
+        raise ValueError(f"Cannot scan {len(ports)} ports of {network}")
+    return [(str(address), port) for address in network.hosts() for port in ports]
+
+
+async def async_discover(
+    targets: Iterable[tuple[str, int]],
+    parallelism: int = SCAN_PARALLELISM,
+    timeout: ClientTimeout = SCAN_TIMEOUT,
+) -> list[DiscoveredReaper]:
+    """Probe addresses and ports concurrently and return the REAPER hosts.
+
+    Every probe gets a fresh connection that is closed right after, on a
+    session of its own, so a scan leaves nothing behind in the pools of
+    the configured hosts.
+    """
+    semaphore = asyncio.Semaphore(parallelism)
+    async with ClientSession(
+        connector=TCPConnector(limit=parallelism, force_close=True)
+    ) as session:
+
+        async def probe(hostname: str, port: int) -> DiscoveredReaper | None:
+            async with semaphore:
+                return await _async_probe(session, hostname, port, timeout)
+
+        found = await asyncio.gather(
+            *(probe(hostname, port) for hostname, port in targets)
+        )
+    return [host for host in found if host is not None]
+
+
+async def _async_probe(
+    session: ClientSession, hostname: str, port: int, timeout: ClientTimeout
+) -> DiscoveredReaper | None:
+    """Return the host if a REAPER web interface answers on the port."""
+    try:
+        async with session.get(
+            f"http://{hostname}:{port}/_/{SCAN_COMMAND}", timeout=timeout
+        ) as response:
+            if response.status != 200:
+                return None
+            head = await response.content.read(SCAN_READ_LIMIT)
+    except (ClientError, asyncio.TimeoutError, OSError):
+        return None
+
+    lines = head.decode(errors="replace").splitlines()
+    fields = lines[0].split("\t") if lines else []
+    if (
+        len(fields) != 2
+        or fields[0] != "NTRACK"
+        or not fields[1].isdigit()
+        or not any(line.startswith("TRANSPORT\t") for line in lines[1:])
+    ):
+        return None
+    return DiscoveredReaper(hostname, port, int(fields[1]))
@@ -0,0 +1,118 @@
+"""Base entities for the Reaper integration."""
+from __future__ import annotations
+
+import logging
+from typing import Callable, Iterable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from . import ReaperDataUpdateCoordinator
+from .const import MAX_TRACK_ENTITIES
+from .models import ReaperTrack
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ReaperTrackEntity(CoordinatorEntity):
+    """Base class for entities of a single REAPER track.
+
+    Track entities keep no state of their own: they hold the track key and
+    read their row from the coordinator snapshot, and they only listen for
+    the track columns they render.
+    """
+
+    coordinator: ReaperDataUpdateCoordinator
+    track_columns: tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        coordinator: ReaperDataUpdateCoordinator,
+        track_key: str,
+        description: EntityDescription,
+    ) -> None:
+        """Initialize."""
+        super().__init__(
+            coordinator,
+            frozenset(f"track/{track_key}/{column}" for column in self.track_columns),
+        )
+        self.track_key = track_key
+        self.entity_description = description
+        self._attr_name = f"{track_key} {description.name}"
+        self._attr_unique_id = (
+            f"{coordinator.hostname}-track-{track_key}-{description.key}"
+        )
+        self._attr_device_info = coordinator.device_info
+
+    @property
+    def track(self) -> ReaperTrack | None:
+        """Return the current row of the track."""
+        if self.coordinator.data is None:
+            return None
+        return self.coordinator.data.track(self.track_key)
+
+    @property
+    def available(self) -> bool:
+        """Return if the track is still in the project."""
+        return super().available and self.track is not None
+
+
+@callback
+def async_setup_track_entities(
+    coordinator: ReaperDataUpdateCoordinator,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    factory: Callable[[str], Iterable[ReaperTrackEntity]],
+) -> None:
+    """Add entities for tracks as they appear and remove them as they go.
+
+    All tracks of a loaded project are added in one batch. Afterwards only
+    the tracks whose keys appeared or disappeared are touched, so the
+    platform is never torn down while a project is edited.
+    """
+    if not coordinator.track_entities:
+        return
+
+    registry = er.async_get(coordinator.hass)
+    entities: dict[str, list[ReaperTrackEntity]] = {}
+
+    @callback
+    def _async_sync_tracks() -> None:
+        if coordinator.data is None:
+            return
+
+        keys = coordinator.data.track_keys
+        if len(keys) > MAX_TRACK_ENTITIES:
+            _LOGGER.warning(
+                "Project on %s has %s tracks, only the first %s get entities",
+                coordinator.hostname,
+                len(keys),
+                MAX_TRACK_ENTITIES,
+            )
+            keys = keys[:MAX_TRACK_ENTITIES]
+
+        current = set(keys)
+        for key in [key for key in entities if key not in current]:
+            for entity in entities.pop(key):
+                if entity.registry_entry is not None:
+                    registry.async_remove(entity.entity_id)
+                else:
+                    coordinator.hass.async_create_task(entity.async_remove())
+
+        new_entities: list[ReaperTrackEntity] = []
+        for key in keys:
+            if key not in entities:
+                entities[key] = list(factory(key))
+                new_entities.extend(entities[key])
+
+        if new_entities:
+            async_add_entities(new_entities)
+
+    _async_sync_tracks()
+    entry.async_on_unload(
+        coordinator.async_add_listener(_async_sync_tracks, frozenset({"track_keys"}))
+    )
@@ -0,0 +1,85 @@
+"""Fleet-wide polling schedule for the Reaper integration."""
+from __future__ import annotations
+
+from collections import deque
+import math
+from typing import TYPE_CHECKING, Any, Final
+
+from homeassistant.core import callback
+
+if TYPE_CHECKING:
+    from . import ReaperDataUpdateCoordinator
+
+# Seconds of fetches the fleet metrics are computed over
+FLEET_METRICS_WINDOW: Final = 60
+# A phase closer than this share of the interval is skipped for the next one
+MIN_PHASE_GAP: Final = 0.25
+
+
+class ReaperFleet:
+    """Schedule the polls of every configured REAPER host.
+
+    Each host polls at its own phase of the interval, evenly spread over
+    the fleet, so hosts with the same interval are never polled in
+    lockstep.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._coordinators: list[ReaperDataUpdateCoordinator] = []
+        self._fetches: deque[tuple[float, float]] = deque()
+
+    @callback
+    def async_register(self, coordinator: ReaperDataUpdateCoordinator) -> None:
+        """Add a host to the schedule."""
+        self._coordinators.append(coordinator)
+
+    @callback
+    def async_unregister(self, coordinator: ReaperDataUpdateCoordinator) -> bool:
+        """Remove a host from the schedule.
+
+        Returns True once the fleet is empty.
+        """
+        if coordinator in self._coordinators:
+            self._coordinators.remove(coordinator)
+        return not self._coordinators
+
+    def next_refresh(
+        self, coordinator: ReaperDataUpdateCoordinator, now: float, interval: float
+    ) -> float:
+        """Return the loop time of the next poll of a host."""
+        if coordinator not in self._coordinators or interval <= 0:
+            return now + interval
+
+        phase = (
+            self._coordinators.index(coordinator) / len(self._coordinators) * interval
+        )
+        periods = math.ceil((now + MIN_PHASE_GAP * interval - phase) / interval)
+        return phase + periods * interval
+
+    @callback
+    def async_record_fetch(self, now: float, latency: float) -> None:
+        """Record a fetch that took a number of seconds."""
+        self._fetches.append((now, latency))
+        self._trim(now)
+
+    def metrics(self, now: float) -> dict[str, Any]:
+        """Return aggregate metrics of the fleet."""
+        self._trim(now)
+        latencies = sorted(latency for _, latency in self._fetches)
+        p95 = None
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        return {
+            "hosts": len(self._coordinators),
+            "hosts_down": sum(
+                not coordinator.last_update_success
+                for coordinator in self._coordinators
+            ),
+            "fetches_per_second": round(len(latencies) / FLEET_METRICS_WINDOW, 2),
+            "latency_p95_ms": None if p95 is None else round(p95 * 1000, 1),
+        }
+
+    def _trim(self, now: float) -> None:
+        while self._fetches and self._fetches[0][0] < now - FLEET_METRICS_WINDOW:
+            self._fetches.popleft()
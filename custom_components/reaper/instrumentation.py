@@ -0,0 +1,156 @@
+"""Hot path instrumentation for the Reaper integration."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+import re
+from typing import Any, Final
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS: Final = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Seconds of refreshes the refresh rate is computed over
+REFRESH_RATE_WINDOW: Final = 60
+# Distinct command IDs timed separately, the rest are timed as "other"
+MAX_COMMAND_IDS: Final = 64
+
+# Numeric arguments of a command, e.g. the track index and value of
+# SET/TRACK/3/VOL/0.5
+_ARGUMENTS = re.compile(r"/-?[\d.]+(?=/|$)")
+
+
+def command_id(command: str) -> str:
+    """Return the ID a command is timed under, without its numeric arguments."""
+    return _ARGUMENTS.sub("", command)
+
+
+class LatencyHistogram:
+    """Count durations in fixed buckets."""
+
+    __slots__ = ("buckets", "count", "total", "maximum")
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Count one duration."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    @property
+    def mean_ms(self) -> float | None:
+        """Return the mean duration in milliseconds."""
+        if not self.count:
+            return None
+        return round(self.total / self.count * 1000, 2)
+
+    def percentile_ms(self, percentile: float) -> float | None:
+        """Return the upper bound of the bucket a percentile falls in."""
+        if not self.count:
+            return None
+        rank = percentile * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound * 1000
+        return round(self.maximum * 1000, 2)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics."""
+        labels = [f"<={bound * 1000:g}ms" for bound in LATENCY_BUCKETS]
+        labels.append(f">{LATENCY_BUCKETS[-1] * 1000:g}ms")
+        return {
+            "count": self.count,
+            "mean_ms": self.mean_ms,
+            "p95_ms": self.percentile_ms(0.95),
+            "max_ms": round(self.maximum * 1000, 2),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class ReaperInstrumentation:
+    """Timings of the fetch, parse, command and fan-out paths of one host.
+
+    The coordinator and client only take monotonic clock readings when an
+    instrumentation is attached, so a host without one pays a single
+    `is None` check per path.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.fetch = LatencyHistogram()
+        self.parse = LatencyHistogram()
+        self.failed_fetches = 0
+        self.payload_bytes = 0
+        self.payload_bytes_total = 0
+        self.suppressed_writes = 0
+        self.commands: dict[str, LatencyHistogram] = {}
+        self.fan_out: dict[str, LatencyHistogram] = {}
+        self._refreshes: deque[float] = deque()
+
+    def record_fetch(self, now: float, latency: float | None) -> None:
+        """Record a refresh, with the latency of its fetch or None if it failed."""
+        self._refreshes.append(now)
+        self._trim(now)
+        if latency is None:
+            self.failed_fetches += 1
+        else:
+            self.fetch.record(latency)
+
+    def record_parse(self, seconds: float, size: int) -> None:
+        """Record the time spent parsing a response of a number of bytes."""
+        self.parse.record(seconds)
+        self.payload_bytes = size
+        self.payload_bytes_total += size
+
+    def record_command(self, command: str, seconds: float) -> None:
+        """Record the round-trip time of a request carrying a command chain."""
+        for ident in {command_id(part) for part in command.split(";")}:
+            if (histogram := self.commands.get(ident)) is None:
+                if len(self.commands) >= MAX_COMMAND_IDS:
+                    ident = "other"
+                histogram = self.commands.setdefault(ident, LatencyHistogram())
+            histogram.record(seconds)
+
+    def record_fan_out(self, platforms: dict[str, float], suppressed: int) -> None:
+        """Record the time listeners of each platform took to handle an update."""
+        self.suppressed_writes += suppressed
+        for platform, seconds in platforms.items():
+            if (histogram := self.fan_out.get(platform)) is None:
+                histogram = self.fan_out[platform] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def refreshes_per_minute(self, now: float) -> float:
+        """Return the number of refreshes over the last minute."""
+        self._trim(now)
+        return round(len(self._refreshes) * 60 / REFRESH_RATE_WINDOW, 2)
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        """Return every timing for diagnostics."""
+        return {
+            "fetch": self.fetch.as_dict(),
+            "failed_fetches": self.failed_fetches,
+            "parse": self.parse.as_dict(),
+            "payload_bytes": self.payload_bytes,
+            "payload_bytes_total": self.payload_bytes_total,
+            "refreshes_per_minute": self.refreshes_per_minute(now),
+            "suppressed_writes": self.suppressed_writes,
+            "commands": {
+                ident: histogram.as_dict()
+                for ident, histogram in sorted(self.commands.items())
+            },
+            "fan_out": {
+                platform: histogram.as_dict()
+                for platform, histogram in sorted(self.fan_out.items())
+            },
+        }
+
+    def _trim(self, now: float) -> None:
+        while self._refreshes and self._refreshes[0] < now - REFRESH_RATE_WINDOW:
+            self._refreshes.popleft()
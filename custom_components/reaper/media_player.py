@@ -1,36 +1,84 @@
 """Reaper media_player entity."""
-import json
+import asyncio
+from datetime import datetime
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+from aiohttp import ClientError
 import voluptuous as vol
 
-from homeassistant.components.media_player import MediaPlayerEntity
+from homeassistant.components.media_player import BrowseMedia, MediaPlayerEntity
 from homeassistant.components.media_player.const import (
+    MEDIA_CLASS_DIRECTORY,
+    MEDIA_CLASS_TRACK,
     MEDIA_TYPE_MUSIC,
+    SUPPORT_BROWSE_MEDIA,
     SUPPORT_NEXT_TRACK,
     SUPPORT_PLAY,
+    SUPPORT_PLAY_MEDIA,
     SUPPORT_PREVIOUS_TRACK,
     SUPPORT_STOP,
     SUPPORT_VOLUME_SET,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import STATE_IDLE, STATE_OFF, STATE_PAUSED, STATE_PLAYING
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    ATTR_NAME,
+    STATE_IDLE,
+    STATE_OFF,
+    STATE_PAUSED,
+    STATE_PLAYING,
+)
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    HomeAssistant,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv, entity_platform
+from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+import homeassistant.util.dt as dt_util
 
-from . import ReaperDataUpdateCoordinator
+from . import ReaperDataUpdateCoordinator, ReaperError
+from .clock import ReaperTransportClock
 from .const import (
     ATTR_ID,
+    ATTR_TRACKS,
+    CMD_FAST_FORWARD,
+    CMD_PAUSE,
+    CMD_PLAY,
+    CMD_RECORD,
+    CMD_REDO,
+    CMD_REWIND,
+    CMD_STOP,
+    CMD_UNDO,
     DOMAIN,
+    FLAG_MUTED,
+    FLAG_RECORD_ARMED,
+    FLAG_SOLOED,
+    PLAY_STATE_PAUSED,
+    PLAY_STATE_PLAYING,
+    PLAY_STATE_RECORD_PAUSED,
+    PLAY_STATE_RECORDING,
+    PLAY_STATE_STOPPED,
+    SERVICE_CAPTURE_SCENE,
+    SERVICE_GET_TRACKS,
+    SERVICE_RECALL_SCENE,
     SERVICE_RECORD,
     SERVICE_REDO,
     SERVICE_RUN_ACTION,
+    SERVICE_SET_TRACKS,
     SERVICE_UNDO,
 )
+from .mixer import TRACK_FLAG_COMMANDS, track_commands
+from .models import ReaperMarker
+from .number import MAX_VOLUME_DB, volume_to_db
+from .scenes import ReaperScenes, scene_commands
 
 SUPPORT_REAPER = (
     SUPPORT_PLAY
@@ -38,6 +86,42 @@ SUPPORT_REAPER = (
     | SUPPORT_PREVIOUS_TRACK
     | SUPPORT_NEXT_TRACK
     | SUPPORT_STOP
+    | SUPPORT_BROWSE_MEDIA
+    | SUPPORT_PLAY_MEDIA
+)
+
+MEDIA_TYPE_MARKER = "marker"
+MEDIA_TYPE_REGION = "region"
+
+# Seconds into a region or past a marker within which previous track jumps
+# to the one before instead of back to its start
+PREVIOUS_TRACK_GRACE = 1.0
+
+
+def _track_selector(value: Any) -> Union[int, str]:
+    """Validate a track index, a track name or "*" for all tracks.
+
+    Only integers select by index, so a track named "12" is still selected
+    by its name.
+    """
+    if isinstance(value, bool):
+        raise vol.Invalid("expected a track index or name")
+    if isinstance(value, int):
+        return vol.Range(min=0)(value)
+    return cv.string(value)
+
+
+TRACK_CHANGE_SCHEMA = vol.Schema(
+    {
+        vol.Required("track"): vol.All(
+            cv.ensure_list, [_track_selector], vol.Length(min=1)
+        ),
+        vol.Optional("volume"): vol.All(
+            vol.Coerce(float), vol.Range(max=MAX_VOLUME_DB)
+        ),
+        vol.Optional("pan"): vol.All(vol.Coerce(float), vol.Range(min=-1, max=1)),
+        **{vol.Optional(field): cv.boolean for field in TRACK_FLAG_COMMANDS},
+    }
 )
 
 
@@ -86,6 +170,39 @@ async def async_setup_entry(
         "async_reaper_run_action",
     )
 
+    platform.async_register_entity_service(
+        SERVICE_SET_TRACKS,
+        {
+            vol.Required(ATTR_TRACKS): vol.All(
+                cv.ensure_list, [TRACK_CHANGE_SCHEMA], vol.Length(min=1)
+            ),
+        },
+        "async_reaper_set_tracks",
+    )
+
+    platform.async_register_entity_service(
+        SERVICE_CAPTURE_SCENE,
+        {
+            vol.Required(ATTR_NAME): cv.string,
+        },
+        "async_reaper_capture_scene",
+    )
+
+    platform.async_register_entity_service(
+        SERVICE_RECALL_SCENE,
+        {
+            vol.Required(ATTR_NAME): cv.string,
+        },
+        "async_reaper_recall_scene",
+    )
+
+    platform.async_register_entity_service(
+        SERVICE_GET_TRACKS,
+        {},
+        "async_reaper_get_tracks",
+        supports_response=SupportsResponse.ONLY,
+    )
+
     async_add_entities([ReaperMediaPlayer(coordinator)], False)
 
 
@@ -96,23 +213,79 @@ class ReaperMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
 
     def __init__(self, coordinator: ReaperDataUpdateCoordinator):
         """Initialize a Reaper media player."""
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator, frozenset({"play_state", "transport", "beatpos", "markers"})
+        )
         self._name = f"{coordinator.hostname} Reaper Transport"
 
         self.coordinator = coordinator
         self._unique_id = f"{coordinator.hostname}-mediaplayer"
-        self.status = json.loads(coordinator.data)
-        self._state = STATE_OFF
-
-    async def async_update(self) -> None:
-        """Update Reaper entity."""
-        await self.coordinator.async_request_refresh()
-        self._state = PLAYBACK_DICT[json.loads(self.coordinator.data).get("play_state")]
-        self.status = json.loads(self.coordinator.data)
-
-    @property
-    def should_poll(self) -> bool:
-        return True
+        self._clock = ReaperTransportClock()
+        self._written: Optional[Tuple[StateType, bool, Optional[ReaperMarker]]] = None
+        self._unsub_boundary: Optional[CALLBACK_TYPE] = None
+        if coordinator.data is not None:
+            self._clock.update(coordinator.data, dt_util.utcnow())
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the region boundary timer."""
+        await super().async_will_remove_from_hass()
+        self._cancel_boundary()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state unless only the position moved as extrapolated."""
+        corrected = self.coordinator.data is not None and self._clock.update(
+            self.coordinator.data, dt_util.utcnow()
+        )
+        if corrected or self._written != self._written_key():
+            self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and wake up again when the playhead leaves the region.
+
+        The position is only published when it drifts, so the region is
+        looked up at the extrapolated position, and a timer writes the state
+        again at the next region boundary while the transport rolls.
+        """
+        self._written = self._written_key()
+        super().async_write_ha_state()
+
+        self._cancel_boundary()
+        now = dt_util.utcnow()
+        if (
+            self._clock.rolling
+            and self.coordinator.data is not None
+            and (position := self._clock.expected_position(now)) is not None
+            and (boundary := self.coordinator.data.markers.next_boundary(position))
+            is not None
+        ):
+            self._unsub_boundary = async_call_later(
+                self.hass, boundary - position, self._async_boundary_reached
+            )
+
+    @callback
+    def _async_boundary_reached(self, _now: datetime) -> None:
+        self._unsub_boundary = None
+        if self._written != self._written_key():
+            self.async_write_ha_state()
+
+    @callback
+    def _cancel_boundary(self) -> None:
+        if self._unsub_boundary is not None:
+            self._unsub_boundary()
+            self._unsub_boundary = None
+
+    def _written_key(self) -> Tuple[StateType, bool, Optional[ReaperMarker]]:
+        return (self.state, self.available, self._region())
+
+    def _region(self) -> Optional[ReaperMarker]:
+        """Return the region at the extrapolated position."""
+        data = self.coordinator.data
+        position = self._clock.expected_position(dt_util.utcnow())
+        if data is None or position is None:
+            return None
+        return data.markers.region_at(position)
 
     @property
     def name(self) -> str:
@@ -122,7 +295,33 @@ class ReaperMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
     @property
     def state(self) -> StateType:
         """Return the state of the device."""
-        return self._state
+        if self.coordinator.data is None:
+            return STATE_OFF
+        return PLAYBACK_DICT[self.coordinator.data.play_state]
+
+    @property
+    def media_position(self) -> Optional[float]:
+        """Return the transport position in seconds when it was last published."""
+        return self._clock.position
+
+    @property
+    def media_position_updated_at(self) -> Optional[datetime]:
+        """Return when the transport position was last published."""
+        return self._clock.updated_at
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the beat position, tempo and the region being played."""
+        data = self.coordinator.data
+        region = self._region()
+        return {
+            "beat_position": self._clock.beat_position,
+            "bpm": self._clock.bpm,
+            "time_signature": None if data is None else data.time_signature,
+            "region": None if region is None else region.name,
+            "region_start": None if region is None else region.position,
+            "region_end": None if region is None else region.end,
+        }
 
     @property
     def media_content_type(self) -> Any:
@@ -135,13 +334,9 @@ class ReaperMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
         return SUPPORT_REAPER
 
     @property
-    def device_info(self) -> Dict[str, Any]:
+    def device_info(self) -> DeviceInfo:
         """Return the device info."""
-        return {
-            "identifiers": {(DOMAIN, self.coordinator.hostname)},
-            "name": self.coordinator.hostname,
-            "manufacturer": "Cockos Reaper",
-        }
+        return self.coordinator.device_info
 
     @property
     def unique_id(self) -> str:
@@ -158,28 +353,116 @@ class ReaperMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
 
     async def async_media_play(self) -> None:
         """Play."""
-        await self.coordinator.reaperdaw.play()
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_send_optimistic(
+            CMD_PLAY, priority=True, play_state=PLAY_STATE_PLAYING
+        )
 
     async def async_media_pause(self) -> None:
-        """Play."""
-        await self.coordinator.reaperdaw.pause()
-        await self.coordinator.async_refresh()
+        """Pause."""
+        play_state = PLAY_STATE_PAUSED
+        if (
+            self.coordinator.data is not None
+            and self.coordinator.data.play_state == PLAY_STATE_RECORDING
+        ):
+            play_state = PLAY_STATE_RECORD_PAUSED
+        await self.coordinator.async_send_optimistic(
+            CMD_PAUSE, priority=True, play_state=play_state
+        )
 
     async def async_media_stop(self) -> None:
         """Send stop command to media player."""
-        await self.coordinator.reaperdaw.stop()
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_send_optimistic(
+            CMD_STOP, priority=True, play_state=PLAY_STATE_STOPPED
+        )
 
     async def async_media_next_track(self) -> None:
-        """Send next track command."""
-        await self.coordinator.reaperdaw.fastForward()
-        await self.coordinator.async_refresh()
+        """Jump to the next marker or region, or fast forward without one."""
+        position = self._clock.expected_position(dt_util.utcnow())
+        data = self.coordinator.data
+        if (
+            position is not None
+            and data is not None
+            and (marker := data.markers.next_marker(position)) is not None
+        ):
+            await self._async_seek(marker.position)
+            return
+        await self.coordinator.async_send_command(CMD_FAST_FORWARD, priority=True)
+        await self.coordinator.async_request_reconcile()
 
     async def async_media_previous_track(self) -> None:
-        """Send the previous track command."""
-        await self.coordinator.reaperdaw.rewind()
-        await self.coordinator.async_refresh()
+        """Jump to the previous marker or region, or rewind without one."""
+        position = self._clock.expected_position(dt_util.utcnow())
+        data = self.coordinator.data
+        if (
+            position is not None
+            and data is not None
+            and (
+                marker := data.markers.previous_marker(position - PREVIOUS_TRACK_GRACE)
+            )
+            is not None
+        ):
+            await self._async_seek(marker.position)
+            return
+        await self.coordinator.async_send_command(CMD_REWIND, priority=True)
+        await self.coordinator.async_request_reconcile()
+
+    async def async_browse_media(
+        self,
+        media_content_type: Optional[str] = None,
+        media_content_id: Optional[str] = None,
+    ) -> BrowseMedia:
+        """List the regions and markers of the project."""
+        try:
+            markers = await self.coordinator.async_get_markers()
+        except (ReaperError, ClientError, asyncio.TimeoutError) as error:
+            raise HomeAssistantError(f"Cannot fetch markers: {error}") from error
+
+        return BrowseMedia(
+            media_class=MEDIA_CLASS_DIRECTORY,
+            media_content_id="",
+            media_content_type="",
+            title="Regions and markers",
+            can_play=False,
+            can_expand=True,
+            children_media_class=MEDIA_CLASS_TRACK,
+            children=[
+                BrowseMedia(
+                    media_class=MEDIA_CLASS_TRACK,
+                    media_content_id=str(marker.id),
+                    media_content_type=MEDIA_TYPE_REGION
+                    if marker.is_region
+                    else MEDIA_TYPE_MARKER,
+                    title=marker.name
+                    or f"{'Region' if marker.is_region else 'Marker'} {marker.id}",
+                    can_play=True,
+                    can_expand=False,
+                )
+                for marker in markers.markers
+            ],
+        )
+
+    async def async_play_media(
+        self, media_type: str, media_id: str, **kwargs: Any
+    ) -> None:
+        """Jump to the start of a region or to a marker."""
+        if media_type not in (MEDIA_TYPE_REGION, MEDIA_TYPE_MARKER):
+            raise HomeAssistantError(f"Cannot play media of type {media_type}")
+        data = self.coordinator.data
+        marker = (
+            None
+            if data is None or not media_id.isdigit()
+            else data.markers.get(media_type == MEDIA_TYPE_REGION, int(media_id))
+        )
+        if marker is None:
+            raise HomeAssistantError(f"No {media_type} with ID {media_id}")
+        await self._async_seek(marker.position)
+
+    async def _async_seek(self, position: float) -> None:
+        """Move the playhead to a position in seconds."""
+        await self.coordinator.async_send_command(
+            f"SET/POS/{position:.6f}", priority=True
+        )
+        await self.coordinator.async_request_reconcile()
 
     async def async_set_volume_level(self, volume: str) -> None:
         """Set volume level, range 0..1."""
@@ -187,31 +470,97 @@ class ReaperMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
 
     async def async_reaper_record(self) -> None:
         """Record a piece of audio in Reaper."""
-        await self.coordinator.reaperdaw.record()
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_send_optimistic(
+            CMD_RECORD, priority=True, play_state=PLAY_STATE_RECORDING
+        )
 
     async def async_reaper_run_action(self, action_id: str) -> None:
         """Set reaper configuration actionId."""
-        await self.coordinator.reaperdaw.sendCommand(action_id)
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_send_command(action_id)
+        self.coordinator.async_invalidate_project()
+        await self.coordinator.async_request_reconcile()
 
     async def async_reaper_undo(self) -> None:
         """Undo action in Reaper."""
-        await self.coordinator.reaperdaw.sendCommand("40029")
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_send_command(CMD_UNDO)
+        self.coordinator.async_invalidate_project()
+        await self.coordinator.async_request_reconcile()
 
     async def async_reaper_redo(self) -> None:
         """Redo action in Reaper."""
-        await self.coordinator.reaperdaw.sendCommand("40030")
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_send_command(CMD_REDO)
+        self.coordinator.async_invalidate_project()
+        await self.coordinator.async_request_reconcile()
+
+    async def async_reaper_set_tracks(self, tracks: List[Dict[str, Any]]) -> None:
+        """Apply track changes with as few requests as possible."""
+        if self.coordinator.data is None:
+            raise HomeAssistantError("The track table has not been fetched yet")
+        try:
+            commands = track_commands(self.coordinator.data, tracks)
+        except ValueError as error:
+            raise HomeAssistantError(str(error)) from error
+        if commands:
+            await self.coordinator.async_send_commands(commands)
+            await self.coordinator.async_request_reconcile()
+
+    async def async_reaper_capture_scene(self, name: str) -> None:
+        """Store the volume, pan, mute, solo and record arm of every track.
+
+        The scene is taken from the last polled track table, without a
+        request of its own.
+        """
+        scenes = self._scenes()
+        await scenes.async_capture(name, self.coordinator.data)
+
+    async def async_reaper_recall_scene(self, name: str) -> None:
+        """Restore the tracks of a scene that differ from the project."""
+        scenes = self._scenes()
+        if (scene := await scenes.async_get(name)) is None:
+            raise HomeAssistantError(f"No scene {name!r}")
+        try:
+            await self.coordinator.async_get_tracks()
+        except (ReaperError, ClientError, asyncio.TimeoutError) as error:
+            raise HomeAssistantError(f"Cannot fetch tracks: {error}") from error
+        commands, missing = scene_commands(self.coordinator.data, scene)
+        if missing:
+            _LOGGER.warning(
+                "Tracks of scene %s are no longer in the project: %s",
+                name,
+                ", ".join(missing),
+            )
+        if commands:
+            await self.coordinator.async_send_commands(commands)
+            await self.coordinator.async_request_reconcile()
+
+    def _scenes(self) -> ReaperScenes:
+        if self.coordinator.scenes is None or self.coordinator.data is None:
+            raise HomeAssistantError("Scenes are not available")
+        return self.coordinator.scenes
+
+    async def async_reaper_get_tracks(self) -> ServiceResponse:
+        """Return every track and the full list of armed tracks."""
+        data = self.coordinator.data
+        if data is None:
+            raise HomeAssistantError("The track table has not been fetched yet")
+        return {
+            "armed_tracks": list(data.armed_tracks),
+            "tracks": [
+                {
+                    "index": track.index,
+                    "key": key,
+                    "name": track.name,
+                    "volume": volume_to_db(track.volume),
+                    "pan": track.pan,
+                    "mute": bool(track.flags & FLAG_MUTED),
+                    "solo": bool(track.flags & FLAG_SOLOED),
+                    "record_arm": bool(track.flags & FLAG_RECORD_ARMED),
+                }
+                for key, track in zip(data.track_keys, data.tracks)
+            ],
+        }
 
     async def async_reaper_set_volume_level(self, volume_level: str) -> None:
         """Set volume level for a stream, range 0..1."""
         volume = float(volume_level)
-        await self.coordinator.reaperdaw.setMasterVolume(volume)
-
-    async def async_added_to_hass(self) -> None:
-        """Connect to dispatcher listening for entity data notifications."""
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
-        )
+        await self.coordinator.async_send_command(f"SET/TRACK/0/VOL/{volume}")
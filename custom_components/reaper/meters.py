@@ -0,0 +1,186 @@
+"""Track meter sampling for the Reaper integration."""
+from __future__ import annotations
+
+from array import array
+import asyncio
+from dataclasses import dataclass
+from datetime import timedelta
+import logging
+import math
+from typing import Awaitable, Callable, Final, Mapping
+
+from aiohttp import ClientError
+import async_timeout
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .api import ReaperError
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between two meter samples
+METER_SAMPLE_INTERVAL: Final = 0.25
+# Published windows the peak hold value is kept for
+METER_HOLD_WINDOWS: Final = 6
+# REAPER reports meters in tenths of a dB and anything below -150 dB as -inf
+METER_FLOOR: Final = -1500
+
+
+@dataclass(frozen=True)
+class ReaperMeterStats:
+    """Meter levels of a track over one publication window, in dB."""
+
+    __slots__ = ("minimum", "maximum", "mean", "peak_hold")
+
+    minimum: float
+    maximum: float
+    mean: float
+    peak_hold: float
+
+
+class MeterRingBuffer:
+    """Fixed-size buffer of meter samples in tenths of a dB.
+
+    Samples live in a preallocated signed short array, so a track costs the
+    same memory however long it is sampled.
+    """
+
+    __slots__ = ("_samples", "_position", "_window")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize."""
+        self._samples = array("h", [METER_FLOOR]) * capacity
+        self._position = 0
+        self._window = 0
+
+    def append(self, value: int) -> None:
+        """Add a sample, overwriting the oldest one when the buffer is full."""
+        capacity = len(self._samples)
+        self._samples[self._position] = max(METER_FLOOR, min(value, 32767))
+        self._position = (self._position + 1) % capacity
+        self._window = min(self._window + 1, capacity)
+
+    def stats(self) -> ReaperMeterStats | None:
+        """Return the levels since the last call and start a new window."""
+        if not self._window:
+            return None
+
+        capacity = len(self._samples)
+        window = [
+            self._samples[(self._position - offset) % capacity]
+            for offset in range(1, self._window + 1)
+        ]
+        self._window = 0
+        return ReaperMeterStats(
+            min(window) / 10,
+            max(window) / 10,
+            round(sum(window) / len(window) / 10, 1),
+            max(self._samples) / 10,
+        )
+
+
+class ReaperMeterMonitor:
+    """Sample track meters quickly and publish them slowly.
+
+    Meters are sampled every `METER_SAMPLE_INTERVAL` seconds into a ring
+    buffer per track. Only the aggregated levels are handed to listeners,
+    once per publish interval, so a dashboard shows every peak while the
+    state machine sees a single write per track and window. The fetch
+    returns the meter peaks by track key, or None when there is nothing to
+    sample, e.g. while the transport is stopped, which pauses sampling
+    without a request.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        fetch: Callable[[], Awaitable[Mapping[str, int] | None]],
+        publish: Callable[[frozenset[str]], None],
+        publish_interval: float,
+        sample_interval: float = METER_SAMPLE_INTERVAL,
+    ) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._fetch = fetch
+        self._publish = publish
+        self._publish_interval = publish_interval
+        self._sample_interval = sample_interval
+        self._capacity = METER_HOLD_WINDOWS * max(
+            1, math.ceil(publish_interval / sample_interval)
+        )
+        self._buffers: dict[str, MeterRingBuffer] = {}
+        self._stats: dict[str, ReaperMeterStats] = {}
+        self._sampling = False
+        self._unsubscribe: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_start(self) -> None:
+        """Start sampling and publishing."""
+        if self._unsubscribe:
+            return
+        self._unsubscribe = [
+            async_track_time_interval(
+                self._hass,
+                self._async_sample,
+                timedelta(seconds=self._sample_interval),
+            ),
+            async_track_time_interval(
+                self._hass,
+                self._async_publish,
+                timedelta(seconds=self._publish_interval),
+            ),
+        ]
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop sampling and publishing."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+
+    def stats(self, key: str) -> ReaperMeterStats | None:
+        """Return the last published levels of a track."""
+        return self._stats.get(key)
+
+    @callback
+    def feed(self, peaks: Mapping[str, int]) -> None:
+        """Add one sample for every sampled track, dropping the others."""
+        for key, peak in peaks.items():
+            if (buffer := self._buffers.get(key)) is None:
+                buffer = self._buffers[key] = MeterRingBuffer(self._capacity)
+            buffer.append(peak)
+
+        if len(self._buffers) > len(peaks):
+            for key in [key for key in self._buffers if key not in peaks]:
+                del self._buffers[key]
+                self._stats.pop(key, None)
+
+    async def _async_sample(self, _now: object = None) -> None:
+        """Fetch and buffer one meter sample, unless one is still in flight."""
+        if self._sampling:
+            return
+        self._sampling = True
+        try:
+            async with async_timeout.timeout(10):
+                peaks = await self._fetch()
+        except (ReaperError, ClientError, asyncio.TimeoutError) as error:
+            _LOGGER.debug("Skipping meter sample: %s", error)
+            return
+        finally:
+            self._sampling = False
+        if peaks is not None:
+            self.feed(peaks)
+
+    @callback
+    def _async_publish(self, _now: object = None) -> None:
+        """Aggregate every buffer and notify the listeners of changed tracks."""
+        changed = set()
+        for key, buffer in self._buffers.items():
+            stats = buffer.stats()
+            if stats is not None and stats != self._stats.get(key):
+                self._stats[key] = stats
+                changed.add(f"track/{key}/meter")
+
+        if changed:
+            self._publish(frozenset(changed))
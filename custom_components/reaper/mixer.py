@@ -0,0 +1,72 @@
+"""Bulk track changes for the Reaper integration."""
+from __future__ import annotations
+
+from typing import Any, Final, Iterable, Mapping
+
+from .models import ReaperSnapshot
+from .number import db_to_volume
+
+# Selects every track but the master
+ALL_TRACKS: Final = "*"
+# Fields of a track change and the track setting each one sets
+TRACK_FLAG_COMMANDS: Final[dict[str, str]] = {
+    "mute": "MUTE",
+    "solo": "SOLO",
+    "record_arm": "RECARM",
+}
+
+
+def track_commands(
+    snapshot: ReaperSnapshot, changes: Iterable[Mapping[str, Any]]
+) -> list[str]:
+    """Return the `SET/TRACK` commands of a list of track changes.
+
+    Every change selects tracks with `track`, an index (0 is the master), a
+    track key, `*` for every track but the master, or a list of those, and
+    sets any of `volume` (in dB), `pan`, `mute`, `solo` and `record_arm` on
+    them. When changes overlap, the last one wins, so no setting of a track
+    is sent twice. Selectors are checked against the cached track table
+    and raise ValueError before anything is sent.
+    """
+    settings: dict[tuple[int, str], str] = {}
+    for change in changes:
+        values = _settings(change)
+        for index in _select(snapshot, change["track"]):
+            for setting, value in values:
+                settings.pop((index, setting), None)
+                settings[(index, setting)] = value
+    return [
+        f"SET/TRACK/{index}/{setting}/{value}"
+        for (index, setting), value in settings.items()
+    ]
+
+
+def _settings(change: Mapping[str, Any]) -> list[tuple[str, str]]:
+    """Return the track settings and values of a change."""
+    settings = []
+    if (volume := change.get("volume")) is not None:
+        settings.append(("VOL", f"{db_to_volume(volume):.6f}"))
+    if (pan := change.get("pan")) is not None:
+        settings.append(("PAN", f"{pan:.6f}"))
+    for field, setting in TRACK_FLAG_COMMANDS.items():
+        if (flag := change.get(field)) is not None:
+            settings.append((setting, "1" if flag else "0"))
+    return settings
+
+
+def _select(snapshot: ReaperSnapshot, selector: Any) -> list[int]:
+    """Return the track indexes a selector picks."""
+    if isinstance(selector, (list, tuple)):
+        return [index for item in selector for index in _select(snapshot, item)]
+    if selector == ALL_TRACKS:
+        return list(range(1, len(snapshot.tracks)))
+    if isinstance(selector, int):
+        if not 0 <= selector < len(snapshot.tracks):
+            raise ValueError(
+                f"No track {selector}, the project has tracks 0 to "
+                f"{len(snapshot.tracks) - 1}"
+            )
+        return [selector]
+    if (index := snapshot.track_index.get(selector)) is None:
+        raise ValueError(f"No track {selector!r}")
+    return [index]
@@ -0,0 +1,699 @@
+"""Data models for the Reaper integration."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+from itertools import accumulate, compress
+import sys
+from typing import Any, Callable, Final, Iterable, Iterator, Mapping
+
+from .const import (
+    CMD_METRONOME,
+    CMD_REPEAT,
+    FLAG_RECORD_ARMED,
+    PLAY_STATE_PAUSED,
+    PLAY_STATE_PLAYING,
+    PLAY_STATE_RECORD_PAUSED,
+    PLAY_STATE_RECORDING,
+    PLAY_STATE_STOPPED,
+)
+
+# Snapshot attributes that listeners can subscribe to
+SNAPSHOT_KEYS: Final = (
+    "play_state",
+    "metronome",
+    "repeat",
+    "time_signature",
+    "number_of_tracks",
+    "number_of_armed_tracks",
+    "armed_tracks",
+    "transport",
+    "beatpos",
+    "tracks",
+    "track_keys",
+    "markers",
+)
+
+# Track columns that per-track listeners can subscribe to, as
+# `track/<track key>/<column>` keys. Meters change on every poll, so their
+# `track/<track key>/meter` keys come from the meter monitor instead.
+TRACK_COLUMNS: Final[Mapping[str, tuple[str, ...]]] = {
+    "flags": ("flags",),
+    "volume": ("volume",),
+    "pan": ("pan",),
+}
+
+# For every bit of a byte, the translation of all byte values to that bit
+_BIT_TABLES: Final = tuple(
+    bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)
+)
+
+PLAY_STATES: Mapping[str, str] = {
+    "0": PLAY_STATE_STOPPED,
+    "1": PLAY_STATE_PLAYING,
+    "2": PLAY_STATE_PAUSED,
+    "5": PLAY_STATE_RECORDING,
+    "6": PLAY_STATE_RECORD_PAUSED,
+}
+
+
+@dataclass(frozen=True)
+class ReaperTransport:
+    """Transport section of a REAPER status."""
+
+    __slots__ = (
+        "play_state",
+        "position_seconds",
+        "repeat",
+        "position_string",
+        "position_string_beats",
+    )
+
+    play_state: str
+    position_seconds: float
+    repeat: bool
+    position_string: str
+    position_string_beats: str
+
+
+@dataclass(frozen=True)
+class ReaperBeatPosition:
+    """Beat position section of a REAPER status."""
+
+    __slots__ = (
+        "position_seconds",
+        "full_beat_position",
+        "measure_count",
+        "beats_in_measure",
+    )
+
+    position_seconds: float
+    full_beat_position: float
+    measure_count: int
+    beats_in_measure: float
+
+
+@dataclass(frozen=True)
+class ReaperTrack:
+    """Single row of the REAPER track table."""
+
+    __slots__ = (
+        "index",
+        "name",
+        "flags",
+        "volume",
+        "pan",
+        "last_meter_peak",
+        "last_meter_pos",
+        "color",
+    )
+
+    index: int
+    name: str
+    flags: int
+    volume: float
+    pan: float
+    last_meter_peak: int
+    last_meter_pos: int
+    color: str
+
+    @property
+    def is_armed(self) -> bool:
+        """Return True if the track is armed for recording."""
+        return bool(self.flags & FLAG_RECORD_ARMED)
+
+
+class ReaperTrackTable:
+    """REAPER track table, stored by column.
+
+    Every column is named after the `ReaperTrack` field it holds. Names are
+    a tuple and the numeric columns are arrays, so a project of thousands of
+    tracks costs a handful of objects instead of one per track and field.
+    Rows are only built when a single track is looked up. Flag counts and
+    index lists come from a bitmask of the flags column, built without
+    running Python code per track and cached as the table never changes.
+    """
+
+    __slots__ = (
+        "index",
+        "name",
+        "flags",
+        "volume",
+        "pan",
+        "last_meter_peak",
+        "last_meter_pos",
+        "color",
+        "_keys",
+        "_flag_masks",
+    )
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        index: array[int] | None = None,
+        name: tuple[str, ...] = (),
+        flags: array[int] | None = None,
+        volume: array[float] | None = None,
+        pan: array[float] | None = None,
+        last_meter_peak: array[int] | None = None,
+        last_meter_pos: array[int] | None = None,
+        color: array[int] | None = None,
+    ) -> None:
+        """Initialize from columns of the same length, colors as RGB integers."""
+        self.index = array("i") if index is None else index
+        self.name = name
+        self.flags = array("I") if flags is None else flags
+        self.volume = array("d") if volume is None else volume
+        self.pan = array("d") if pan is None else pan
+        self.last_meter_peak = (
+            array("i") if last_meter_peak is None else last_meter_peak
+        )
+        self.last_meter_pos = array("i") if last_meter_pos is None else last_meter_pos
+        self.color = array("I") if color is None else color
+        self._keys: tuple[str, ...] | None = None
+        self._flag_masks: dict[int, bytes] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[ReaperTrack]) -> ReaperTrackTable:
+        """Return the table of track rows."""
+        rows = tuple(rows)
+        return cls(
+            array("i", (row.index for row in rows)),
+            tuple(row.name for row in rows),
+            array("I", (row.flags for row in rows)),
+            array("d", (row.volume for row in rows)),
+            array("d", (row.pan for row in rows)),
+            array("i", (row.last_meter_peak for row in rows)),
+            array("i", (row.last_meter_pos for row in rows)),
+            array("I", (int(row.color[1:], 16) for row in rows)),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of tracks."""
+        return len(self.name)
+
+    def __getitem__(self, position: int) -> ReaperTrack:
+        """Return the row of the track at a position of the table."""
+        return ReaperTrack(
+            self.index[position],
+            self.name[position],
+            self.flags[position],
+            self.volume[position],
+            self.pan[position],
+            self.last_meter_peak[position],
+            self.last_meter_pos[position],
+            f"#{self.color[position]:06x}",
+        )
+
+    def __iter__(self) -> Iterator[ReaperTrack]:
+        """Return the rows of all tracks."""
+        return map(self.__getitem__, range(len(self.name)))
+
+    def __eq__(self, other: object) -> bool:
+        """Return if two tables hold the same tracks."""
+        if not isinstance(other, ReaperTrackTable):
+            return NotImplemented
+        return all(
+            getattr(self, column) == getattr(other, column)
+            for column in ReaperTrack.__slots__
+        )
+
+    def __hash__(self) -> int:
+        """Return the hash of the track names and flags."""
+        return hash((self.name, self.flags.tobytes()))
+
+    @property
+    def keys(self) -> tuple[str, ...]:
+        """Return the track keys, see `track_keys`."""
+        if self._keys is None:
+            self._keys = track_keys(self.name)
+        return self._keys
+
+    def mask(self, flag: int) -> bytes:
+        """Return a byte per track, 1 if a flag bit (one of `FLAG_*`) is set.
+
+        The byte of the flags column holding the bit is sliced out of the
+        array and mapped to 0 or 1 with `bytes.translate`, both of which run
+        over the whole column at once.
+        """
+        if (mask := self._flag_masks.get(flag)) is None:
+            bit = flag.bit_length() - 1
+            size = self.flags.itemsize
+            offset = bit // 8 if sys.byteorder == "little" else size - 1 - bit // 8
+            mask = self._flag_masks[flag] = self.flags.tobytes()[
+                offset::size
+            ].translate(_BIT_TABLES[bit % 8])
+        return mask
+
+    def count(self, flag: int) -> int:
+        """Return the number of tracks with a flag bit set."""
+        return self.mask(flag).count(1)
+
+    def indexes(self, flag: int) -> tuple[int, ...]:
+        """Return the positions of the tracks with a flag bit set."""
+        return tuple(compress(range(len(self.name)), self.mask(flag)))
+
+    def names(self, flag: int) -> tuple[str, ...]:
+        """Return the names of the tracks with a flag bit set."""
+        return tuple(compress(self.name, self.mask(flag)))
+
+    def with_rows(self, rows: Mapping[int, ReaperTrack]) -> ReaperTrackTable:
+        """Return a copy of the table with some rows replaced, by position."""
+        names = list(self.name)
+        table = ReaperTrackTable(
+            self.index[:],
+            self.name,
+            self.flags[:],
+            self.volume[:],
+            self.pan[:],
+            self.last_meter_peak[:],
+            self.last_meter_pos[:],
+            self.color[:],
+        )
+        for position, row in rows.items():
+            names[position] = row.name
+            table.index[position] = row.index
+            table.flags[position] = row.flags
+            table.volume[position] = row.volume
+            table.pan[position] = row.pan
+            table.last_meter_peak[position] = row.last_meter_peak
+            table.last_meter_pos[position] = row.last_meter_pos
+            table.color[position] = int(row.color[1:], 16)
+        table.name = tuple(names)
+        return table
+
+
+@dataclass(frozen=True)
+class ReaperMarker:
+    """Marker or region of a REAPER project, positions in seconds.
+
+    Markers have no end.
+    """
+
+    __slots__ = ("id", "name", "position", "end", "color")
+
+    id: int
+    name: str
+    position: float
+    end: float | None
+    color: str
+
+    @property
+    def is_region(self) -> bool:
+        """Return True if this is a region."""
+        return self.end is not None
+
+
+class ReaperMarkerIndex:
+    """Markers and regions of a project, sorted by position.
+
+    Every lookup bisects a sorted list of positions, so finding the region
+    or the next marker at the playhead costs the same however many markers
+    the project has.
+    """
+
+    __slots__ = (
+        "markers",
+        "regions",
+        "_by_id",
+        "_positions",
+        "_region_starts",
+        "_region_reach",
+        "_boundaries",
+    )
+
+    def __init__(self, markers: Iterable[ReaperMarker] = ()) -> None:
+        """Initialize."""
+        self.markers = tuple(sorted(markers, key=lambda marker: marker.position))
+        self.regions = tuple(marker for marker in self.markers if marker.is_region)
+        self._by_id = {(marker.is_region, marker.id): marker for marker in self.markers}
+        self._positions = [marker.position for marker in self.markers]
+        self._region_starts = [region.position for region in self.regions]
+        # Furthest end of any region starting at or before each region
+        self._region_reach = list(
+            accumulate((region.end or 0.0 for region in self.regions), max)
+        )
+        self._boundaries = sorted(
+            {region.position for region in self.regions}
+            | {region.end or 0.0 for region in self.regions}
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Return if two indexes hold the same markers."""
+        if not isinstance(other, ReaperMarkerIndex):
+            return NotImplemented
+        return self.markers == other.markers
+
+    def __hash__(self) -> int:
+        """Return the hash of the markers."""
+        return hash(self.markers)
+
+    def __len__(self) -> int:
+        """Return the number of markers and regions."""
+        return len(self.markers)
+
+    def get(self, region: bool, marker_id: int) -> ReaperMarker | None:
+        """Return a region or marker by its ID."""
+        return self._by_id.get((region, marker_id))
+
+    def region_at(self, position: float) -> ReaperMarker | None:
+        """Return the region playing at a position.
+
+        Of nested or overlapping regions, the one that started last wins.
+        """
+        index = bisect_right(self._region_starts, position) - 1
+        while index >= 0 and self._region_reach[index] > position:
+            region = self.regions[index]
+            if region.end is not None and region.end > position:
+                return region
+            index -= 1
+        return None
+
+    def next_marker(self, position: float) -> ReaperMarker | None:
+        """Return the first marker or region starting after a position."""
+        index = bisect_right(self._positions, position)
+        return self.markers[index] if index < len(self.markers) else None
+
+    def previous_marker(self, position: float) -> ReaperMarker | None:
+        """Return the last marker or region starting before a position."""
+        index = bisect_left(self._positions, position) - 1
+        return self.markers[index] if index >= 0 else None
+
+    def next_boundary(self, position: float) -> float | None:
+        """Return the next position after which another region plays."""
+        index = bisect_right(self._boundaries, position)
+        return self._boundaries[index] if index < len(self._boundaries) else None
+
+
+@dataclass(frozen=True)
+class ReaperSnapshot:
+    """Immutable view of a single REAPER status poll."""
+
+    __slots__ = (
+        "play_state",
+        "metronome",
+        "repeat",
+        "time_signature",
+        "number_of_tracks",
+        "transport",
+        "beatpos",
+        "tracks",
+        "armed_tracks",
+        "track_keys",
+        "track_index",
+        "markers",
+    )
+
+    play_state: str
+    metronome: bool
+    repeat: bool
+    time_signature: str
+    number_of_tracks: int
+    transport: ReaperTransport
+    beatpos: ReaperBeatPosition
+    tracks: ReaperTrackTable
+    armed_tracks: tuple[str, ...]
+    track_keys: tuple[str, ...]
+    track_index: Mapping[str, int]
+    markers: ReaperMarkerIndex
+
+    @property
+    def number_of_armed_tracks(self) -> int:
+        """Return the number of tracks armed for recording."""
+        return len(self.armed_tracks)
+
+    def changed_keys(self, previous: ReaperSnapshot | None) -> frozenset[str]:
+        """Return the keys whose values differ from a previous snapshot."""
+        if previous is None:
+            return frozenset(SNAPSHOT_KEYS) | self._track_changes(None)
+
+        changed = {
+            key for key in SNAPSHOT_KEYS if getattr(self, key) != getattr(previous, key)
+        }
+        if "tracks" in changed:
+            changed |= self._track_changes(previous)
+        return frozenset(changed)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the snapshot as JSON serializable data, rows as lists."""
+        return {
+            "play_state": self.play_state,
+            "metronome": self.metronome,
+            "repeat": self.repeat,
+            "time_signature": self.time_signature,
+            "number_of_tracks": self.number_of_tracks,
+            "transport": _row(self.transport),
+            "beatpos": _row(self.beatpos),
+            "tracks": [_row(track) for track in self.tracks],
+            "markers": [_row(marker) for marker in self.markers.markers],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> ReaperSnapshot:
+        """Return a snapshot from the data of `as_dict`."""
+        return cls(
+            play_state=data["play_state"],
+            metronome=data["metronome"],
+            repeat=data["repeat"],
+            time_signature=data["time_signature"],
+            number_of_tracks=data["number_of_tracks"],
+            transport=ReaperTransport(*data["transport"]),
+            beatpos=ReaperBeatPosition(*data["beatpos"]),
+            markers=ReaperMarkerIndex(
+                ReaperMarker(*row) for row in data.get("markers", ())
+            ),
+            **_track_fields(
+                ReaperTrackTable.from_rows(ReaperTrack(*row) for row in data["tracks"])
+            ),
+        )
+
+    def with_tracks(self, tracks: ReaperTrackTable) -> ReaperSnapshot:
+        """Return this snapshot with the tracks of a separate track fetch."""
+        return replace(self, **_track_fields(tracks))
+
+    def with_markers(self, markers: ReaperMarkerIndex) -> ReaperSnapshot:
+        """Return this snapshot with the markers of a separate marker fetch."""
+        return replace(self, markers=markers)
+
+    def track(self, key: str) -> ReaperTrack | None:
+        """Return the track with a track key, if it is still in the project."""
+        index = self.track_index.get(key)
+        return None if index is None else self.tracks[index]
+
+    def _track_changes(self, previous: ReaperSnapshot | None) -> set[str]:
+        """Return the `track/<key>/<column>` keys that changed.
+
+        Columns are compared whole first, so a poll that only moved the
+        meters costs one array comparison per column.
+        """
+        keys = self.track_keys
+        changed = set()
+        for column, attributes in TRACK_COLUMNS.items():
+            positions: set[int] = set()
+            for attribute in attributes:
+                values = getattr(self.tracks, attribute)
+                if previous is None:
+                    positions.update(range(len(values)))
+                    continue
+                old = getattr(previous.tracks, attribute)
+                if previous.track_keys == keys:
+                    if values != old:
+                        positions.update(
+                            position
+                            for position, (value, old_value) in enumerate(
+                                zip(values, old)
+                            )
+                            if value != old_value
+                        )
+                    continue
+                for position, key in enumerate(keys):
+                    index = previous.track_index.get(key)
+                    if index is None or old[index] != values[position]:
+                        positions.add(position)
+            changed.update(f"track/{keys[position]}/{column}" for position in positions)
+        return changed
+
+
+def track_keys(names: Iterable[str]) -> tuple[str, ...]:
+    """Return stable keys for tracks, in project order.
+
+    The web interface has no track GUID, so a track is identified by its
+    name, with a `#<n>` suffix for the n-th track sharing that name. Keys
+    survive tracks being added, removed or reordered around it.
+    """
+    seen: dict[str, int] = {}
+    keys = []
+    for name in names:
+        count = seen[name] = seen.get(name, 0) + 1
+        keys.append(name if count == 1 else f"{name}#{count}")
+    return tuple(keys)
+
+
+def _row(section: Any) -> list[Any]:
+    """Return the fields of a snapshot section in order."""
+    return [getattr(section, field) for field in section.__slots__]
+
+
+def _track_fields(tracks: ReaperTrackTable) -> dict[str, Any]:
+    """Return the snapshot fields derived from a track table."""
+    keys = tracks.keys
+    return {
+        "tracks": tracks,
+        "armed_tracks": tracks.names(FLAG_RECORD_ARMED),
+        "track_keys": keys,
+        "track_index": {key: index for index, key in enumerate(keys)},
+    }
+
+
+class ReaperStatusParser:
+    """Build a snapshot from the tab-separated lines of a status response.
+
+    Lines are fed one at a time as they arrive, so a response never has to
+    be held in memory or re-encoded before it is turned into a snapshot.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._number_of_tracks = 0
+        self._transport: ReaperTransport | None = None
+        self._beatpos: ReaperBeatPosition | None = None
+        self._time_signature = ""
+        self._cmdstate: dict[str, bool] = {}
+        # Only created by the first TRACK line, most polls have none
+        self._table: ReaperTrackTable | None = None
+        self._track_names: list[str] = []
+        self._markers: list[ReaperMarker] | None = None
+        self._handlers: Mapping[str, Callable[[list[str]], None]] = {
+            "NTRACK": self._parse_ntrack,
+            "TRANSPORT": self._parse_transport,
+            "BEATPOS": self._parse_beatpos,
+            "CMDSTATE": self._parse_cmdstate,
+            "TRACK": self._parse_track,
+            "MARKER_LIST": self._parse_marker_list,
+            "REGION_LIST": self._parse_marker_list,
+            "MARKER": self._parse_marker,
+            "REGION": self._parse_region,
+        }
+
+    def feed(self, line: str) -> None:
+        """Parse a single line of the response."""
+        fields = line.rstrip("\r\n").split("\t")
+        handler = self._handlers.get(fields[0])
+        if handler is not None:
+            handler(fields)
+
+    def tracks(self) -> ReaperTrackTable:
+        """Return the track table of all lines fed so far."""
+        if (table := self._table) is None:
+            table = self._table = ReaperTrackTable()
+        table.name = tuple(self._track_names)
+        return table
+
+    def markers(self) -> ReaperMarkerIndex:
+        """Return the markers and regions of all lines fed so far."""
+        return ReaperMarkerIndex(self._markers or ())
+
+    def snapshot(
+        self,
+        tracks: ReaperTrackTable | None = None,
+        markers: ReaperMarkerIndex | None = None,
+    ) -> ReaperSnapshot:
+        """Return the snapshot of all lines fed so far.
+
+        A response without a TRACK section takes the given tracks instead,
+        so the transport can be polled without the track table. The same
+        goes for the given markers and a response without marker lists.
+        """
+        if self._transport is None or self._beatpos is None:
+            raise ValueError("Status response is missing TRANSPORT or BEATPOS")
+
+        if tracks is None or self._track_names:
+            tracks = self.tracks()
+        if markers is None or self._markers is not None:
+            markers = self.markers()
+        return ReaperSnapshot(
+            play_state=self._transport.play_state,
+            metronome=self._cmdstate.get(CMD_METRONOME, False),
+            repeat=self._cmdstate.get(CMD_REPEAT, self._transport.repeat),
+            time_signature=self._time_signature,
+            number_of_tracks=self._number_of_tracks,
+            transport=self._transport,
+            beatpos=self._beatpos,
+            markers=markers,
+            **_track_fields(tracks),
+        )
+
+    def _parse_ntrack(self, fields: list[str]) -> None:
+        self._number_of_tracks = int(fields[1])
+
+    def _parse_transport(self, fields: list[str]) -> None:
+        self._transport = ReaperTransport(
+            PLAY_STATES[fields[1]],
+            float(fields[2]),
+            fields[3] == "1",
+            fields[4],
+            fields[5],
+        )
+
+    def _parse_beatpos(self, fields: list[str]) -> None:
+        self._beatpos = ReaperBeatPosition(
+            float(fields[2]),
+            float(fields[3]),
+            int(fields[4]),
+            float(fields[5]),
+        )
+        self._time_signature = f"{fields[6]}/{fields[7]}"
+
+    def _parse_cmdstate(self, fields: list[str]) -> None:
+        self._cmdstate[fields[1]] = fields[2] == "1"
+
+    def _parse_track(self, fields: list[str]) -> None:
+        if (table := self._table) is None:
+            table = self._table = ReaperTrackTable()
+        table.index.append(int(fields[1]))
+        self._track_names.append(fields[2])
+        table.flags.append(int(fields[3]))
+        table.volume.append(float(fields[4]))
+        table.pan.append(float(fields[5]))
+        table.last_meter_peak.append(int(fields[6]))
+        table.last_meter_pos.append(int(fields[7]))
+        table.color.append(int(fields[13]) & 0xFFFFFF)
+
+    def _parse_marker_list(self, fields: list[str]) -> None:
+        self._marker_list()
+
+    def _parse_marker(self, fields: list[str]) -> None:
+        self._marker_list().append(
+            ReaperMarker(
+                int(fields[2]),
+                fields[1],
+                float(fields[3]),
+                None,
+                f"#{int(fields[4]) & 0xFFFFFF:06x}",
+            )
+        )
+
+    def _parse_region(self, fields: list[str]) -> None:
+        self._marker_list().append(
+            ReaperMarker(
+                int(fields[2]),
+                fields[1],
+                float(fields[3]),
+                float(fields[4]),
+                f"#{int(fields[5]) & 0xFFFFFF:06x}",
+            )
+        )
+
+    def _marker_list(self) -> list[ReaperMarker]:
+        """Return the markers, seen as soon as a marker or region list starts."""
+        if self._markers is None:
+            self._markers = []
+        return self._markers
+
+
+def parse_status(payload: str) -> ReaperSnapshot:
+    """Parse a complete status response."""
+    parser = ReaperStatusParser()
+    for line in payload.splitlines():
+        parser.feed(line)
+    return parser.snapshot()
@@ -0,0 +1,77 @@
+"""Reaper number entities."""
+from __future__ import annotations
+
+import math
+
+from homeassistant.components.number import NumberEntity, NumberEntityDescription
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import ReaperDataUpdateCoordinator
+from .const import DOMAIN
+from .entity import ReaperTrackEntity, async_setup_track_entities
+
+# REAPER shows anything below -150 dB as -inf
+MIN_VOLUME_DB = -150.0
+MAX_VOLUME_DB = 12.0
+
+TRACK_VOLUME = NumberEntityDescription(
+    key="volume",
+    name="volume",
+    icon="mdi:volume-high",
+    native_min_value=MIN_VOLUME_DB,
+    native_max_value=MAX_VOLUME_DB,
+    native_step=0.1,
+    native_unit_of_measurement="dB",
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the Reaper track volume numbers."""
+    coordinator: ReaperDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async_setup_track_entities(
+        coordinator,
+        entry,
+        async_add_entities,
+        lambda key: (ReaperTrackVolumeNumber(coordinator, key, TRACK_VOLUME),),
+    )
+
+
+def volume_to_db(volume: float) -> float:
+    """Convert a REAPER volume gain to decibels."""
+    if volume <= 0:
+        return MIN_VOLUME_DB
+    return max(MIN_VOLUME_DB, round(20 * math.log10(volume), 2))
+
+
+def db_to_volume(db: float) -> float:
+    """Convert decibels to a REAPER volume gain."""
+    if db <= MIN_VOLUME_DB:
+        return 0.0
+    return float(10 ** (db / 20))
+
+
+class ReaperTrackVolumeNumber(ReaperTrackEntity, NumberEntity):
+    """Volume fader of a REAPER track."""
+
+    track_columns = ("volume",)
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the track volume in decibels."""
+        if (track := self.track) is None:
+            return None
+        return volume_to_db(track.volume)
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Set the track volume in decibels."""
+        if (track := self.track) is None:
+            return
+        await self.coordinator.async_send_command(
+            f"SET/TRACK/{track.index}/VOL/{db_to_volume(value):.6f}"
+        )
+        await self.coordinator.async_request_reconcile()
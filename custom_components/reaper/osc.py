@@ -0,0 +1,353 @@
+"""OSC push updates for the Reaper integration."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+import logging
+import math
+import socket
+import struct
+from time import monotonic
+from typing import Any, Callable, Final, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    FLAG_MUTED,
+    FLAG_RECORD_ARMED,
+    FLAG_SOLO_IN_PLACE,
+    FLAG_SOLOED,
+    PLAY_STATE_PAUSED,
+    PLAY_STATE_PLAYING,
+    PLAY_STATE_RECORD_PAUSED,
+    PLAY_STATE_RECORDING,
+    PLAY_STATE_STOPPED,
+)
+from .models import ReaperSnapshot, ReaperTrack
+
+_LOGGER = logging.getLogger(__name__)
+
+OscMessage = Tuple[str, Tuple[Any, ...]]
+
+# Bundles nested deeper than this are rejected
+MAX_BUNDLE_DEPTH: Final = 8
+# REAPER reports anything below -150 dB as silence
+VOLUME_FLOOR_DB: Final = -150.0
+# Seconds after the last packet that a host still counts as pushing
+PUSH_LIVE_WINDOW: Final = 5
+
+_BUNDLE: Final = b"#bundle\0"
+_INT32 = struct.Struct(">i")
+_UINT32 = struct.Struct(">I")
+_ARGUMENTS: Final[dict[str, struct.Struct]] = {
+    "i": _INT32,
+    "f": struct.Struct(">f"),
+    "h": struct.Struct(">q"),
+    "d": struct.Struct(">d"),
+    "t": struct.Struct(">Q"),
+    "c": _UINT32,
+    "r": _UINT32,
+    "m": _UINT32,
+}
+_CONSTANTS: Final[dict[str, Any]] = {
+    "T": True,
+    "F": False,
+    "N": None,
+    "I": math.inf,
+}
+
+# Playing, paused and recording flags of each play state
+PLAY_FLAGS: Final[dict[str, tuple[bool, bool, bool]]] = {
+    PLAY_STATE_STOPPED: (False, False, False),
+    PLAY_STATE_PLAYING: (True, False, False),
+    PLAY_STATE_PAUSED: (False, True, False),
+    PLAY_STATE_RECORDING: (True, False, True),
+    PLAY_STATE_RECORD_PAUSED: (False, True, True),
+}
+# Track flags set and cleared by the toggles of the default OSC pattern
+TRACK_FLAG_ADDRESSES: Final[dict[str, tuple[int, int]]] = {
+    "mute": (FLAG_MUTED, FLAG_MUTED),
+    "solo": (FLAG_SOLOED, FLAG_SOLOED | FLAG_SOLO_IN_PLACE),
+    "recarm": (FLAG_RECORD_ARMED, FLAG_RECORD_ARMED),
+}
+
+
+def decode_packet(data: bytes) -> list[OscMessage]:
+    """Return the messages of an OSC packet, flattening bundles.
+
+    Raises ValueError or struct.error for a malformed packet.
+    """
+    messages: list[OscMessage] = []
+    _decode(data, messages, 0)
+    return messages
+
+
+def _decode(data: bytes, messages: list[OscMessage], depth: int) -> None:
+    if data.startswith(_BUNDLE):
+        if depth >= MAX_BUNDLE_DEPTH:
+            raise ValueError("OSC bundles nested too deep")
+        # Elements follow the bundle tag and its 8 byte time tag
+        offset = 16
+        while offset < len(data):
+            (size,) = _INT32.unpack_from(data, offset)
+            offset += 4
+            if size < 0 or offset + size > len(data):
+                raise ValueError("Truncated OSC bundle element")
+            _decode(data[offset : offset + size], messages, depth + 1)
+            offset += size
+        return
+
+    address, offset = _read_string(data, 0)
+    if not address.startswith("/"):
+        raise ValueError(f"Invalid OSC address {address!r}")
+    if offset >= len(data):
+        messages.append((address, ()))
+        return
+    tags, offset = _read_string(data, offset)
+    if not tags.startswith(","):
+        raise ValueError(f"Invalid OSC type tags {tags!r}")
+
+    arguments: list[Any] = []
+    for tag in tags[1:]:
+        if (argument := _ARGUMENTS.get(tag)) is not None:
+            arguments.append(argument.unpack_from(data, offset)[0])
+            offset += argument.size
+        elif tag in _CONSTANTS:
+            arguments.append(_CONSTANTS[tag])
+        elif tag in "sS":
+            value, offset = _read_string(data, offset)
+            arguments.append(value)
+        elif tag == "b":
+            (size,) = _INT32.unpack_from(data, offset)
+            if size < 0 or offset + 4 + size > len(data):
+                raise ValueError("Truncated OSC blob")
+            arguments.append(data[offset + 4 : offset + 4 + size])
+            offset += 4 + -(-size // 4) * 4
+        else:
+            raise ValueError(f"Unsupported OSC type tag {tag!r}")
+    messages.append((address, tuple(arguments)))
+
+
+def _read_string(data: bytes, offset: int) -> tuple[str, int]:
+    """Return a null terminated string and the offset after its padding."""
+    end = data.index(b"\0", offset)
+    return (
+        data[offset:end].decode(errors="replace"),
+        offset + (end - offset) // 4 * 4 + 4,
+    )
+
+
+def apply_messages(
+    snapshot: ReaperSnapshot, messages: list[OscMessage]
+) -> tuple[ReaperSnapshot, bool]:
+    """Return a snapshot with pushed messages applied.
+
+    Messages follow the default OSC pattern of REAPER: `/play`, `/pause`,
+    `/stop` and `/record` toggles, `/repeat`, `/click` (the metronome),
+    `/time`, `/time/str`, `/beat/str`, and the `volume/db`, `mute`, `solo`,
+    `recarm` and `name` of `/master` and `/track/<n>`. Anything else is
+    ignored. Also returns if the track table has to be refetched, which is
+    when a pushed track name differs from the cached one: the pushed track
+    numbers no longer match the cached table, so the track changes of
+    those messages are dropped.
+    """
+    playing, paused, recording = PLAY_FLAGS[snapshot.play_state]
+    fields: dict[str, Any] = {}
+    transport: dict[str, Any] = {}
+    beatpos: dict[str, Any] = {}
+    tracks: dict[int, ReaperTrack] = {}
+    resync = False
+
+    for address, arguments in messages:
+        if not arguments:
+            continue
+        value = arguments[0]
+        parts = address.split("/")
+        try:
+            if address == "/play":
+                playing = _flag(value)
+            elif address == "/pause":
+                paused = _flag(value)
+            elif address == "/record":
+                recording = _flag(value)
+            elif address == "/stop":
+                if _flag(value):
+                    playing = paused = recording = False
+            elif address == "/repeat":
+                fields["repeat"] = transport["repeat"] = _flag(value)
+            elif address == "/click":
+                fields["metronome"] = _flag(value)
+            elif address == "/time":
+                position = float(value)
+                transport["position_seconds"] = beatpos["position_seconds"] = position
+            elif address == "/time/str":
+                transport["position_string"] = str(value)
+            elif address == "/beat/str":
+                transport["position_string_beats"] = str(value)
+                beatpos.update(_beat_position(str(value), snapshot.time_signature))
+            elif parts[1] == "master" or (parts[1] == "track" and len(parts) > 3):
+                index = 0 if parts[1] == "master" else int(parts[2])
+                column = "/".join(parts[2 if parts[1] == "master" else 3 :])
+                if not 0 <= index < len(snapshot.tracks):
+                    continue
+                track = tracks.get(index, snapshot.tracks[index])
+                if column == "name":
+                    resync = resync or (index > 0 and str(value) != track.name)
+                elif column == "volume/db":
+                    tracks[index] = replace(track, volume=_gain(float(value)))
+                elif (flags := TRACK_FLAG_ADDRESSES.get(column)) is not None:
+                    set_flags, clear_flags = flags
+                    tracks[index] = replace(
+                        track,
+                        flags=track.flags | set_flags
+                        if _flag(value)
+                        else track.flags & ~clear_flags,
+                    )
+        except (TypeError, ValueError) as error:
+            _LOGGER.debug("Ignoring OSC message %s %s: %s", address, arguments, error)
+
+    play_state = _play_state(playing, paused, recording)
+    if play_state != snapshot.play_state:
+        fields["play_state"] = transport["play_state"] = play_state
+    if transport:
+        fields["transport"] = replace(snapshot.transport, **transport)
+    if beatpos:
+        fields["beatpos"] = replace(snapshot.beatpos, **beatpos)
+    fields = {
+        key: value for key, value in fields.items() if getattr(snapshot, key) != value
+    }
+    if not resync and any(
+        track != snapshot.tracks[index] for index, track in tracks.items()
+    ):
+        snapshot = snapshot.with_tracks(snapshot.tracks.with_rows(tracks))
+    if fields:
+        snapshot = replace(snapshot, **fields)
+    return snapshot, resync
+
+
+def _flag(value: Any) -> bool:
+    """Return the state of a toggle, sent as a float, int or boolean."""
+    return bool(value) if isinstance(value, bool) else float(value) >= 0.5
+
+
+def _gain(db: float) -> float:
+    """Return the linear gain the web interface reports for a volume in dB."""
+    return 0.0 if db <= VOLUME_FLOOR_DB else 10 ** (db / 20)
+
+
+def _play_state(playing: bool, paused: bool, recording: bool) -> str:
+    if recording:
+        return PLAY_STATE_RECORD_PAUSED if paused else PLAY_STATE_RECORDING
+    if paused:
+        return PLAY_STATE_PAUSED
+    return PLAY_STATE_PLAYING if playing else PLAY_STATE_STOPPED
+
+
+def _beat_position(beats: str, time_signature: str) -> dict[str, Any]:
+    """Return the beat position fields of a `measure.beat.fraction` string."""
+    measure, beat, *fraction = beats.split(".")
+    beats_in_measure = (
+        int(beat) - 1 + (int(fraction[0]) / 10 ** len(fraction[0]) if fraction else 0.0)
+    )
+    measure_count = int(measure) - 1
+    numerator = int(time_signature.partition("/")[0] or 4)
+    return {
+        "full_beat_position": measure_count * numerator + beats_in_measure,
+        "measure_count": measure_count,
+        "beats_in_measure": beats_in_measure,
+    }
+
+
+class ReaperOscListener(asyncio.DatagramProtocol):
+    """Receive the OSC messages a REAPER host pushes over UDP.
+
+    Datagrams from other addresses than the host's are dropped, unless its
+    hostname cannot be resolved. Every packet is decoded and handed over in
+    one call, so the messages of a bundle end up in a single update.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        hostname: str,
+        port: int,
+        on_messages: Callable[[list[OscMessage]], None],
+    ) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._hostname = hostname
+        self._port = port
+        self._on_messages = on_messages
+        self._sources: frozenset[str] | None = None
+        self._transport: asyncio.DatagramTransport | None = None
+        self.received_at: float | None = None
+        self.datagrams = 0
+        self.messages = 0
+        self.rejected = 0
+        self.malformed = 0
+
+    @property
+    def port(self) -> int:
+        """Return the port listened on."""
+        if self._transport is None:
+            return self._port
+        return int(self._transport.get_extra_info("sockname")[1])
+
+    def live(self, now: float) -> bool:
+        """Return if the host pushed within the live window before a monotonic time."""
+        return (
+            self.received_at is not None and now - self.received_at < PUSH_LIVE_WINDOW
+        )
+
+    async def async_start(self) -> None:
+        """Start listening, raising OSError if the port cannot be bound."""
+        loop = self._hass.loop
+        try:
+            addresses = await loop.getaddrinfo(
+                self._hostname, None, type=socket.SOCK_DGRAM
+            )
+        except OSError as error:
+            _LOGGER.debug(
+                "Accepting OSC from any address, cannot resolve %s: %s",
+                self._hostname,
+                error,
+            )
+        else:
+            self._sources = frozenset(address[4][0] for address in addresses)
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: self, local_addr=("0.0.0.0", self._port)
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def datagram_received(self, data: bytes, addr: tuple[Any, ...]) -> None:
+        """Decode a packet and hand its messages over."""
+        if self._sources is not None and addr[0] not in self._sources:
+            self.rejected += 1
+            return
+        try:
+            messages = decode_packet(data)
+        except (ValueError, struct.error) as error:
+            self.malformed += 1
+            _LOGGER.debug("Dropping malformed OSC packet from %s: %s", addr[0], error)
+            return
+        self.datagrams += 1
+        self.messages += len(messages)
+        self.received_at = monotonic()
+        if messages:
+            self._on_messages(messages)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the listener counters for diagnostics."""
+        return {
+            "port": self.port,
+            "datagrams": self.datagrams,
+            "messages": self.messages,
+            "rejected": self.rejected,
+            "malformed": self.malformed,
+        }
@@ -0,0 +1,85 @@
+"""Polling policy for the Reaper integration."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+import random
+from typing import Final, Mapping
+
+from .const import (
+    PLAY_STATE_PLAYING,
+    PLAY_STATE_RECORDING,
+    POLLING_PROFILE_BALANCED,
+    POLLING_PROFILE_ECO,
+    POLLING_PROFILE_FIXED,
+    POLLING_PROFILE_RESPONSIVE,
+)
+
+ROLLING_PLAY_STATES: Final = frozenset({PLAY_STATE_PLAYING, PLAY_STATE_RECORDING})
+# Seconds between the consistency polls of a host that pushes its state
+PUSH_SWEEP_INTERVAL: Final = 60
+
+
+@dataclass(frozen=True)
+class PollingProfile:
+    """Poll intervals, in seconds, for each state of a REAPER host.
+
+    `tracks` is the longest time the track table may go without a refresh.
+    It is fetched with the next transport poll after that.
+    """
+
+    __slots__ = ("rolling", "stopped", "unreachable", "unreachable_max", "tracks")
+
+    rolling: float
+    stopped: float
+    unreachable: float
+    unreachable_max: float
+    tracks: float
+
+
+POLLING_PROFILES: Final[Mapping[str, PollingProfile | None]] = {
+    POLLING_PROFILE_RESPONSIVE: PollingProfile(0.5, 5, 5, 300, 10),
+    POLLING_PROFILE_BALANCED: PollingProfile(1, 15, 10, 600, 30),
+    POLLING_PROFILE_ECO: PollingProfile(5, 60, 30, 1800, 120),
+    # Built from the configured update interval
+    POLLING_PROFILE_FIXED: None,
+}
+
+
+class ReaperPollingPolicy:
+    """Pick the next poll interval from transport state and reachability."""
+
+    def __init__(self, profile: str, update_interval: float) -> None:
+        """Initialize."""
+        self.profile = POLLING_PROFILES.get(profile) or PollingProfile(
+            update_interval, update_interval, update_interval, update_interval, 0
+        )
+
+    def interval(self, play_state: str | None, pushed: bool = False) -> timedelta:
+        """Return the poll interval for a reachable host.
+
+        A host that pushes its state over OSC is only polled to catch what
+        the pushes do not cover, or missed.
+        """
+        if pushed:
+            return timedelta(seconds=max(PUSH_SWEEP_INTERVAL, self.profile.stopped))
+        if play_state in ROLLING_PLAY_STATES:
+            return timedelta(seconds=self.profile.rolling)
+        return timedelta(seconds=self.profile.stopped)
+
+    def tracks_due(self, fetched_at: float, now: float) -> bool:
+        """Return if a track table fetched at a monotonic time is due."""
+        return now - fetched_at >= self.profile.tracks
+
+    def backoff(self, failures: int) -> timedelta:
+        """Return the poll interval after a number of consecutive failures.
+
+        The delay doubles with every failure up to the profile maximum, and
+        half of it is randomized so that hosts which went down together do
+        not come back in lockstep.
+        """
+        delay = min(
+            self.profile.unreachable_max,
+            self.profile.unreachable * 2 ** max(failures - 1, 0),
+        )
+        return timedelta(seconds=delay / 2 + random.uniform(0, delay / 2))
@@ -0,0 +1,86 @@
+"""Mixer scenes for the Reaper integration."""
+from __future__ import annotations
+
+from typing import Any, Dict, Final, List
+
+from homeassistant.helpers.storage import Store
+
+from .const import FLAG_MUTED, FLAG_RECORD_ARMED, FLAG_SOLOED
+from .models import ReaperSnapshot
+
+SCENE_STORAGE_VERSION: Final = 1
+
+# Volume (gain), pan, mute, solo and record arm of each track key
+ReaperScene = Dict[str, List[Any]]
+
+# Scene flags in row order and the track setting each one sets
+SCENE_FLAGS = (
+    (FLAG_MUTED, "MUTE"),
+    (FLAG_SOLOED, "SOLO"),
+    (FLAG_RECORD_ARMED, "RECARM"),
+)
+
+
+def capture_scene(snapshot: ReaperSnapshot) -> ReaperScene:
+    """Return the mixer settings of every track of a snapshot."""
+    tracks = snapshot.tracks
+    return {
+        key: [
+            tracks.volume[index],
+            tracks.pan[index],
+            *(bool(tracks.flags[index] & flag) for flag, _ in SCENE_FLAGS),
+        ]
+        for index, key in enumerate(snapshot.track_keys)
+    }
+
+
+def scene_commands(
+    snapshot: ReaperSnapshot, scene: ReaperScene
+) -> tuple[list[str], list[str]]:
+    """Return the commands that restore a scene, and its tracks that are gone.
+
+    Only the settings that differ from the snapshot are set. Tracks are
+    matched by key, so a scene still applies after tracks were added,
+    removed or moved around.
+    """
+    tracks = snapshot.tracks
+    commands: list[str] = []
+    missing: list[str] = []
+    for key, (volume, pan, *flags) in scene.items():
+        if (index := snapshot.track_index.get(key)) is None:
+            missing.append(key)
+            continue
+        if f"{volume:.6f}" != f"{tracks.volume[index]:.6f}":
+            commands.append(f"SET/TRACK/{index}/VOL/{volume:.6f}")
+        if f"{pan:.6f}" != f"{tracks.pan[index]:.6f}":
+            commands.append(f"SET/TRACK/{index}/PAN/{pan:.6f}")
+        for (flag, setting), value in zip(SCENE_FLAGS, flags):
+            if value != bool(tracks.flags[index] & flag):
+                commands.append(f"SET/TRACK/{index}/{setting}/{int(value)}")
+    return commands, missing
+
+
+class ReaperScenes:
+    """Mixer scenes of a REAPER host, kept in Home Assistant storage."""
+
+    def __init__(self, store: Store[dict[str, Any]]) -> None:
+        """Initialize."""
+        self._store = store
+        self._scenes: dict[str, ReaperScene] | None = None
+
+    async def async_load(self) -> dict[str, ReaperScene]:
+        """Return the scenes by name, loading them on first use."""
+        if self._scenes is None:
+            data = await self._store.async_load()
+            self._scenes = {} if data is None else data["scenes"]
+        return self._scenes
+
+    async def async_capture(self, name: str, snapshot: ReaperSnapshot) -> None:
+        """Store the mixer settings of a snapshot as a scene."""
+        scenes = await self.async_load()
+        scenes[name] = capture_scene(snapshot)
+        await self._store.async_save({"scenes": scenes})
+
+    async def async_get(self, name: str) -> ReaperScene | None:
+        """Return a scene, if there is one with that name."""
+        return (await self.async_load()).get(name)
@@ -1,23 +1,165 @@
 """Support for the Reaper service."""
 from __future__ import annotations
 
-import json
+from dataclasses import dataclass
+from hashlib import blake2s
 import logging
-from typing import Any, cast
+from time import monotonic
+from typing import Any, Callable, Final, Sequence, cast
 
-from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ATTR_ATTRIBUTION
+from homeassistant.const import (
+    ATTR_ATTRIBUTION,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import ReaperDataUpdateCoordinator
+from .breaker import BREAKER_STATES
 from .const import ATTRIBUTION, DOMAIN, SENSORS
+from .entity import ReaperTrackEntity, async_setup_track_entities
+from .instrumentation import LatencyHistogram, ReaperInstrumentation
+from .meters import ReaperMeterStats
 
 PARALLEL_UPDATES = 1
 
+ATTR_ARMED_TRACKS: Final = "armed_tracks"
+# Names kept in a track list attribute, the `get_tracks` service of the media
+# player returns all of them
+MAX_LIST_ATTRIBUTE_ITEMS: Final = 32
+
+TRACK_PEAK = SensorEntityDescription(
+    key="peak",
+    name="peak",
+    icon="mdi:waveform",
+    native_unit_of_measurement="dB",
+)
+
+CONNECTION = SensorEntityDescription(
+    key="connection",
+    name="Connection",
+    icon="mdi:lan-connect",
+    device_class=SensorDeviceClass.ENUM,
+    options=list(BREAKER_STATES),
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
+
+@dataclass(frozen=True)
+class ReaperDiagnosticSensorDescriptionMixin:
+    """Read a diagnostic value from the instrumentation of a host."""
+
+    value_fn: Callable[[ReaperDataUpdateCoordinator, ReaperInstrumentation], StateType]
+    attributes_fn: Callable[[ReaperInstrumentation], dict[str, Any]] | None
+
+
+@dataclass(frozen=True)
+class ReaperDiagnosticSensorDescription(
+    SensorEntityDescription, ReaperDiagnosticSensorDescriptionMixin
+):
+    """Describe a diagnostic sensor of the Reaper integration."""
+
+
+def _means(histograms: dict[str, LatencyHistogram]) -> dict[str, Any]:
+    return {key: histogram.mean_ms for key, histogram in sorted(histograms.items())}
+
+
+def _mean_of(histograms: dict[str, LatencyHistogram]) -> float | None:
+    count = sum(histogram.count for histogram in histograms.values())
+    if not count:
+        return None
+    total = sum(histogram.total for histogram in histograms.values())
+    return round(total / count * 1000, 2)
+
+
+DIAGNOSTIC_SENSORS: tuple[ReaperDiagnosticSensorDescription, ...] = (
+    ReaperDiagnosticSensorDescription(
+        key="fetch_latency",
+        name="Fetch latency",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda _, instrumentation: instrumentation.fetch.percentile_ms(0.95),
+        attributes_fn=lambda instrumentation: instrumentation.fetch.as_dict(),
+    ),
+    ReaperDiagnosticSensorDescription(
+        key="parse_time",
+        name="Parse time",
+        icon="mdi:timer-cog-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda _, instrumentation: instrumentation.parse.mean_ms,
+        attributes_fn=lambda instrumentation: instrumentation.parse.as_dict(),
+    ),
+    ReaperDiagnosticSensorDescription(
+        key="payload_size",
+        name="Payload size",
+        icon="mdi:download-network-outline",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda _, instrumentation: instrumentation.payload_bytes,
+        attributes_fn=None,
+    ),
+    ReaperDiagnosticSensorDescription(
+        key="refresh_rate",
+        name="Refreshes per minute",
+        icon="mdi:refresh",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda _, instrumentation: instrumentation.refreshes_per_minute(
+            monotonic()
+        ),
+        attributes_fn=lambda instrumentation: {
+            "failed_fetches": instrumentation.failed_fetches
+        },
+    ),
+    ReaperDiagnosticSensorDescription(
+        key="coalesced_refreshes",
+        name="Coalesced refreshes",
+        icon="mdi:call-merge",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator, _: coordinator.coalesced_refreshes,
+        attributes_fn=lambda instrumentation: {
+            "suppressed_writes": instrumentation.suppressed_writes
+        },
+    ),
+    ReaperDiagnosticSensorDescription(
+        key="command_round_trip",
+        name="Command round trip",
+        icon="mdi:swap-horizontal",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda _, instrumentation: _mean_of(instrumentation.commands),
+        attributes_fn=lambda instrumentation: _means(instrumentation.commands),
+    ),
+    ReaperDiagnosticSensorDescription(
+        key="fan_out_time",
+        name="Fan-out time",
+        icon="mdi:call-split",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda _, instrumentation: _mean_of(instrumentation.fan_out),
+        attributes_fn=lambda instrumentation: _means(instrumentation.fan_out),
+    ),
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -28,17 +170,45 @@ async def async_setup_entry(
 ) -> None:
     """Add a Reaper entities from a config_entry."""
     coordinator: ReaperDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
-    sensors: list[ReaperSensor] = []
+    sensors: list[SensorEntity] = []
     for description in SENSORS:
         sensors.append(ReaperSensor(coordinator, description))
+    sensors.append(ReaperConnectionSensor(coordinator, CONNECTION))
+
+    if coordinator.instrumentation is not None:
+        sensors.extend(
+            ReaperDiagnosticSensor(coordinator, description)
+            for description in DIAGNOSTIC_SENSORS
+        )
 
     async_add_entities(sensors)
 
+    async_setup_track_entities(
+        coordinator,
+        entry,
+        async_add_entities,
+        lambda key: (ReaperTrackPeakSensor(coordinator, key, TRACK_PEAK),),
+    )
+
+
+def list_attributes(name: str, values: Sequence[str]) -> dict[str, Any]:
+    """Return a list attribute capped in length, and a digest of the whole list.
+
+    The list itself should be left out of the recorder: the digest is short
+    and still changes whenever the list does.
+    """
+    digest = blake2s("\n".join(values).encode(), digest_size=6).hexdigest()
+    return {
+        name: list(values[:MAX_LIST_ATTRIBUTE_ITEMS]),
+        f"{name}_digest": digest,
+    }
+
 
 class ReaperSensor(CoordinatorEntity, SensorEntity):
     """Define an Reaper sensor."""
 
     coordinator: ReaperDataUpdateCoordinator
+    _unrecorded_attributes = frozenset({ATTR_ARMED_TRACKS})
 
     def __init__(
         self,
@@ -46,20 +216,15 @@ class ReaperSensor(CoordinatorEntity, SensorEntity):
         description: SensorEntityDescription,
     ) -> None:
         """Initialize."""
-        super().__init__(coordinator)
+        keys = {description.key}
+        if description.key == "number_of_armed_tracks":
+            keys.add(ATTR_ARMED_TRACKS)
+        super().__init__(coordinator, frozenset(keys))
 
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, coordinator.hostname)},
-            "name": coordinator.hostname,
-            "manufacturer": "Cockos Reaper",
-            "entry_type": "service",
-            "configuration_url": f"http://{coordinator.hostname}:{coordinator.port}",
-        }
+        self._attr_device_info = coordinator.device_info
         self._attr_unique_id = f"{coordinator.hostname}-{description.key}"
-        self._attrs = {ATTR_ATTRIBUTION: ATTRIBUTION}
         self._description = description
-        self._status = json.loads(coordinator.data)
-        self._sensor_data = self._status[description.key]
+        self._sensor_data = getattr(coordinator.data, description.key)
         self.entity_description = description
 
     @property
@@ -70,14 +235,121 @@ class ReaperSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes."""
+        attributes = {ATTR_ATTRIBUTION: ATTRIBUTION}
         if self._description.key == "number_of_armed_tracks":
-            self._attrs["armed_tracks"] = self._status["armed_tracks"]
-        return self._attrs
+            attributes.update(
+                list_attributes(ATTR_ARMED_TRACKS, self.coordinator.data.armed_tracks)
+            )
+        return attributes
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self._status = json.loads(self.coordinator.data)
-        self._sensor_data = self._status[self.entity_description.key]
+        self._sensor_data = getattr(self.coordinator.data, self.entity_description.key)
 
         self.async_write_ha_state()
+
+
+class ReaperTrackPeakSensor(ReaperTrackEntity, SensorEntity):
+    """Meter peak of a REAPER track.
+
+    With the meter monitor running the state is the highest sample of the
+    last publication window, otherwise the peak of the last poll.
+    """
+
+    track_columns = ("meter",)
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the meter peak in decibels."""
+        if (track := self.track) is None:
+            return None
+        if (stats := self._meter_stats) is not None:
+            return stats.maximum
+        return track.last_meter_peak / 10
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the aggregated levels of the last publication window."""
+        if (stats := self._meter_stats) is None:
+            return None
+        return {
+            "minimum": stats.minimum,
+            "mean": stats.mean,
+            "peak_hold": stats.peak_hold,
+        }
+
+    @property
+    def _meter_stats(self) -> ReaperMeterStats | None:
+        if self.coordinator.meters is None:
+            return None
+        return self.coordinator.meters.stats(self.track_key)
+
+
+class ReaperConnectionSensor(CoordinatorEntity, SensorEntity):
+    """State of the circuit breaker of a REAPER host.
+
+    Unlike the other entities it stays available while the host is down,
+    showing whether requests are sent, held back or probing.
+    """
+
+    coordinator: ReaperDataUpdateCoordinator
+
+    def __init__(
+        self,
+        coordinator: ReaperDataUpdateCoordinator,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize."""
+        super().__init__(coordinator, frozenset({"breaker"}))
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.hostname}-{description.key}"
+        self._attr_device_info = coordinator.device_info
+
+    @property
+    def available(self) -> bool:
+        """Return True, the breaker state is known even when the host is not."""
+        return True
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the breaker state."""
+        return self.coordinator.breaker.state
+
+
+class ReaperDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """Timing of the hot paths of a REAPER host.
+
+    Only added when instrumentation is enabled, and refreshed with every
+    update of the coordinator.
+    """
+
+    coordinator: ReaperDataUpdateCoordinator
+    entity_description: ReaperDiagnosticSensorDescription
+
+    def __init__(
+        self,
+        coordinator: ReaperDataUpdateCoordinator,
+        description: ReaperDiagnosticSensorDescription,
+    ) -> None:
+        """Initialize."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.hostname}-{description.key}"
+        self._attr_device_info = coordinator.device_info
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the diagnostic value."""
+        assert self.coordinator.instrumentation is not None
+        return self.entity_description.value_fn(
+            self.coordinator, self.coordinator.instrumentation
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the breakdown of the diagnostic value."""
+        assert self.coordinator.instrumentation is not None
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.coordinator.instrumentation)
@@ -1,20 +1,70 @@
 """Reaper switch."""
-import json
+from __future__ import annotations
+
+from dataclasses import dataclass
 import logging
-from typing import Any, Dict
+from typing import Any
 
-from homeassistant.components.switch import SwitchEntity
+from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import ReaperDataUpdateCoordinator
-from .const import DOMAIN
+from .const import (
+    CMD_METRONOME_OFF,
+    CMD_METRONOME_ON,
+    CMD_RECORD,
+    CMD_REPEAT_OFF,
+    CMD_REPEAT_ON,
+    CMD_STOP,
+    DOMAIN,
+    FLAG_MUTED,
+    FLAG_RECORD_ARMED,
+    FLAG_SOLOED,
+    PLAY_STATE_RECORDING,
+    PLAY_STATE_STOPPED,
+)
+from .entity import ReaperTrackEntity, async_setup_track_entities
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class ReaperTrackSwitchEntityDescription(SwitchEntityDescription):
+    """Describes a switch for a REAPER track flag."""
+
+    flag: int = 0
+    command: str = ""
+
+
+TRACK_SWITCHES: tuple[ReaperTrackSwitchEntityDescription, ...] = (
+    ReaperTrackSwitchEntityDescription(
+        key="mute",
+        name="mute",
+        icon="mdi:volume-off",
+        flag=FLAG_MUTED,
+        command="MUTE",
+    ),
+    ReaperTrackSwitchEntityDescription(
+        key="solo",
+        name="solo",
+        icon="mdi:headphones",
+        flag=FLAG_SOLOED,
+        command="SOLO",
+    ),
+    ReaperTrackSwitchEntityDescription(
+        key="arm",
+        name="record arm",
+        icon="mdi:record-circle-outline",
+        flag=FLAG_RECORD_ARMED,
+        command="RECARM",
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
@@ -25,20 +75,30 @@ async def async_setup_entry(
     async_add_entities([ReaperMetronomeSwitch(hass, coordinator)], False)
     async_add_entities([ReaperRepeatSwitch(hass, coordinator)], False)
 
+    async_setup_track_entities(
+        coordinator,
+        entry,
+        async_add_entities,
+        lambda key: (
+            ReaperTrackSwitch(coordinator, key, description)
+            for description in TRACK_SWITCHES
+        ),
+    )
+
 
 class ReaperSwitch(CoordinatorEntity, SwitchEntity):
     """Representation of a generic Reaper switch entity."""
 
     coordinator: ReaperDataUpdateCoordinator
+    coordinator_keys: frozenset[str] = frozenset()
 
     def __init__(
         self, hass: HomeAssistant, coordinator: ReaperDataUpdateCoordinator
     ) -> None:
         """Initialize the switch."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, self.coordinator_keys)
 
         self.coordinator = coordinator
-        self.status = json.loads(coordinator.data)
         self.hass = hass
         self._name = ""
         self._unique_id = ""
@@ -55,35 +115,21 @@ class ReaperSwitch(CoordinatorEntity, SwitchEntity):
         return self._icon
 
     @property
-    def device_info(self) -> Dict[str, Any]:
+    def device_info(self) -> DeviceInfo:
         """Return the device info."""
-        return {
-            "identifiers": {(DOMAIN, self.coordinator.hostname)},
-            "name": self.coordinator.hostname,
-            "manufacturer": "Cockos Reaper",
-            "configuration_url": f"http://{self.coordinator.hostname}:{self.coordinator.port}",
-        }
+        return self.coordinator.device_info
 
     @property
     def unique_id(self) -> str:
         """Return the unique id."""
         return self._unique_id
 
-    async def async_added_to_hass(self) -> None:
-        """Connect to dispatcher listening for entity data notifications."""
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
-        )
-
-    async def async_update(self) -> None:
-        """Update Reaper entity."""
-        await self.coordinator.async_request_refresh()
-        self.status = json.loads(self.coordinator.data)
-
 
 class ReaperRecordingSwitch(ReaperSwitch):
     """Representation of a Reaper recording switch."""
 
+    coordinator_keys = frozenset({"play_state"})
+
     def __init__(
         self, hass: HomeAssistant, coordinator: ReaperDataUpdateCoordinator
     ) -> None:
@@ -97,23 +143,27 @@ class ReaperRecordingSwitch(ReaperSwitch):
     def is_on(self) -> Any:
         """Return if switch is on."""
         if self.coordinator.data:
-            return json.loads(self.coordinator.data).get("play_state") == "recording"
+            return self.coordinator.data.play_state == PLAY_STATE_RECORDING
         return None
 
     async def async_turn_on(self) -> None:
         """Turn on the recording."""
-        await self.coordinator.reaperdaw.record()
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_send_optimistic(
+            CMD_RECORD, priority=True, play_state=PLAY_STATE_RECORDING
+        )
 
     async def async_turn_off(self) -> None:
         """Turn off the recording."""
-        await self.coordinator.reaperdaw.stop()
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_send_optimistic(
+            CMD_STOP, priority=True, play_state=PLAY_STATE_STOPPED
+        )
 
 
 class ReaperMetronomeSwitch(ReaperSwitch):
     """Representation of a Reaper metronome switch."""
 
+    coordinator_keys = frozenset({"metronome"})
+
     def __init__(
         self, hass: HomeAssistant, coordinator: ReaperDataUpdateCoordinator
     ) -> None:
@@ -127,23 +177,23 @@ class ReaperMetronomeSwitch(ReaperSwitch):
     def is_on(self) -> Any:
         """Return if metronome is on."""
         if self.coordinator.data is not None:
-            return json.loads(self.coordinator.data).get("metronome")
+            return self.coordinator.data.metronome
         return None
 
     async def async_turn_on(self) -> None:
         """Turn on metronome."""
-        await self.coordinator.reaperdaw.enableMetronome()
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_send_optimistic(CMD_METRONOME_ON, metronome=True)
 
     async def async_turn_off(self) -> None:
         """Turn off metronome."""
-        await self.coordinator.reaperdaw.disableMetronome()
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_send_optimistic(CMD_METRONOME_OFF, metronome=False)
 
 
 class ReaperRepeatSwitch(ReaperSwitch):
     """Representation of a Reaper repeat switch."""
 
+    coordinator_keys = frozenset({"repeat"})
+
     def __init__(
         self, hass: HomeAssistant, coordinator: ReaperDataUpdateCoordinator
     ) -> None:
@@ -157,15 +207,43 @@ class ReaperRepeatSwitch(ReaperSwitch):
     def is_on(self) -> Any:
         """Return if repeat is on."""
         if self.coordinator.data is not None:
-            return json.loads(self.coordinator.data).get("transport").get("repeat")
+            return self.coordinator.data.repeat
         return None
 
     async def async_turn_on(self) -> None:
         """Turn on repeat."""
-        await self.coordinator.reaperdaw.enableRepeat()
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_send_optimistic(CMD_REPEAT_ON, repeat=True)
 
     async def async_turn_off(self) -> None:
         """Turn off repeat."""
-        await self.coordinator.reaperdaw.disableRepeat()
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_send_optimistic(CMD_REPEAT_OFF, repeat=False)
+
+
+class ReaperTrackSwitch(ReaperTrackEntity, SwitchEntity):
+    """Mute, solo or record arm switch of a REAPER track."""
+
+    entity_description: ReaperTrackSwitchEntityDescription
+    track_columns = ("flags",)
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return if the track flag is set."""
+        if (track := self.track) is None:
+            return None
+        return bool(track.flags & self.entity_description.flag)
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        """Set the track flag."""
+        await self._async_set(1)
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Clear the track flag."""
+        await self._async_set(0)
+
+    async def _async_set(self, value: int) -> None:
+        if (track := self.track) is None:
+            return
+        await self.coordinator.async_send_command(
+            f"SET/TRACK/{track.index}/{self.entity_description.command}/{value}"
+        )
+        await self.coordinator.async_request_reconcile()
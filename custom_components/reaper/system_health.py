@@ -0,0 +1,25 @@
+"""Provide info to system health."""
+from __future__ import annotations
+
+from time import monotonic
+from typing import Any
+
+from homeassistant.components import system_health
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_FLEET
+
+
+@callback
+def async_register(
+    hass: HomeAssistant, register: system_health.SystemHealthRegistration
+) -> None:
+    """Register system health callbacks."""
+    register.async_register_info(system_health_info)
+
+
+async def system_health_info(hass: HomeAssistant) -> dict[str, Any]:
+    """Get aggregate metrics of every configured REAPER host."""
+    if (fleet := hass.data.get(DATA_FLEET)) is None:
+        return {"hosts": 0}
+    return fleet.metrics(monotonic())
@@ -0,0 +1,38 @@
+"""Synthetic REAPER status responses."""
+import random
+
+from custom_components.reaper.const import (
+    FLAG_FOLDER,
+    FLAG_MUTED,
+    FLAG_RECORD_ARMED,
+    FLAG_SELECTED,
+    FLAG_SOLOED,
+)
+
+# Flag bits set at random, each on roughly one track in five
+RANDOM_FLAGS = (FLAG_FOLDER, FLAG_SELECTED, FLAG_MUTED, FLAG_SOLOED, FLAG_RECORD_ARMED)
+
+
+def status_payload(tracks: int, seed: int = 0) -> str:
+    """Return a status response for a project with a number of tracks.
+
+    Flags, volumes, pans, meters and colors are random, but the same for
+    the same seed, so runs of a benchmark can be compared.
+    """
+    rng = random.Random(seed)
+    lines = [
+        f"NTRACK\t{tracks}",
+        "TRANSPORT\t1\t10.000000\t0\t6.1.00\t6.1.00",
+        "BEATPOS\t1\t10.000000000000000\t20.000000000000000\t5\t0.000000000010001\t4\t4",
+        "CMDSTATE\t40364\t1",
+        "CMDSTATE\t1157\t1",
+    ]
+    for index in range(tracks + 1):
+        flags = sum(flag for flag in RANDOM_FLAGS if rng.random() < 0.2)
+        peak = rng.randint(-1500, 0)
+        lines.append(
+            f"TRACK\t{index}\tTrack {index}\t{flags}\t{rng.uniform(0, 4):.6f}"
+            f"\t{rng.uniform(-1, 1):.6f}\t{peak}\t{peak - rng.randint(0, 60)}"
+            f"\t1.000000\t3\t0\t0\t0\t{0x1000000 | rng.getrandbits(24)}"
+        )
+    return "\n".join(lines)
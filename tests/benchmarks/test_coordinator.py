@@ -0,0 +1,103 @@
+"""Benchmark refreshes and entity fan-out of the coordinator."""
+import asyncio
+from dataclasses import replace
+from itertools import cycle
+from unittest.mock import patch
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.reaper.api import ReaperClient
+from custom_components.reaper.const import (
+    CONF_HOSTNAME,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+    PLAY_STATE_STOPPED,
+)
+from custom_components.reaper.models import parse_status
+from homeassistant.core import HomeAssistant
+
+from .payloads import status_payload
+
+TRACK_COUNTS = (4, 100, 1000, 5000)
+
+
+@pytest.mark.parametrize("tracks", TRACK_COUNTS)
+async def test_fan_out(hass: HomeAssistant, benchmark, tracks):
+    """Benchmark notifying the sensors, switches and media player of a change."""
+    snapshot = parse_status(status_payload(tracks))
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 60,
+        },
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=snapshot,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    # Every snapshot key differs, so every entity writes its state
+    changed = replace(
+        snapshot,
+        play_state=PLAY_STATE_STOPPED,
+        metronome=not snapshot.metronome,
+        repeat=not snapshot.repeat,
+        time_signature="7/8",
+        number_of_tracks=tracks + 1,
+        armed_tracks=(),
+    )
+    snapshots = cycle((changed, snapshot))
+
+    def fan_out() -> None:
+        coordinator.data = next(snapshots)
+        coordinator.async_update_listeners()
+
+    benchmark(fan_out)
+    await hass.async_block_till_done()
+
+    # Only the connection sensor, which follows the circuit breaker, is skipped
+    assert coordinator.suppressed_writes == 1
+
+
+@pytest.mark.parametrize("tracks", TRACK_COUNTS)
+def test_refresh_latency(benchmark, socket_enabled, tracks):
+    """Benchmark fetching and parsing a status from a local HTTP server."""
+    payload = status_payload(tracks)
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(text=payload)
+
+    app = web.Application()
+    app.router.add_get("/_/{command:.*}", handle)
+    server = TestServer(app, host="127.0.0.1")
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start_server())
+    session = loop.run_until_complete(_async_create_session())
+    client = ReaperClient(session, "127.0.0.1", server.port)
+
+    try:
+        snapshot = benchmark(lambda: loop.run_until_complete(client.async_get_status()))
+    finally:
+        loop.run_until_complete(session.close())
+        loop.run_until_complete(server.close())
+        loop.close()
+
+    assert len(snapshot.tracks) == tracks + 1
+
+
+async def _async_create_session() -> ClientSession:
+    return ClientSession()
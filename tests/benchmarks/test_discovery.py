@@ -0,0 +1,54 @@
+"""Benchmark scanning for REAPER web interfaces."""
+from time import perf_counter
+
+from aiohttp import ClientTimeout
+
+from custom_components.reaper.discovery import (
+    SCAN_TIMEOUT,
+    async_discover,
+    scan_targets,
+)
+
+# Seconds a scan may take beyond its total timeout before it counts as stalled
+SCAN_MARGIN = 1
+
+
+async def test_scan(record_property, reaper_emulator):
+    """Probe as many targets as a /24 has addresses, where one runs REAPER.
+
+    Tests may only connect to 127.0.0.1, so the targets are ports of it.
+    The scan time is recorded, not asserted, and the timeout is generous so
+    that the emulator is not missed on a loaded machine.
+    """
+    emulator = await reaper_emulator()
+    ports = [emulator.port] + list(range(20000, 20253))
+    targets = scan_targets("127.0.0.1/32", ports)
+
+    start = perf_counter()
+    found = await async_discover(targets, timeout=ClientTimeout(total=10))
+    elapsed = perf_counter() - start
+    record_property("scan_seconds", elapsed)
+
+    assert len(targets) == 254
+    assert [(host.hostname, host.port) for host in found] == [
+        ("127.0.0.1", emulator.port)
+    ]
+
+
+async def test_scan_closed_ports(record_property, socket_enabled):
+    """Probe a /24 worth of closed ports within the default scan timeout.
+
+    Refused connections must not hold a probe slot, so the whole scan
+    finishes within one total timeout, however many waves it takes.
+    """
+    targets = scan_targets("127.0.0.1/32", range(20000, 20254))
+
+    start = perf_counter()
+    found = await async_discover(targets)
+    elapsed = perf_counter() - start
+    record_property("scan_seconds", elapsed)
+
+    assert len(targets) == 254
+    assert found == []
+    assert SCAN_TIMEOUT.total is not None
+    assert elapsed < SCAN_TIMEOUT.total + SCAN_MARGIN
@@ -0,0 +1,72 @@
+"""Measure poll latency of the session a host is polled through."""
+import asyncio
+from statistics import median
+from time import perf_counter
+
+from aiohttp import BasicAuth, hdrs, web
+from aiohttp.test_utils import TestServer
+import pytest
+
+from custom_components.reaper.api import ReaperClient
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import (
+    SERVER_SOFTWARE,
+    async_create_clientsession,
+)
+
+from .payloads import status_payload
+
+# Polls at 4 Hz
+POLL_INTERVAL = 0.25
+POLLS = 16
+TRACKS = 50
+PEERS = web.AppKey("peers", set)
+USER_AGENTS = web.AppKey("user_agents", set)
+
+
+@pytest.fixture(name="reaper_server")
+async def reaper_server_fixture(socket_enabled):
+    """Serve a status payload like the REAPER web interface does."""
+    payload = status_payload(TRACKS)
+    authorization = BasicAuth("admin", "secret").encode()
+
+    async def handle(request: web.Request) -> web.Response:
+        if request.headers.get(hdrs.AUTHORIZATION) != authorization:
+            return web.Response(status=401)
+        request.app[PEERS].add(request.transport.get_extra_info("peername"))
+        request.app[USER_AGENTS].add(request.headers.get(hdrs.USER_AGENT))
+        return web.Response(text=payload)
+
+    app = web.Application()
+    app[PEERS] = set()
+    app[USER_AGENTS] = set()
+    app.router.add_get("/_/{command:.*}", handle)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    yield server
+    await server.close()
+
+
+async def test_poll_latency(hass: HomeAssistant, record_property, reaper_server):
+    """Measure per-request latency of polling a host at 4 Hz."""
+    http = async_create_clientsession(hass)
+    client = ReaperClient(http, "127.0.0.1", reaper_server.port, "admin", "secret")
+
+    latencies = []
+    for _ in range(POLLS):
+        start = perf_counter()
+        snapshot = await client.async_get_status()
+        latencies.append(perf_counter() - start)
+        await asyncio.sleep(POLL_INTERVAL)
+
+    connections = len(reaper_server.app[PEERS])
+    latencies.sort()
+    record_property("median_ms", median(latencies) * 1000)
+    record_property("p95_ms", latencies[int(0.95 * len(latencies))] * 1000)
+    record_property("connections", connections)
+
+    http.detach()
+    assert len(snapshot.tracks) == TRACKS + 1
+    assert reaper_server.app[USER_AGENTS] == {SERVER_SOFTWARE}
+    # Every poll reused the same keep-alive connection
+    assert connections == 1
@@ -0,0 +1,38 @@
+"""Benchmark the REAPER status parser against the reaperdaw JSON path."""
+import json
+import tracemalloc
+
+import pytest
+
+from custom_components.reaper.models import parse_status
+
+from .payloads import status_payload
+
+reaperdaw_models = pytest.importorskip("reaperdaw.models")
+
+TRACK_COUNTS = (4, 100, 1000, 5000)
+
+
+@pytest.mark.parametrize("tracks", TRACK_COUNTS)
+def test_parse_status(benchmark, tracks):
+    """Benchmark parsing the wire format straight into a snapshot."""
+    payload = status_payload(tracks)
+
+    tracemalloc.start()
+    snapshot = parse_status(payload)
+    benchmark.extra_info["snapshot_bytes"], _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del snapshot
+    snapshot = benchmark(parse_status, payload)
+
+    assert len(snapshot.tracks) == tracks + 1
+
+
+@pytest.mark.parametrize("tracks", TRACK_COUNTS)
+def test_parse_reaperdaw_json(benchmark, tracks):
+    """Benchmark the reaperdaw parse, JSON encode and JSON decode round trip."""
+    payload = status_payload(tracks)
+
+    status = benchmark(lambda: json.loads(json.dumps(reaperdaw_models.parse(payload))))
+
+    assert len(status["tracks"]) == tracks + 1
@@ -0,0 +1,90 @@
+"""Measure what the recorder stores for the attributes of track list sensors."""
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.reaper.const import (
+    CONF_HOSTNAME,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+    FLAG_RECORD_ARMED,
+)
+from custom_components.reaper.models import parse_status
+from homeassistant.const import (
+    ATTR_ATTRIBUTION,
+    ATTR_RESTORED,
+    ATTR_SUPPORTED_FEATURES,
+)
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers.json import json_bytes
+
+from .payloads import status_payload
+
+TRACKS = 500
+# Attributes the recorder leaves out of every state
+RECORDER_EXCLUDED = frozenset(
+    {ATTR_ATTRIBUTION, ATTR_RESTORED, ATTR_SUPPORTED_FEATURES}
+)
+# Upper bound of the attributes recorded for a track list sensor
+MAX_RECORDED_BYTES = 256
+
+
+@pytest.mark.parametrize("armed", ("random", "all"))
+async def test_armed_tracks_recorded(hass: HomeAssistant, record_property, armed):
+    """Compare the recorded attributes of a 500 track project with the full list."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 9999,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    payload = status_payload(TRACKS)
+    if armed == "all":
+        payload = "\n".join(
+            _armed(line) if line.startswith("TRACK") else line
+            for line in payload.split("\n")
+        )
+    snapshot = parse_status(payload)
+
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=snapshot,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.number_of_armed_tracks")
+    recorded = len(recorded_attributes(state))
+    # Before, the whole list was recorded with every change
+    full = len(json_bytes({"armed_tracks": list(snapshot.armed_tracks)}))
+    record_property("armed_tracks", len(snapshot.armed_tracks))
+    record_property("recorded_bytes_before", full)
+    record_property("recorded_bytes_after", recorded)
+
+    assert recorded < MAX_RECORDED_BYTES < full
+
+
+def recorded_attributes(state: State) -> bytes:
+    """Return the attributes of a state the way the recorder stores them."""
+    excluded = RECORDER_EXCLUDED | (
+        state.state_info["unrecorded_attributes"] if state.state_info else set()
+    )
+    return json_bytes(
+        {key: value for key, value in state.attributes.items() if key not in excluded}
+    )
+
+
+def _armed(line: str) -> str:
+    """Return a TRACK line with the record armed flag set."""
+    fields = line.split("\t")
+    fields[3] = str(int(fields[3]) | FLAG_RECORD_ARMED)
+    return "\t".join(fields)
@@ -0,0 +1,56 @@
+"""Soak many coordinators against emulated REAPER hosts."""
+import asyncio
+from time import perf_counter
+
+from custom_components.reaper import ReaperDataUpdateCoordinator
+from custom_components.reaper.fleet import ReaperFleet
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+
+HOSTS = 20
+ROUNDS = 10
+TRACKS = 100
+
+
+async def test_fleet_soak(hass: HomeAssistant, record_property, reaper_emulator):
+    """Refresh a fleet of flaky, jittery hosts concurrently."""
+    fleet = ReaperFleet()
+    emulators = [
+        await reaper_emulator(
+            tracks=TRACKS, latency=0.005, jitter=0.02, failure_rate=0.05, seed=host
+        )
+        for host in range(HOSTS)
+    ]
+    coordinators = [
+        ReaperDataUpdateCoordinator(
+            hass,
+            async_create_clientsession(hass),
+            "127.0.0.1",
+            emulator.port,
+            fleet=fleet,
+        )
+        for emulator in emulators
+    ]
+
+    failures = 0
+    start = perf_counter()
+    for _ in range(ROUNDS):
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in coordinators)
+        )
+        failures += sum(
+            not coordinator.last_update_success for coordinator in coordinators
+        )
+    elapsed = perf_counter() - start
+
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+        coordinator.session.detach()
+
+    requests = sum(emulator.requests for emulator in emulators)
+    record_property("refreshes_per_second", HOSTS * ROUNDS / elapsed)
+    record_property("failures", failures)
+
+    assert requests >= HOSTS * ROUNDS
+    assert failures < HOSTS * ROUNDS * 0.2
+    assert all(coordinator.data is not None for coordinator in coordinators)
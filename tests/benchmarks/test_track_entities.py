@@ -0,0 +1,69 @@
+"""Measure setup time and memory of per-track entities."""
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.reaper.const import (
+    CONF_HOSTNAME,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_TRACK_ENTITIES,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+)
+from custom_components.reaper.models import parse_status
+from homeassistant.core import HomeAssistant
+
+from .payloads import status_payload
+
+# Entities per track: volume, mute, solo, record arm and peak
+ENTITIES_PER_TRACK = 5
+# Upper bounds for a 400 track template on CI hardware
+MAX_SETUP_SECONDS = 30
+MAX_BYTES_PER_ENTITY = 64 * 1024
+
+
+@pytest.mark.parametrize("tracks", (150, 400))
+async def test_track_entity_setup(hass: HomeAssistant, record_property, tracks):
+    """Measure the cost of creating entities for every track of a project."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 9999,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+        options={CONF_TRACK_ENTITIES: True},
+    )
+    entry.add_to_hass(hass)
+    snapshot = parse_status(status_payload(tracks))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=snapshot,
+    ), patch(
+        "custom_components.reaper.ReaperClient.async_get_tracks",
+        return_value=snapshot.tracks,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    entities = (tracks + 1) * ENTITIES_PER_TRACK
+    record_property("entities", entities)
+    record_property("setup_seconds", elapsed)
+    record_property("bytes_per_entity", allocated / entities)
+
+    assert len(hass.states.async_entity_ids()) >= entities
+    assert elapsed < MAX_SETUP_SECONDS
+    assert allocated / entities < MAX_BYTES_PER_ENTITY
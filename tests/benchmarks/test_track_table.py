@@ -0,0 +1,140 @@
+"""Benchmark the columnar track table against track rows and track dicts."""
+import gc
+import tracemalloc
+
+import pytest
+
+from custom_components.reaper import models
+from custom_components.reaper.const import (
+    FLAG_FOLDER,
+    FLAG_HAS_FX,
+    FLAG_MUTED,
+    FLAG_RECORD_ARMED,
+    FLAG_RECORD_MONITORING_AUTO,
+    FLAG_RECORD_MONITORING_ON,
+    FLAG_SELECTED,
+    FLAG_SOLO_IN_PLACE,
+    FLAG_SOLOED,
+)
+from custom_components.reaper.models import ReaperTrack, ReaperTrackTable, parse_status
+
+from .payloads import status_payload
+
+TRACK_COUNTS = (100, 1000, 5000)
+# Below this many tracks the memory differences are within the noise of
+# allocations left behind by other tests
+MIN_COMPARED_TRACKS = 1000
+
+# Flags expanded to strings, like the tracks of the JSON fixture
+FLAG_NAMES = {
+    FLAG_FOLDER: "folder",
+    FLAG_SELECTED: "selected",
+    FLAG_HAS_FX: "has-fx",
+    FLAG_MUTED: "muted",
+    FLAG_SOLOED: "soloed",
+    FLAG_SOLO_IN_PLACE: "solo-in-place",
+    FLAG_RECORD_ARMED: "record-armed",
+    FLAG_RECORD_MONITORING_ON: "record-monitoring-on",
+    FLAG_RECORD_MONITORING_AUTO: "record-monitoring-auto",
+}
+COUNTED_FLAGS = (FLAG_RECORD_ARMED, FLAG_MUTED, FLAG_SOLOED, FLAG_SELECTED)
+
+
+def track_dicts(rows: list[ReaperTrack]) -> list[dict]:
+    """Return tracks as dicts, the way the JSON fixture has them."""
+    return [
+        {
+            "index": row.index,
+            "name": row.name,
+            "flags": [name for flag, name in FLAG_NAMES.items() if row.flags & flag],
+            "volume": f"{row.volume:.6f}",
+            "pan": f"{row.pan:.6f}",
+            "last_meter_peak": str(row.last_meter_peak),
+            "last_meter_pos": str(row.last_meter_pos),
+            "color": row.color,
+        }
+        for row in rows
+    ]
+
+
+def retained_bytes(build) -> int:
+    """Return the memory allocated by what a function built and still holds.
+
+    Only blocks allocated in this module and the models count, so garbage
+    collected or cached elsewhere during the build does not skew the result.
+    """
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        built = build()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    filters = [
+        tracemalloc.Filter(True, __file__),
+        tracemalloc.Filter(True, models.__file__),
+    ]
+    retained = sum(
+        stat.size_diff
+        for stat in after.filter_traces(filters).compare_to(
+            before.filter_traces(filters), "filename"
+        )
+    )
+    del built
+    return retained
+
+
+@pytest.mark.parametrize("tracks", TRACK_COUNTS)
+def test_track_table_memory(benchmark, tracks):
+    """Measure the memory of the table, rows and dicts of the same tracks."""
+    table = parse_status(status_payload(tracks)).tracks
+    rows = list(table)
+
+    columnar = retained_bytes(lambda: ReaperTrackTable.from_rows(rows))
+    row_tuple = retained_bytes(lambda: tuple(table))
+    dicts = retained_bytes(lambda: track_dicts(rows))
+    benchmark.extra_info.update(
+        columnar_bytes=columnar, row_bytes=row_tuple, dict_bytes=dicts
+    )
+    benchmark(ReaperTrackTable.from_rows, rows)
+
+    if tracks >= MIN_COMPARED_TRACKS:
+        assert columnar < row_tuple < dicts
+
+
+@pytest.mark.parametrize("tracks", TRACK_COUNTS)
+def test_flag_counts_columnar(benchmark, tracks):
+    """Benchmark counting and listing flagged tracks of a fresh table."""
+    table = parse_status(status_payload(tracks)).tracks
+    columns = [getattr(table, column) for column in ReaperTrack.__slots__]
+
+    def counts() -> list[tuple[int, tuple[int, ...]]]:
+        fresh = ReaperTrackTable(*columns)
+        return [(fresh.count(flag), fresh.indexes(flag)) for flag in COUNTED_FLAGS]
+
+    result = benchmark(counts)
+
+    assert result == flag_counts_dicts(track_dicts(list(table)))
+
+
+@pytest.mark.parametrize("tracks", TRACK_COUNTS)
+def test_flag_counts_dicts(benchmark, tracks):
+    """Benchmark counting and listing flagged tracks of track dicts."""
+    dicts = track_dicts(list(parse_status(status_payload(tracks)).tracks))
+
+    result = benchmark(flag_counts_dicts, dicts)
+
+    assert len(result) == len(COUNTED_FLAGS)
+
+
+def flag_counts_dicts(dicts: list[dict]) -> list[tuple[int, tuple[int, ...]]]:
+    """Return the count and positions of every counted flag."""
+    result = []
+    for flag in COUNTED_FLAGS:
+        name = FLAG_NAMES[flag]
+        indexes = tuple(i for i, track in enumerate(dicts) if name in track["flags"])
+        result.append((len(indexes), indexes))
+    return result
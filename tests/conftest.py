@@ -5,14 +5,17 @@ import pytest
 from pytest_homeassistant_custom_component.common import load_fixture
 
 from custom_components.reaper import ReaperError
+from custom_components.reaper.models import parse_status
+
+from .emulator import ReaperEmulator
 
 
 @pytest.fixture(name="bypass_get_data")
 def bypass_get_data_fixture():
     """Skip calls to get data from API."""
     with patch(
-        "custom_components.reaper.Reaper.getStatus",
-        return_value=load_fixture("reaper_status_data.json"),
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=parse_status(load_fixture("reaper_status_data.txt")),
     ):
         yield
 
@@ -21,12 +24,29 @@ def bypass_get_data_fixture():
 def error_get_data_fixture():
     """Simulate error when retrieving data from API."""
     with patch(
-        "custom_components.reaper.Reaper.getStatus",
+        "custom_components.reaper.ReaperClient.async_get_status",
         side_effect=ReaperError(500, "exception"),
     ):
         yield
 
 
+@pytest.fixture(name="reaper_emulator")
+async def reaper_emulator_fixture(socket_enabled):
+    """Start REAPER web interface emulators, e.g. `await reaper_emulator(tracks=8)`."""
+    emulators: list[ReaperEmulator] = []
+
+    async def start(**knobs) -> ReaperEmulator:
+        emulator = ReaperEmulator(**knobs)
+        await emulator.async_start()
+        emulators.append(emulator)
+        return emulator
+
+    yield start
+
+    for emulator in emulators:
+        await emulator.async_stop()
+
+
 @pytest.fixture(autouse=True)
 def auto_enable_custom_integrations(enable_custom_integrations):
     yield
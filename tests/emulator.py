@@ -0,0 +1,307 @@
+"""Emulator of the REAPER web interface for tests."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import random
+import struct
+
+from aiohttp import BasicAuth, hdrs, web
+from aiohttp.test_utils import TestServer
+
+from custom_components.reaper.const import (
+    CMD_FAST_FORWARD,
+    CMD_METRONOME,
+    CMD_METRONOME_OFF,
+    CMD_METRONOME_ON,
+    CMD_PAUSE,
+    CMD_PLAY,
+    CMD_RECORD,
+    CMD_REPEAT,
+    CMD_REWIND,
+    CMD_STOP,
+    FLAG_MUTED,
+    FLAG_RECORD_ARMED,
+    FLAG_SOLOED,
+)
+
+# Play state codes of the TRANSPORT section
+STOPPED = 0
+PLAYING = 1
+PAUSED = 2
+RECORDING = 5
+RECORD_PAUSED = 6
+
+PAUSE_TOGGLE = {
+    PLAYING: PAUSED,
+    PAUSED: PLAYING,
+    RECORDING: RECORD_PAUSED,
+    RECORD_PAUSED: RECORDING,
+}
+TRACK_FLAGS = {"MUTE": FLAG_MUTED, "SOLO": FLAG_SOLOED, "RECARM": FLAG_RECORD_ARMED}
+# Seconds a rewind or fast forward moves the position
+SEEK_STEP = 1.0
+TEMPO = 120.0
+
+
+@dataclass
+class EmulatedTrack:
+    """Mixer state of one emulated track."""
+
+    name: str
+    flags: int = 0
+    volume: float = 1.0
+    pan: float = 0.0
+    peak: int = -1500
+    color: int = 0
+
+    def line(self, index: int) -> str:
+        """Return the TRACK line of the track."""
+        return (
+            f"TRACK\t{index}\t{self.name}\t{self.flags}\t{self.volume:.6f}"
+            f"\t{self.pan:.6f}\t{self.peak}\t{self.peak}\t1.000000\t3\t0\t0\t0"
+            f"\t{self.color}"
+        )
+
+
+@dataclass
+class EmulatedMarker:
+    """Marker, or region when it has an end, of the emulated project."""
+
+    name: str
+    id: int
+    position: float
+    end: float | None = None
+    color: int = 0
+
+    def line(self) -> str:
+        """Return the MARKER or REGION line of the marker."""
+        if self.end is None:
+            return f"MARKER\t{self.name}\t{self.id}\t{self.position:.6f}\t{self.color}"
+        return (
+            f"REGION\t{self.name}\t{self.id}\t{self.position:.6f}"
+            f"\t{self.end:.6f}\t{self.color}"
+        )
+
+
+class ReaperEmulator:
+    """Serve the `/_/` protocol of the REAPER web interface from memory.
+
+    The emulator keeps a transport and mixer that commands act on, and has
+    knobs for the latency, jitter and failure rate of every request.
+    """
+
+    def __init__(
+        self,
+        tracks: int = 4,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        username: str = "",
+        password: str = "",
+        seed: int = 0,
+    ) -> None:
+        """Initialize."""
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.commands: list[str] = []
+        self.play_state = STOPPED
+        self.metronome = False
+        self.repeat = False
+        self.tracks = [EmulatedTrack("MASTER")] + [
+            EmulatedTrack(f"Track {index}", color=0x1000000 | index)
+            for index in range(1, tracks + 1)
+        ]
+        self.markers: list[EmulatedMarker] = []
+        self._authorization = (
+            BasicAuth(username, password).encode() if username else None
+        )
+        self._rng = random.Random(seed)
+        self._position = 0.0
+        self._position_at = 0.0
+        self._server: TestServer | None = None
+
+    @property
+    def port(self) -> int:
+        """Return the port the emulator listens on."""
+        assert self._server is not None and self._server.port is not None
+        return self._server.port
+
+    @property
+    def position(self) -> float:
+        """Return the transport position in seconds."""
+        if self.play_state in (PLAYING, RECORDING):
+            return self._position + self._now() - self._position_at
+        return self._position
+
+    async def async_start(self, port: int | None = None) -> None:
+        """Start serving, on a free local port unless one is given."""
+        app = web.Application()
+        app.router.add_get("/_/{commands:.*}", self._handle)
+        self._server = TestServer(app, host="127.0.0.1", port=port)
+        await self._server.start_server()
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            await self._server.close()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        delay = self.latency + self._rng.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if (
+            self._authorization is not None
+            and request.headers.get(hdrs.AUTHORIZATION) != self._authorization
+        ):
+            return web.Response(status=401, text="Unauthorized")
+        if self._rng.random() < self.failure_rate:
+            return web.Response(status=500, text="Internal Server Error")
+
+        lines: list[str] = []
+        for command in request.match_info["commands"].split(";"):
+            lines.extend(self._run(command))
+        return web.Response(text="".join(f"{line}\n" for line in lines))
+
+    def _run(self, command: str) -> list[str]:
+        """Run a command and return its response lines."""
+        parts = command.split("/")
+        if command == "NTRACK":
+            return [f"NTRACK\t{len(self.tracks) - 1}"]
+        if command == "TRANSPORT":
+            position = self.position
+            return [
+                f"TRANSPORT\t{self.play_state}\t{position:.6f}\t{int(self.repeat)}"
+                f"\t{position:.2f}\t{position:.2f}"
+            ]
+        if command == "BEATPOS":
+            position = self.position
+            beats = position * TEMPO / 60
+            return [
+                f"BEATPOS\t{self.play_state}\t{position:.15f}\t{beats:.15f}"
+                f"\t{int(beats // 4)}\t{beats % 4:.15f}\t4\t4"
+            ]
+        if parts[0] == "TRACK":
+            if len(parts) == 1:
+                return [track.line(i) for i, track in enumerate(self.tracks)]
+            first, _, last = parts[1].partition("-")
+            indexes = range(int(first), int(last or first) + 1)
+            return [self.tracks[i].line(i) for i in indexes if i < len(self.tracks)]
+        if command in ("MARKER", "REGION"):
+            regions = command == "REGION"
+            return [
+                f"{command}_LIST",
+                *(
+                    marker.line()
+                    for marker in self.markers
+                    if (marker.end is not None) == regions
+                ),
+                f"{command}_LIST_END",
+            ]
+        if parts[0] == "GET" and len(parts) == 2:
+            return [f"CMDSTATE\t{parts[1]}\t{int(self._toggle_state(parts[1]))}"]
+        if parts[0] == "SET":
+            self.commands.append(command)
+            self._set(parts[1:])
+            return []
+
+        self.commands.append(command)
+        self._action(command)
+        return []
+
+    def _toggle_state(self, command_id: str) -> bool:
+        if command_id == CMD_METRONOME:
+            return self.metronome
+        if command_id == CMD_REPEAT:
+            return self.repeat
+        return False
+
+    def _set(self, parts: list[str]) -> None:
+        if parts[0] == "REPEAT":
+            self.repeat = _toggle(self.repeat, parts[1])
+        elif parts[0] == "POS":
+            self._position = max(0.0, float(parts[1]))
+            self._position_at = self._now()
+        elif parts[0] == "TRACK" and int(parts[1]) < len(self.tracks):
+            track = self.tracks[int(parts[1])]
+            if parts[2] == "VOL":
+                track.volume = float(parts[3])
+            elif parts[2] == "PAN":
+                track.pan = float(parts[3])
+            elif (flag := TRACK_FLAGS.get(parts[2])) is not None:
+                if _toggle(bool(track.flags & flag), parts[3]):
+                    track.flags |= flag
+                else:
+                    track.flags &= ~flag
+
+    def _action(self, command: str) -> None:
+        if command == CMD_PLAY:
+            self._move(PLAYING)
+        elif command == CMD_PAUSE:
+            self._move(PAUSE_TOGGLE.get(self.play_state, STOPPED))
+        elif command == CMD_STOP:
+            self._move(STOPPED)
+        elif command == CMD_RECORD:
+            self._move(RECORDING)
+        elif command == CMD_METRONOME:
+            self.metronome = not self.metronome
+        elif command == CMD_METRONOME_ON:
+            self.metronome = True
+        elif command == CMD_METRONOME_OFF:
+            self.metronome = False
+        elif command == CMD_REPEAT:
+            self.repeat = not self.repeat
+        elif command in (CMD_REWIND, CMD_FAST_FORWARD):
+            step = SEEK_STEP if command == CMD_FAST_FORWARD else -SEEK_STEP
+            self._position = max(0.0, self.position + step)
+            self._position_at = self._now()
+
+    def _move(self, play_state: int) -> None:
+        self._position = self.position
+        self._position_at = self._now()
+        self.play_state = play_state
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+
+def _toggle(value: bool, argument: str) -> bool:
+    """Return a flag set by a `0`, `1` or `-1` (toggle) argument."""
+    return not value if argument == "-1" else argument == "1"
+
+
+def osc_message(address: str, *arguments: bool | int | float | str) -> bytes:
+    """Encode an OSC message the way REAPER sends it."""
+    tags = ","
+    data = b""
+    for argument in arguments:
+        if isinstance(argument, bool):
+            tags += "T" if argument else "F"
+        elif isinstance(argument, int):
+            tags += "i"
+            data += struct.pack(">i", argument)
+        elif isinstance(argument, float):
+            tags += "f"
+            data += struct.pack(">f", argument)
+        else:
+            tags += "s"
+            data += _osc_string(argument)
+    return _osc_string(address) + _osc_string(tags) + data
+
+
+def osc_bundle(*elements: bytes) -> bytes:
+    """Encode an OSC bundle of messages or bundles, to be handled immediately."""
+    return (
+        b"#bundle\0"
+        + struct.pack(">Q", 1)
+        + b"".join(struct.pack(">i", len(element)) + element for element in elements)
+    )
+
+
+def _osc_string(value: str) -> bytes:
+    data = value.encode() + b"\0"
+    return data + b"\0" * (-len(data) % 4)
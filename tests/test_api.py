@@ -0,0 +1,142 @@
+"""Test the REAPER web interface client."""
+from dataclasses import replace
+
+from aiohttp import BasicAuth, hdrs
+import pytest
+from pytest_homeassistant_custom_component.common import load_fixture
+
+from custom_components.reaper.api import STATUS_COMMAND, ReaperClient, ReaperError
+from custom_components.reaper.const import (
+    FLAG_MUTED,
+    FLAG_RECORD_ARMED,
+    FLAG_SELECTED,
+    PLAY_STATE_STOPPED,
+)
+from custom_components.reaper.models import ReaperTrackTable, parse_status
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+BASE_URL = "http://192.168.0.5:8080/_/"
+
+
+async def test_get_status(hass: HomeAssistant, aioclient_mock):
+    """Test that the status response is parsed into a snapshot."""
+    aioclient_mock.get(
+        BASE_URL + STATUS_COMMAND, text=load_fixture("reaper_status_data.txt")
+    )
+    client = ReaperClient(async_get_clientsession(hass), "192.168.0.5", 8080)
+
+    snapshot = await client.async_get_status()
+
+    assert aioclient_mock.call_count == 1
+    assert snapshot.play_state == PLAY_STATE_STOPPED
+    assert snapshot.metronome is True
+    assert snapshot.repeat is True
+    assert snapshot.time_signature == "4/4"
+    assert snapshot.number_of_tracks == 4
+    assert snapshot.beatpos.measure_count == 5
+    assert snapshot.transport.position_string == "6.1.00"
+    assert [track.name for track in snapshot.tracks] == [
+        "MASTER",
+        "Piano",
+        "Guitar",
+        "Drums",
+        "Bass",
+    ]
+    assert snapshot.tracks[1].flags & FLAG_RECORD_ARMED
+    assert snapshot.armed_tracks == ("Piano",)
+
+
+def test_track_table():
+    """Test that the columnar track table answers like its rows."""
+    tracks = parse_status(load_fixture("reaper_status_data.txt")).tracks
+    rows = list(tracks)
+
+    assert ReaperTrackTable.from_rows(rows) == tracks
+    assert rows[4].color == "#00bfbf"
+    assert tracks.count(FLAG_RECORD_ARMED) == 1
+    assert tracks.indexes(FLAG_SELECTED) == (4,)
+    assert tracks.names(FLAG_MUTED) == ()
+    # Bits beyond the first byte of the flags
+    assert tracks.indexes(512) == (0,)
+
+    changed = tracks.with_rows({2: replace(rows[2], name="Vocals", flags=FLAG_MUTED)})
+    assert changed.names(FLAG_MUTED) == ("Vocals",)
+    assert changed.keys == ("MASTER", "Piano", "Vocals", "Drums", "Bass")
+    assert tracks.count(FLAG_MUTED) == 0
+    assert changed != tracks
+
+
+async def test_get_status_error(hass: HomeAssistant, aioclient_mock):
+    """Test that an error response raises ReaperError."""
+    aioclient_mock.get(BASE_URL + STATUS_COMMAND, status=401, text="Unauthorized")
+    client = ReaperClient(async_get_clientsession(hass), "192.168.0.5", 8080)
+
+    with pytest.raises(ReaperError) as error:
+        await client.async_get_status()
+
+    assert error.value.status_code == 401
+
+
+async def test_get_status_invalid(hass: HomeAssistant, aioclient_mock):
+    """Test that a response without transport sections raises ReaperError."""
+    aioclient_mock.get(BASE_URL + STATUS_COMMAND, text="NTRACK\t4\n")
+    client = ReaperClient(async_get_clientsession(hass), "192.168.0.5", 8080)
+
+    with pytest.raises(ReaperError):
+        await client.async_get_status()
+
+
+@pytest.mark.parametrize(
+    "line",
+    (
+        "TRANSPORT\t9\t10.000000\t0\t6.1.00\t6.1.00",
+        "TRANSPORT\t0\t10.000000",
+        "TRACK\t1\tPiano\t0\t1.000000",
+        "BEATPOS\t0\tten\t20.0\t5\t0.0\t4\t4",
+    ),
+    ids=("play_state", "transport", "track", "beatpos"),
+)
+async def test_get_status_malformed(hass: HomeAssistant, aioclient_mock, line):
+    """Test that unknown values and truncated lines raise ReaperError."""
+    payload = "\n".join(
+        line if fields.split("\t")[0] == line.split("\t")[0] else fields
+        for fields in load_fixture("reaper_status_data.txt").splitlines()
+    )
+    aioclient_mock.get(BASE_URL + STATUS_COMMAND, text=payload)
+    client = ReaperClient(async_get_clientsession(hass), "192.168.0.5", 8080)
+
+    with pytest.raises(ReaperError) as error:
+        await client.async_get_status()
+
+    assert error.value.status_code == "invalid_response"
+
+
+async def test_send_command(hass: HomeAssistant, aioclient_mock):
+    """Test that commands are sent to the `/_/` endpoint."""
+    aioclient_mock.get(BASE_URL + "1007", text="")
+    client = ReaperClient(async_get_clientsession(hass), "192.168.0.5", 8080)
+
+    await client.async_send_command("1007")
+
+    assert aioclient_mock.call_count == 1
+
+
+async def test_credentials_sent(hass: HomeAssistant, aioclient_mock):
+    """Test that every request carries the basic auth header."""
+    aioclient_mock.get(BASE_URL + "1007", text="")
+    aioclient_mock.get(
+        BASE_URL + STATUS_COMMAND, text=load_fixture("reaper_status_data.txt")
+    )
+    client = ReaperClient(
+        async_get_clientsession(hass), "192.168.0.5", 8080, "admin", "pass"
+    )
+
+    await client.async_send_command("1007")
+    await client.async_get_status()
+
+    authorization = BasicAuth("admin", "pass").encode()
+    assert [call[3][hdrs.AUTHORIZATION] for call in aioclient_mock.mock_calls] == [
+        authorization,
+        authorization,
+    ]
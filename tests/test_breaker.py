@@ -0,0 +1,81 @@
+"""Test the circuit breaker of Reaper integration."""
+from datetime import timedelta
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.reaper import ReaperError
+from custom_components.reaper.breaker import (
+    BREAKER_CLOSED,
+    BREAKER_OPEN,
+    PROBE_INTERVAL,
+)
+from custom_components.reaper.const import (
+    CMD_METRONOME,
+    CONF_HOSTNAME,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+)
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+
+
+async def test_breaker(hass: HomeAssistant, reaper_emulator):
+    """Test that an unreachable host fails fast until a probe gets through."""
+    emulator = await reaper_emulator()
+    port = emulator.port
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "127.0.0.1",
+            CONF_PORT: port,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert hass.states.get("sensor.connection").state == BREAKER_CLOSED
+
+    await emulator.async_stop()
+    await coordinator.async_refresh()
+    assert coordinator.breaker.state == BREAKER_CLOSED
+    await coordinator.async_refresh()
+
+    assert coordinator.breaker.state == BREAKER_OPEN
+    assert hass.states.get("sensor.connection").state == BREAKER_OPEN
+    assert hass.states.get("switch.metronome").state == STATE_UNAVAILABLE
+
+    # Neither polls nor commands reach the network while the breaker is open
+    requests = emulator.requests
+    await coordinator.async_refresh()
+    with pytest.raises(ReaperError):
+        await coordinator.async_send_command(CMD_METRONOME)
+    assert not coordinator.last_update_success
+
+    # A probe that still cannot connect keeps the breaker open
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=PROBE_INTERVAL))
+    await hass.async_block_till_done()
+    assert coordinator.breaker.state == BREAKER_OPEN
+
+    await emulator.async_start(port)
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=2 * PROBE_INTERVAL)
+    )
+    await hass.async_block_till_done()
+
+    assert coordinator.breaker.state == BREAKER_CLOSED
+    assert emulator.requests == requests + 2
+    assert coordinator.last_update_success
+    assert hass.states.get("sensor.connection").state == BREAKER_CLOSED
+    assert hass.states.get("switch.metronome").state == "off"
@@ -0,0 +1,68 @@
+"""Test the Reaper command queue."""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.reaper.commands import MAX_CHAIN_LENGTH, ReaperCommandQueue
+from homeassistant.core import HomeAssistant
+
+
+async def test_commands_chained(hass: HomeAssistant):
+    """Test that commands within the window are sent as one request.
+
+    The response of the chain is not handed to the commands it carried.
+    """
+    send = AsyncMock(return_value="OK")
+    queue = ReaperCommandQueue(hass, send)
+
+    results = await asyncio.gather(
+        *(queue.async_send(command) for command in ("40029", "40030", "_abc"))
+    )
+
+    send.assert_awaited_once_with("40029;40030;_abc")
+    assert results == [None, None, None]
+
+
+async def test_priority_commands_first(hass: HomeAssistant):
+    """Test that priority commands are not held back by bulk commands."""
+    send = AsyncMock(return_value="")
+    queue = ReaperCommandQueue(hass, send)
+
+    bulk = hass.async_create_task(queue.async_send("40029"))
+    await asyncio.sleep(0)
+    await queue.async_send("1007", priority=True)
+
+    send.assert_awaited_once_with("1007")
+    await bulk
+    assert send.await_args_list[1].args == ("40029",)
+
+
+async def test_long_chains_split(hass: HomeAssistant):
+    """Test that chains are split to keep requests within limits."""
+    send = AsyncMock(return_value="")
+    queue = ReaperCommandQueue(hass, send)
+    command = "SET/TRACK/1/VOL/0.5"
+    count = MAX_CHAIN_LENGTH // len(command) + 1
+
+    await asyncio.gather(*(queue.async_send(command) for _ in range(count)))
+
+    assert send.await_count == 2
+    assert all(len(call.args[0]) <= MAX_CHAIN_LENGTH for call in send.await_args_list)
+    assert sum(call.args[0].count(";") + 1 for call in send.await_args_list) == count
+
+
+async def test_failed_request(hass: HomeAssistant):
+    """Test that a failed request fails every command it carried."""
+    send = AsyncMock(side_effect=ValueError("boom"))
+    queue = ReaperCommandQueue(hass, send)
+
+    results = await asyncio.gather(
+        queue.async_send("40029"), queue.async_send("40030"), return_exceptions=True
+    )
+
+    assert send.await_count == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+    with pytest.raises(ValueError):
+        await queue.async_send("1007", priority=True)
@@ -5,14 +5,24 @@ from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.reaper.const import (
     CONF_HOSTNAME,
+    CONF_INSTRUMENTATION,
+    CONF_METER_INTERVAL,
+    CONF_OSC_PORT,
     CONF_PASSWORD,
+    CONF_POLLING_PROFILE,
     CONF_PORT,
+    CONF_TRACK_ENTITIES,
     CONF_UPDATE_INTERVAL,
     CONF_USERNAME,
     DOMAIN,
+    POLLING_PROFILE_RESPONSIVE,
 )
 from homeassistant.config_entries import SOURCE_USER
-from homeassistant.data_entry_flow import RESULT_TYPE_CREATE_ENTRY, RESULT_TYPE_FORM
+from homeassistant.data_entry_flow import (
+    RESULT_TYPE_CREATE_ENTRY,
+    RESULT_TYPE_FORM,
+    RESULT_TYPE_MENU,
+)
 
 USER_INPUT = {
     CONF_HOSTNAME: "192.168.0.5",
@@ -29,8 +39,15 @@ async def test_create_entry(hass, bypass_get_data):
         DOMAIN, context={"source": SOURCE_USER}
     )
 
-    assert result["type"] == RESULT_TYPE_FORM
+    assert result["type"] == RESULT_TYPE_MENU
     assert result["step_id"] == SOURCE_USER
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input={"next_step_id": "manual"}
+    )
+
+    assert result["type"] == RESULT_TYPE_FORM
+    assert result["step_id"] == "manual"
     assert result["errors"] == {}
 
     with patch("custom_components.reaper.async_setup_entry", return_value=True):
@@ -83,9 +100,12 @@ async def test_failed_config_flow(hass, error_on_get_data):
     result = await hass.config_entries.flow.async_init(
         DOMAIN, context={"source": SOURCE_USER}
     )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input={"next_step_id": "manual"}
+    )
 
     assert result["type"] == RESULT_TYPE_FORM
-    assert result["step_id"] == "user"
+    assert result["step_id"] == "manual"
 
     result = await hass.config_entries.flow.async_configure(
         result["flow_id"], user_input=USER_INPUT
@@ -93,3 +113,41 @@ async def test_failed_config_flow(hass, error_on_get_data):
 
     assert result["type"] == RESULT_TYPE_FORM
     assert result["errors"] == {"base": "cannot_connect"}
+
+
+async def test_options_flow(hass):
+    """Test that the polling options can be changed."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="192.168.0.5",
+        data=USER_INPUT,
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+
+    assert result["type"] == RESULT_TYPE_FORM
+    assert result["step_id"] == "init"
+
+    with patch("custom_components.reaper.async_setup_entry", return_value=True):
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={
+                CONF_POLLING_PROFILE: POLLING_PROFILE_RESPONSIVE,
+                CONF_UPDATE_INTERVAL: 10,
+                CONF_TRACK_ENTITIES: True,
+                CONF_METER_INTERVAL: 5,
+                CONF_INSTRUMENTATION: True,
+                CONF_OSC_PORT: 9000,
+            },
+        )
+
+    assert result["type"] == RESULT_TYPE_CREATE_ENTRY
+    assert entry.options == {
+        CONF_POLLING_PROFILE: POLLING_PROFILE_RESPONSIVE,
+        CONF_UPDATE_INTERVAL: 10,
+        CONF_TRACK_ENTITIES: True,
+        CONF_METER_INTERVAL: 5,
+        CONF_INSTRUMENTATION: True,
+        CONF_OSC_PORT: 9000,
+    }
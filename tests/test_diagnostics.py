@@ -0,0 +1,100 @@
+"""Test the diagnostics of Reaper integration."""
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.reaper.const import (
+    CMD_METRONOME,
+    CONF_HOSTNAME,
+    CONF_INSTRUMENTATION,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+)
+from custom_components.reaper.diagnostics import async_get_config_entry_diagnostics
+from custom_components.reaper.instrumentation import ReaperInstrumentation, command_id
+from homeassistant.core import HomeAssistant
+
+
+def test_command_ids():
+    """Test that command arguments are not timed separately."""
+    assert command_id("SET/TRACK/3/VOL/0.501187") == "SET/TRACK/VOL"
+    assert command_id("SET/REPEAT/-1") == "SET/REPEAT"
+    assert command_id(CMD_METRONOME) == CMD_METRONOME
+    assert command_id("_a1b2c3") == "_a1b2c3"
+
+    instrumentation = ReaperInstrumentation()
+    instrumentation.record_command("SET/TRACK/1/MUTE/1;SET/TRACK/2/MUTE/1", 0.02)
+    instrumentation.record_command("1007", 0.2)
+
+    assert instrumentation.commands["SET/TRACK/MUTE"].count == 1
+    assert instrumentation.commands["1007"].as_dict()["p95_ms"] == 250
+
+
+async def test_diagnostics(hass: HomeAssistant, reaper_emulator):
+    """Test the timings collected with instrumentation enabled."""
+    emulator = await reaper_emulator(username="admin", password="secret")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "127.0.0.1",
+            CONF_PORT: emulator.port,
+            CONF_USERNAME: "admin",
+            CONF_PASSWORD: "secret",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+        options={CONF_INSTRUMENTATION: True},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    await coordinator.async_send_command(CMD_METRONOME)
+    await coordinator.async_refresh()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"][CONF_PASSWORD] == "**REDACTED**"
+    assert diagnostics["snapshot"]["number_of_tracks"] == 4
+    assert diagnostics["snapshot"]["flagged_tracks"] == {
+        "armed": 0,
+        "muted": 0,
+        "soloed": 0,
+        "selected": 0,
+    }
+    timings = diagnostics["instrumentation"]
+    assert timings["fetch"]["count"] == 2
+    assert timings["parse"]["count"] == 2
+    assert timings["payload_bytes"] > 0
+    assert timings["refreshes_per_minute"] == 2
+    assert list(timings["commands"]) == [CMD_METRONOME]
+    # Only the metronome switch and the diagnostic sensors had changes to write
+    assert set(timings["fan_out"]) == {"sensor", "switch"}
+
+    assert hass.states.get("sensor.payload_size").state == str(timings["payload_bytes"])
+    assert float(hass.states.get("sensor.command_round_trip").state) > 0
+    assert hass.states.get("sensor.refreshes_per_minute").state == "2.0"
+
+
+async def test_no_instrumentation(hass: HomeAssistant, bypass_get_data):
+    """Test that nothing is timed by default."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["instrumentation"] is None
+    assert diagnostics["coordinator"]["last_update_success"]
+    assert hass.states.get("sensor.fetch_latency") is None
@@ -0,0 +1,184 @@
+"""Run the Reaper integration against the web interface emulator."""
+from datetime import timedelta
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.reaper.const import (
+    CONF_HOSTNAME,
+    CONF_PASSWORD,
+    CONF_POLLING_PROFILE,
+    CONF_PORT,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+    PLAY_STATE_PLAYING,
+    POLLING_PROFILE_BALANCED,
+)
+from homeassistant.components.media_player import (
+    DOMAIN as MEDIA_PLAYER_DOMAIN,
+    SERVICE_MEDIA_PLAY,
+)
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
+from homeassistant.config_entries import SOURCE_USER, ConfigEntryState
+from homeassistant.const import ATTR_ENTITY_ID, SERVICE_TURN_ON, STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import RESULT_TYPE_CREATE_ENTRY, RESULT_TYPE_FORM
+
+from .emulator import PLAYING
+
+
+async def test_config_flow(hass: HomeAssistant, reaper_emulator):
+    """Test that the user step validates against a live web interface."""
+    emulator = await reaper_emulator(username="admin", password="secret")
+    user_input = {
+        CONF_HOSTNAME: "127.0.0.1",
+        CONF_PORT: emulator.port,
+        CONF_USERNAME: "admin",
+        CONF_PASSWORD: "wrong",
+        CONF_UPDATE_INTERVAL: 30,
+    }
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_USER}, data=user_input
+    )
+    assert result["type"] == RESULT_TYPE_FORM
+    assert result["errors"] == {"base": "cannot_connect"}
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input={**user_input, CONF_PASSWORD: "secret"}
+    )
+    assert result["type"] == RESULT_TYPE_CREATE_ENTRY
+    await hass.async_block_till_done()
+
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    assert entry.state == ConfigEntryState.LOADED
+    assert hass.states.get("sensor.number_of_tracks").state == "4"
+
+
+async def test_discovery(hass: HomeAssistant, reaper_emulator):
+    """Test that a scan finds every REAPER web interface that answers."""
+    studio = await reaper_emulator(tracks=8)
+    laptop = await reaper_emulator(tracks=2)
+    locked = await reaper_emulator(username="admin", password="secret")
+    ports = f"{studio.port}, {laptop.port},{locked.port}, 1"
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input={"next_step_id": "scan"}
+    )
+    assert result["step_id"] == "scan"
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input={"subnet": "10.0.0.0/16", "ports": ports}
+    )
+    assert result["errors"] == {"base": "invalid_subnet"}
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input={"subnet": "127.0.0.1/32", "ports": ports}
+    )
+    assert result["step_id"] == "pick"
+    options = result["data_schema"].schema["host"].container
+    assert options == {
+        f"127.0.0.1:{studio.port}": f"127.0.0.1:{studio.port} (8 tracks)",
+        f"127.0.0.1:{laptop.port}": f"127.0.0.1:{laptop.port} (2 tracks)",
+    }
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input={"host": f"127.0.0.1:{laptop.port}"}
+    )
+    assert result["type"] == RESULT_TYPE_CREATE_ENTRY
+    assert result["data"][CONF_PORT] == laptop.port
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.number_of_tracks").state == "2"
+
+    # Configured hosts are left out of later scans
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input={"next_step_id": "scan"}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input={"subnet": "127.0.0.1/32", "ports": ports}
+    )
+    assert result["errors"] == {"base": "no_hosts_found"}
+
+
+async def test_commands(hass: HomeAssistant, reaper_emulator):
+    """Test that commands change the emulated REAPER and come back in polls."""
+    emulator = await reaper_emulator(tracks=8)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "127.0.0.1",
+            CONF_PORT: emulator.port,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    await hass.services.async_call(
+        SWITCH_DOMAIN,
+        SERVICE_TURN_ON,
+        {ATTR_ENTITY_ID: "switch.metronome"},
+        blocking=True,
+    )
+    await hass.services.async_call(
+        MEDIA_PLAYER_DOMAIN,
+        SERVICE_MEDIA_PLAY,
+        {ATTR_ENTITY_ID: "media_player.127_0_0_1_reaper_transport"},
+        blocking=True,
+    )
+
+    assert emulator.metronome
+    assert emulator.play_state == PLAYING
+
+    await coordinator.async_refresh()
+    assert coordinator.data.play_state == PLAY_STATE_PLAYING
+    assert coordinator.data.metronome
+    assert coordinator.data.number_of_tracks == 8
+    assert hass.states.get("switch.metronome").state == STATE_ON
+
+
+async def test_failures_back_off(hass: HomeAssistant, reaper_emulator):
+    """Test that failing requests mark entities unavailable and back off."""
+    emulator = await reaper_emulator()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "127.0.0.1",
+            CONF_PORT: emulator.port,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+            CONF_POLLING_PROFILE: POLLING_PROFILE_BALANCED,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    interval = coordinator.update_interval
+
+    emulator.failure_rate = 1
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
+    assert hass.states.get("switch.metronome").state == "unavailable"
+    assert coordinator.update_interval != interval
+
+    emulator.failure_rate = 0
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.update_interval == interval
+    assert interval == timedelta(seconds=15)
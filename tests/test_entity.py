@@ -0,0 +1,131 @@
+"""Test per-track entities of Reaper integration."""
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry, load_fixture
+
+from custom_components.reaper.const import (
+    CONF_HOSTNAME,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_TRACK_ENTITIES,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+)
+from custom_components.reaper.models import ReaperMarkerIndex, parse_status
+from homeassistant.components.number import (
+    ATTR_VALUE,
+    DOMAIN as NUMBER_DOMAIN,
+    SERVICE_SET_VALUE,
+)
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID, SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+FIXTURE = load_fixture("reaper_status_data.txt")
+
+
+async def _setup_entry(hass: HomeAssistant) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 9999,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+        options={CONF_TRACK_ENTITIES: True},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_track_entities(hass: HomeAssistant):
+    """Test that every track gets volume, flag and peak entities."""
+    registry = er.async_get(hass)
+
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=parse_status(FIXTURE),
+    ):
+        await _setup_entry(hass)
+
+    assert hass.states.get("number.piano_volume").state == "0.0"
+    assert hass.states.get("switch.piano_record_arm").state == STATE_ON
+    assert hass.states.get("switch.piano_mute").state == STATE_OFF
+    assert hass.states.get("sensor.piano_peak").state == "-51.0"
+    assert hass.states.get("sensor.master_peak").state == "-150.0"
+
+    entry = registry.async_get("switch.piano_record_arm")
+    assert entry
+    assert entry.unique_id == "192.168.0.5-track-Piano-arm"
+
+
+async def test_track_entities_follow_project(hass: HomeAssistant):
+    """Test that entities are added and removed with the tracks."""
+    registry = er.async_get(hass)
+
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=parse_status(FIXTURE),
+    ):
+        entry = await _setup_entry(hass)
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    bass = registry.async_get("number.bass_volume")
+    assert bass
+
+    # Guitar is removed and Vocals is added at the end of the project
+    lines = FIXTURE.splitlines()
+    lines = [line for line in lines if "\tGuitar\t" not in line]
+    lines.append(
+        "TRACK\t5\tVocals\t0\t0.500000\t0.000000\t-1500\t-1500"
+        "\t1.000000\t3\t0\t0\t0\t16826303"
+    )
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=parse_status("\n".join(lines)),
+    ), patch(
+        "custom_components.reaper.ReaperClient.async_get_markers",
+        return_value=ReaperMarkerIndex(),
+    ) as get_markers:
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    # Other tracks could mean another project, with other markers
+    assert get_markers.called
+    assert hass.states.get("number.guitar_volume") is None
+    assert registry.async_get("number.guitar_volume") is None
+    assert hass.states.get("number.vocals_volume").state == "-6.02"
+    assert registry.async_get("number.bass_volume") == bass
+
+
+async def test_track_commands(hass: HomeAssistant):
+    """Test that track entities send SET/TRACK commands for their track."""
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=parse_status(FIXTURE),
+    ), patch(
+        "custom_components.reaper.ReaperClient.async_send_command", return_value=""
+    ) as mock_send:
+        await _setup_entry(hass)
+
+        await hass.services.async_call(
+            SWITCH_DOMAIN,
+            SERVICE_TURN_ON,
+            {ATTR_ENTITY_ID: "switch.drums_solo"},
+            blocking=True,
+        )
+        mock_send.assert_called_once_with("SET/TRACK/3/SOLO/1")
+
+        await hass.services.async_call(
+            NUMBER_DOMAIN,
+            SERVICE_SET_VALUE,
+            {ATTR_ENTITY_ID: "number.bass_volume", ATTR_VALUE: -6},
+            blocking=True,
+        )
+        assert mock_send.call_args.args == ("SET/TRACK/4/VOL/0.501187",)
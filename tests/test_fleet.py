@@ -0,0 +1,140 @@
+"""Test the fleet schedule of Reaper integration."""
+from dataclasses import replace
+from datetime import timedelta
+from time import monotonic
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    get_system_health_info,
+)
+
+from custom_components.reaper.const import (
+    CONF_HOSTNAME,
+    CONF_PASSWORD,
+    CONF_POLLING_PROFILE,
+    CONF_PORT,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DATA_FLEET,
+    DOMAIN,
+    PLAY_STATE_PLAYING,
+    POLLING_PROFILE_ECO,
+)
+from custom_components.reaper.fleet import MIN_PHASE_GAP, ReaperFleet
+from custom_components.reaper.polling import POLLING_PROFILES
+from homeassistant.components.media_player import DOMAIN as MEDIA_PLAYER_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID, SERVICE_MEDIA_PLAY
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+
+def test_polls_spread():
+    """Test that hosts with the same interval poll at evenly spaced phases."""
+    fleet = ReaperFleet()
+    coordinators = [MagicMock() for _ in range(4)]
+    for coordinator in coordinators:
+        fleet.async_register(coordinator)
+
+    now = 1000.3
+    polls = [fleet.next_refresh(coordinator, now, 10) for coordinator in coordinators]
+
+    assert sorted(poll % 10 for poll in polls) == [0, 2.5, 5, 7.5]
+    assert all(now + MIN_PHASE_GAP * 10 <= poll <= now + 12.5 for poll in polls)
+
+    # The next poll of a host lands one interval after the last one
+    assert fleet.next_refresh(coordinators[1], polls[1] + 0.2, 10) == polls[1] + 10
+
+    assert [fleet.async_unregister(coordinator) for coordinator in coordinators] == [
+        False,
+        False,
+        False,
+        True,
+    ]
+
+
+async def test_fleet_metrics(hass: HomeAssistant, bypass_get_data):
+    """Test the fleet metrics reported to system health."""
+    assert await async_setup_component(hass, "system_health", {})
+    for hostname in ("192.168.0.5", "192.168.0.6"):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_HOSTNAME: hostname,
+                CONF_PORT: 8080,
+                CONF_USERNAME: "",
+                CONF_PASSWORD: "",
+                CONF_UPDATE_INTERVAL: 60,
+            },
+        )
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    # Both hosts fetched once during setup, well below 1 ms
+    fleet = hass.data[DATA_FLEET]
+    for latency in range(1, 101):
+        fleet.async_record_fetch(monotonic(), latency / 1000)
+
+    info = await get_system_health_info(hass, DOMAIN)
+
+    assert info["hosts"] == 2
+    assert info["hosts_down"] == 0
+    assert info["fetches_per_second"] == 1.7
+    assert info["latency_p95_ms"] == 95.0
+
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    assert DATA_FLEET not in hass.data
+
+
+async def test_poll_after_play(hass: HomeAssistant, bypass_get_data, freezer):
+    """Test that the first poll after play is not held back by the fleet phase."""
+    for hostname in ("192.168.0.5", "192.168.0.6"):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_HOSTNAME: hostname,
+                CONF_PORT: 8080,
+                CONF_USERNAME: "",
+                CONF_PASSWORD: "",
+                CONF_UPDATE_INTERVAL: 60,
+                CONF_POLLING_PROFILE: POLLING_PROFILE_ECO,
+            },
+        )
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    rolling = POLLING_PROFILES[POLLING_PROFILE_ECO].rolling
+
+    def delay() -> float:
+        return coordinator._unsub_refresh.__self__.when() - hass.loop.time()
+
+    # Just short of the phase of the host, which is half an interval in
+    freezer.tick(
+        (rolling / 2 - MIN_PHASE_GAP * rolling / 2 - hass.loop.time()) % rolling
+    )
+    with patch(
+        "custom_components.reaper.ReaperClient.async_send_command", return_value=""
+    ):
+        await hass.services.async_call(
+            MEDIA_PLAYER_DOMAIN,
+            SERVICE_MEDIA_PLAY,
+            {ATTR_ENTITY_ID: "media_player.192_168_0_6_reaper_transport"},
+            blocking=True,
+        )
+
+    assert coordinator.update_interval == timedelta(seconds=rolling)
+    assert delay() <= rolling
+
+    # Steady-state polls go back to the phase of the host
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=replace(coordinator.data, play_state=PLAY_STATE_PLAYING),
+    ):
+        await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(seconds=rolling)
+    when = coordinator._unsub_refresh.__self__.when()
+    assert when % rolling == pytest.approx(rolling / 2)
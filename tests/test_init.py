@@ -1,15 +1,63 @@
 """Test init of Reaper integration."""
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+import asyncio
+from dataclasses import replace
+from datetime import timedelta
+import json
+from unittest.mock import patch
 
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    load_fixture,
+)
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMockResponse,
+)
+
+from custom_components.reaper import (
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_VERSION,
+    ReaperError,
+)
+from custom_components.reaper.api import (
+    STATUS_COMMAND,
+    TRACKS_COMMAND,
+    TRANSPORT_COMMAND,
+)
 from custom_components.reaper.const import (
     CONF_HOSTNAME,
     CONF_PASSWORD,
+    CONF_POLLING_PROFILE,
     CONF_PORT,
     CONF_UPDATE_INTERVAL,
     CONF_USERNAME,
     DOMAIN,
+    PLAY_STATE_PLAYING,
+    POLLING_PROFILE_BALANCED,
+    POLLING_PROFILE_FIXED,
+    POLLING_PROFILE_RESPONSIVE,
+)
+from custom_components.reaper.models import (
+    ReaperSnapshot,
+    ReaperStatusParser,
+    parse_status,
 )
+from custom_components.reaper.polling import POLLING_PROFILES
 from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    EVENT_STATE_CHANGED,
+    STATE_OFF,
+    STATE_UNAVAILABLE,
+)
+from homeassistant.core import callback
+from homeassistant.setup import async_setup_component
+import homeassistant.util.dt as dt_util
+
+FIXTURE = load_fixture("reaper_status_data.txt")
+TRANSPORT_FIXTURE = "\n".join(
+    line for line in FIXTURE.splitlines() if not line.startswith("TRACK")
+)
 
 
 async def test_config_entry_not_ready(hass, error_on_get_data):
@@ -30,6 +78,129 @@ async def test_config_entry_not_ready(hass, error_on_get_data):
     assert entry.state == ConfigEntryState.SETUP_RETRY
 
 
+async def test_migrate_entry(hass, bypass_get_data):
+    """Test that entries from before polling profiles keep their fixed interval."""
+    legacy = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 45,
+        },
+    )
+    legacy.add_to_hass(hass)
+    await hass.config_entries.async_setup(legacy.entry_id)
+    await hass.async_block_till_done()
+
+    assert legacy.version == 2
+    assert legacy.data[CONF_POLLING_PROFILE] == POLLING_PROFILE_FIXED
+    coordinator = hass.data[DOMAIN][legacy.entry_id]
+    assert coordinator.update_interval == timedelta(seconds=45)
+
+    # A profile picked in the options is kept
+    chosen = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.6",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 45,
+        },
+        options={CONF_POLLING_PROFILE: POLLING_PROFILE_RESPONSIVE},
+    )
+    chosen.add_to_hass(hass)
+    await hass.config_entries.async_setup(chosen.entry_id)
+    await hass.async_block_till_done()
+
+    assert chosen.version == 2
+    assert CONF_POLLING_PROFILE not in chosen.data
+
+
+async def test_restored_snapshot_startup(hass, hass_storage):
+    """Test that setup does not wait for the host when a snapshot is stored."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 60,
+        },
+    )
+    entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.{entry.entry_id}"] = {
+        "version": SNAPSHOT_STORAGE_VERSION,
+        "key": f"{DOMAIN}.{entry.entry_id}",
+        "data": json.loads(json.dumps(parse_status(FIXTURE).as_dict())),
+    }
+    host_down = asyncio.Event()
+    added = asyncio.Event()
+    states = []
+
+    async def unreachable(*args):
+        await host_down.wait()
+        raise ReaperError(500, "exception")
+
+    @callback
+    def _state_changed(event):
+        if event.data["entity_id"] == "sensor.number_of_tracks":
+            states.append(event.data["new_state"].state)
+            added.set()
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _state_changed)
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        side_effect=unreachable,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+
+        # Setup is done and entities are added before the host answered
+        assert entry.state == ConfigEntryState.LOADED
+        await asyncio.wait_for(added.wait(), 5)
+
+        host_down.set()
+        await hass.async_block_till_done()
+
+    # Entities started from the stored snapshot
+    assert states == ["4", STATE_UNAVAILABLE]
+
+
+async def test_snapshot_stored(hass, hass_storage, bypass_get_data):
+    """Test that the last snapshot is written to disk after a while."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 60,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    key = f"{DOMAIN}.{entry.entry_id}"
+    assert key not in hass_storage
+
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=SNAPSHOT_SAVE_DELAY)
+    )
+    await hass.async_block_till_done()
+
+    data = json.loads(json.dumps(hass_storage[key]["data"]))
+    assert ReaperSnapshot.from_dict(data) == coordinator.data
+
+    assert await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+    assert key not in hass_storage
+
+
 async def test_unload_entry(hass):
     """Test successful unload of entry."""
     entry = MockConfigEntry(
@@ -54,3 +225,236 @@ async def test_unload_entry(hass):
 
     assert entry.state == ConfigEntryState.NOT_LOADED
     assert not hass.data.get(DOMAIN)
+
+
+async def test_single_decode_per_refresh(hass, aioclient_mock):
+    """Test that the status payload is parsed once per refresh."""
+    aioclient_mock.get(f"http://192.168.0.5:8080/_/{STATUS_COMMAND}", text=FIXTURE)
+    aioclient_mock.get(
+        f"http://192.168.0.5:8080/_/{TRANSPORT_COMMAND}", text=TRANSPORT_FIXTURE
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 60,
+            CONF_POLLING_PROFILE: POLLING_PROFILE_BALANCED,
+        },
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.reaper.api.ReaperStatusParser.snapshot",
+        autospec=True,
+        side_effect=ReaperStatusParser.snapshot,
+    ) as mock_snapshot:
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        assert entry.state == ConfigEntryState.LOADED
+        assert mock_snapshot.call_count == aioclient_mock.call_count
+
+        refreshes = aioclient_mock.call_count
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+        assert aioclient_mock.call_count == refreshes + 1
+        assert mock_snapshot.call_count == aioclient_mock.call_count
+
+    assert hass.states.get("sensor.number_of_armed_tracks").attributes[
+        "armed_tracks"
+    ] == ["Piano"]
+
+
+async def test_tiered_polling(hass, aioclient_mock):
+    """Test that the track table is only fetched when it is due or changed."""
+    url = "http://192.168.0.5:8080/_/"
+    aioclient_mock.get(url + STATUS_COMMAND, text=FIXTURE)
+    aioclient_mock.get(url + TRANSPORT_COMMAND, text=TRANSPORT_FIXTURE)
+    aioclient_mock.get(url + f"{TRANSPORT_COMMAND};{TRACKS_COMMAND}", text=FIXTURE)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 60,
+            CONF_POLLING_PROFILE: POLLING_PROFILE_BALANCED,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    tracks = coordinator.data.tracks
+
+    def requested() -> list[str]:
+        commands = [call[1].path[len("/_/") :] for call in aioclient_mock.mock_calls]
+        aioclient_mock.mock_calls.clear()
+        return commands
+
+    assert requested() == [STATUS_COMMAND]
+
+    await coordinator.async_refresh()
+    assert requested() == [TRANSPORT_COMMAND]
+    assert coordinator.data.tracks == tracks
+
+    coordinator.async_invalidate_tracks()
+    await coordinator.async_refresh()
+    assert requested() == [f"{TRANSPORT_COMMAND};{TRACKS_COMMAND}"]
+
+    # Actions can change markers as well
+    coordinator.async_invalidate_project()
+    await coordinator.async_refresh()
+    assert requested() == [STATUS_COMMAND]
+
+    # A track was added, so NTRACK no longer matches the cached table
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(
+        url + TRANSPORT_COMMAND,
+        text=TRANSPORT_FIXTURE.replace("NTRACK\t4", "NTRACK\t5"),
+    )
+    aioclient_mock.get(url + TRACKS_COMMAND, text=FIXTURE)
+    await coordinator.async_refresh()
+    assert requested() == [TRANSPORT_COMMAND, TRACKS_COMMAND]
+    assert coordinator.data.number_of_tracks == 5
+
+
+async def test_adaptive_polling(hass, bypass_get_data):
+    """Test that the poll interval follows transport state and reachability."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 60,
+        },
+        options={CONF_POLLING_PROFILE: POLLING_PROFILE_RESPONSIVE},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    profile = POLLING_PROFILES[POLLING_PROFILE_RESPONSIVE]
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert coordinator.update_interval == timedelta(seconds=profile.stopped)
+
+    coordinator.async_transport_changed(PLAY_STATE_PLAYING)
+    assert coordinator.update_interval == timedelta(seconds=profile.rolling)
+
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        side_effect=ReaperError(500, "exception"),
+    ):
+        await coordinator.async_refresh()
+        first = coordinator.update_interval
+        await coordinator.async_refresh()
+        await coordinator.async_refresh()
+        third = coordinator.update_interval
+
+    assert profile.unreachable / 2 <= first.total_seconds() <= profile.unreachable
+    assert 2 * profile.unreachable <= third.total_seconds() <= 4 * profile.unreachable
+
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.update_interval == timedelta(seconds=profile.stopped)
+
+
+async def test_unchanged_state_writes_suppressed(hass, bypass_get_data):
+    """Test that only entities with changed inputs are written."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 60,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    listeners = len(list(coordinator.async_contexts()))
+    metronome = hass.states.get("switch.metronome")
+    repeat = hass.states.get("switch.repeat")
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.suppressed_writes == listeners
+
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=replace(coordinator.data, metronome=False),
+    ):
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert coordinator.suppressed_writes == listeners - 1
+    assert hass.states.get("switch.metronome").state == STATE_OFF
+    assert hass.states.get("switch.metronome").last_updated > metronome.last_updated
+    assert hass.states.get("switch.repeat").last_updated == repeat.last_updated
+
+
+async def test_refresh_burst_single_flight(hass, aioclient_mock):
+    """Test that a burst of refresh triggers sends a single request."""
+
+    async def slow_response(method, url, data):
+        await asyncio.sleep(0.05)
+        text = TRANSPORT_FIXTURE if url.path.endswith(TRANSPORT_COMMAND) else FIXTURE
+        return AiohttpClientMockResponse(method, url, text=text)
+
+    url = "http://192.168.0.5:8080/_/"
+    aioclient_mock.get(url + STATUS_COMMAND, side_effect=slow_response)
+    aioclient_mock.get(url + TRANSPORT_COMMAND, side_effect=slow_response)
+    assert await async_setup_component(hass, "homeassistant", {})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 60,
+            CONF_POLLING_PROFILE: POLLING_PROFILE_BALANCED,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    aioclient_mock.mock_calls.clear()
+
+    await asyncio.gather(
+        coordinator.async_refresh(),
+        coordinator.async_refresh(),
+        coordinator.async_request_refresh(),
+        hass.services.async_call(
+            "homeassistant",
+            "update_entity",
+            {
+                ATTR_ENTITY_ID: [
+                    "media_player.192_168_0_5_reaper_transport",
+                    "switch.metronome",
+                    "switch.repeat",
+                ]
+            },
+            blocking=True,
+        ),
+    )
+
+    assert aioclient_mock.call_count == 1
+    assert coordinator.coalesced_refreshes >= 2
+    assert coordinator.last_update_success
@@ -0,0 +1,195 @@
+"""Test the markers and regions of Reaper integration."""
+from dataclasses import replace
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    load_fixture,
+)
+
+from custom_components.reaper.const import (
+    CONF_HOSTNAME,
+    CONF_PASSWORD,
+    CONF_POLLING_PROFILE,
+    CONF_PORT,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+    PLAY_STATE_PLAYING,
+    POLLING_PROFILE_FIXED,
+)
+from custom_components.reaper.media_player import MEDIA_TYPE_MARKER, MEDIA_TYPE_REGION
+from custom_components.reaper.models import parse_status
+from homeassistant.components.media_player import (
+    ATTR_MEDIA_CONTENT_ID,
+    ATTR_MEDIA_CONTENT_TYPE,
+    DOMAIN as MEDIA_PLAYER_DOMAIN,
+    SERVICE_MEDIA_NEXT_TRACK,
+    SERVICE_MEDIA_PREVIOUS_TRACK,
+    SERVICE_PLAY_MEDIA,
+)
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+
+from .emulator import EmulatedMarker
+
+MARKERS = """MARKER_LIST
+MARKER\tDrop\t1\t20.000000\t0
+MARKER\t\t2\t50.000000\t0
+MARKER_LIST_END
+REGION_LIST
+REGION\tIntro\t1\t0.000000\t10.000000\t0
+REGION\tVerse\t2\t10.000000\t30.000000\t16576
+REGION\tFill\t3\t25.000000\t28.000000\t0
+REGION\tChorus\t4\t30.000000\t45.000000\t0
+REGION_LIST_END
+"""
+
+
+def test_marker_index():
+    """Test looking up markers and regions by position."""
+    markers = parse_status(
+        load_fixture("reaper_status_data.txt") + "\n" + MARKERS
+    ).markers
+
+    assert len(markers) == 6
+    assert [region.name for region in markers.regions] == [
+        "Intro",
+        "Verse",
+        "Fill",
+        "Chorus",
+    ]
+    assert markers.get(True, 2).color == "#0040c0"
+    assert markers.get(False, 2).end is None
+
+    assert markers.region_at(0).name == "Intro"
+    assert markers.region_at(10).name == "Verse"
+    assert markers.region_at(26).name == "Fill"
+    assert markers.region_at(29).name == "Verse"
+    assert markers.region_at(45) is None
+
+    assert markers.next_marker(10).name == "Drop"
+    assert markers.previous_marker(20).name == "Verse"
+    assert markers.next_boundary(26) == 28
+    assert markers.next_boundary(45) is None
+
+
+async def test_current_region(hass: HomeAssistant, freezer):
+    """Test that the region follows the playhead without polls."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+        options={CONF_POLLING_PROFILE: POLLING_PROFILE_FIXED},
+    )
+    entry.add_to_hass(hass)
+    stopped = parse_status(load_fixture("reaper_status_data.txt") + "\n" + MARKERS)
+    playing = replace(
+        stopped,
+        play_state=PLAY_STATE_PLAYING,
+        beatpos=replace(stopped.beatpos, position_seconds=5, full_beat_position=10),
+    )
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=playing,
+    ) as get_status:
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    entity_id = "media_player.192_168_0_5_reaper_transport"
+
+    state = hass.states.get(entity_id)
+    assert state.attributes["region"] == "Intro"
+    assert state.attributes["region_end"] == 10
+
+    freezer.tick(5)
+    async_fire_time_changed(hass, dt_util.utcnow())
+    await hass.async_block_till_done()
+
+    state = hass.states.get(entity_id)
+    assert state.attributes["region"] == "Verse"
+    assert state.attributes["region_start"] == 10
+    assert get_status.call_count == 1
+
+
+async def test_markers_emulated(hass: HomeAssistant, reaper_emulator):
+    """Test browsing, jumping to and refetching markers of a REAPER host."""
+    emulator = await reaper_emulator()
+    emulator.markers = [
+        EmulatedMarker("Intro", 1, 0, 10),
+        EmulatedMarker("Verse", 2, 10, 30),
+        EmulatedMarker("Drop", 1, 20),
+    ]
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "127.0.0.1",
+            CONF_PORT: emulator.port,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    entity_id = "media_player.127_0_0_1_reaper_transport"
+    entity = hass.data[MEDIA_PLAYER_DOMAIN].get_entity(entity_id)
+
+    browse = await entity.async_browse_media()
+    assert [
+        (child.media_content_type, child.media_content_id, child.title)
+        for child in browse.children
+    ] == [
+        (MEDIA_TYPE_REGION, "1", "Intro"),
+        (MEDIA_TYPE_REGION, "2", "Verse"),
+        (MEDIA_TYPE_MARKER, "1", "Drop"),
+    ]
+
+    await hass.services.async_call(
+        MEDIA_PLAYER_DOMAIN,
+        SERVICE_PLAY_MEDIA,
+        {
+            ATTR_ENTITY_ID: entity_id,
+            ATTR_MEDIA_CONTENT_TYPE: MEDIA_TYPE_REGION,
+            ATTR_MEDIA_CONTENT_ID: "2",
+        },
+        blocking=True,
+    )
+    assert emulator.position == 10
+    await coordinator.async_refresh()
+    assert hass.states.get(entity_id).attributes["region"] == "Verse"
+
+    await hass.services.async_call(
+        MEDIA_PLAYER_DOMAIN,
+        SERVICE_MEDIA_NEXT_TRACK,
+        {ATTR_ENTITY_ID: entity_id},
+        blocking=True,
+    )
+    assert emulator.position == 20
+    await coordinator.async_refresh()
+
+    # Markers are not fetched again while the project stays the same
+    emulator.markers.append(EmulatedMarker("Outro", 3, 40, 50))
+    await coordinator.async_refresh()
+    assert len(coordinator.data.markers) == 3
+
+    await hass.services.async_call(
+        MEDIA_PLAYER_DOMAIN,
+        SERVICE_MEDIA_PREVIOUS_TRACK,
+        {ATTR_ENTITY_ID: entity_id},
+        blocking=True,
+    )
+    assert emulator.position == 10
+
+    # Undo or any other action could have moved them
+    await entity.async_reaper_undo()
+    await coordinator.async_refresh()
+    assert len(coordinator.data.markers) == 4
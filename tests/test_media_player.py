@@ -0,0 +1,86 @@
+"""Test media player of Reaper integration."""
+from dataclasses import replace
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.reaper.clock import DRIFT_THRESHOLD
+from custom_components.reaper.const import (
+    CONF_HOSTNAME,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+    PLAY_STATE_PLAYING,
+)
+from homeassistant.components.media_player import (
+    ATTR_MEDIA_POSITION,
+    ATTR_MEDIA_POSITION_UPDATED_AT,
+)
+from homeassistant.const import STATE_PLAYING
+from homeassistant.core import HomeAssistant
+
+ENTITY_ID = "media_player.192_168_0_5_reaper_transport"
+
+
+async def test_media_position(hass: HomeAssistant, bypass_get_data, freezer):
+    """Test that the position is extrapolated and only corrected on drift."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    stopped = coordinator.data
+
+    async def poll(seconds: float, beats: float) -> None:
+        """Poll a playing transport at 120 BPM."""
+        snapshot = replace(
+            stopped,
+            play_state=PLAY_STATE_PLAYING,
+            beatpos=replace(
+                stopped.beatpos, position_seconds=seconds, full_beat_position=beats
+            ),
+        )
+        with patch(
+            "custom_components.reaper.ReaperClient.async_get_status",
+            return_value=snapshot,
+        ):
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+
+    await poll(10, 20)
+    started = hass.states.get(ENTITY_ID)
+    assert started.state == STATE_PLAYING
+    assert started.attributes[ATTR_MEDIA_POSITION] == 10
+
+    # The second poll gives the tempo
+    freezer.tick(1)
+    await poll(11, 22)
+    state = hass.states.get(ENTITY_ID)
+    assert state.attributes["bpm"] == 120.0
+
+    # Right where the extrapolation expects it: nothing is written
+    freezer.tick(1)
+    await poll(12, 24)
+    assert hass.states.get(ENTITY_ID).last_updated == state.last_updated
+
+    # Drifted, e.g. after a seek: the position is corrected
+    freezer.tick(1)
+    await poll(13 + 2 * DRIFT_THRESHOLD, 26 + 4 * DRIFT_THRESHOLD)
+    state = hass.states.get(ENTITY_ID)
+    assert state.attributes[ATTR_MEDIA_POSITION] == 13 + 2 * DRIFT_THRESHOLD
+    assert (
+        state.attributes[ATTR_MEDIA_POSITION_UPDATED_AT]
+        > started.attributes[ATTR_MEDIA_POSITION_UPDATED_AT]
+    )
@@ -0,0 +1,200 @@
+"""Test track meter sampling of Reaper integration."""
+from dataclasses import replace
+from unittest.mock import AsyncMock, patch
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    load_fixture,
+)
+
+from custom_components.reaper.breaker import BREAKER_OPEN
+from custom_components.reaper.const import (
+    CONF_HOSTNAME,
+    CONF_PASSWORD,
+    CONF_POLLING_PROFILE,
+    CONF_PORT,
+    CONF_TRACK_ENTITIES,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+    PLAY_STATE_PLAYING,
+    PLAY_STATE_STOPPED,
+    POLLING_PROFILE_BALANCED,
+)
+from custom_components.reaper.meters import (
+    METER_SAMPLE_INTERVAL,
+    MeterRingBuffer,
+    ReaperMeterStats,
+)
+from custom_components.reaper.models import parse_status
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .emulator import PLAYING
+
+FIXTURE = load_fixture("reaper_status_data.txt")
+# Seconds of rolling transport to count the requests of
+SECONDS = 10
+
+
+def test_ring_buffer():
+    """Test window and peak hold levels of a wrapped ring buffer."""
+    buffer = MeterRingBuffer(4)
+    assert buffer.stats() is None
+
+    for value in (-100, -20, -300):
+        buffer.append(value)
+    assert buffer.stats() == ReaperMeterStats(-30.0, -2.0, -14.0, -2.0)
+
+    # Overwrites -100 and -20, but the peak is held until it falls out
+    for value in (-400, -500, -600):
+        buffer.append(value)
+    assert buffer.stats() == ReaperMeterStats(-60.0, -40.0, -50.0, -30.0)
+
+
+async def test_meters_published(hass: HomeAssistant):
+    """Test that sampled meters reach the peak sensors once per window."""
+    snapshot = parse_status(FIXTURE)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 9999,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+        options={CONF_TRACK_ENTITIES: True},
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=snapshot,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    meters = coordinator.meters
+    meters.async_stop()
+    meters._fetch = AsyncMock(
+        return_value=dict(zip(snapshot.tracks.keys, snapshot.tracks.last_meter_peak))
+    )
+
+    writes = []
+    hass.bus.async_listen("state_changed", writes.append)
+
+    for _ in range(3):
+        await meters._async_sample()
+    assert not writes
+
+    meters._async_publish()
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.piano_peak")
+    assert state.state == "-51.0"
+    assert state.attributes["peak_hold"] == -51.0
+    assert state.attributes["mean"] == -51.0
+    assert {event.data["entity_id"] for event in writes} == {
+        f"sensor.{name}_peak" for name in ("piano", "guitar", "drums", "bass", "master")
+    }
+
+
+async def test_meters_sampled_while_rolling(hass: HomeAssistant):
+    """Test that meters are only sampled while playing, into the track tier."""
+    snapshot = parse_status(FIXTURE)
+    stopped = replace(snapshot, play_state=PLAY_STATE_STOPPED)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 9999,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+        options={CONF_TRACK_ENTITIES: True},
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=stopped,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    meters = coordinator.meters
+    meters.async_stop()
+    louder = snapshot.tracks.with_rows(
+        {1: replace(snapshot.tracks[1], last_meter_peak=-60)}
+    )
+
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_tracks",
+        return_value=louder,
+    ) as get_tracks:
+        await meters._async_sample()
+        assert not get_tracks.called
+
+        coordinator.data = replace(coordinator.data, play_state=PLAY_STATE_PLAYING)
+        await meters._async_sample()
+        get_tracks.assert_called_once_with(0, 4)
+        assert coordinator.data.tracks is louder
+
+        coordinator.breaker.state = BREAKER_OPEN
+        await meters._async_sample()
+        assert get_tracks.call_count == 1
+
+    meters._async_publish()
+    assert meters.stats("Piano").maximum == -6.0
+
+
+async def test_meter_requests_while_rolling(
+    hass: HomeAssistant, reaper_emulator, freezer
+):
+    """Test that rolling meters only fetch the tracks with a meter entity."""
+    emulator = await reaper_emulator(tracks=300)
+    emulator.play_state = PLAYING
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "127.0.0.1",
+            CONF_PORT: emulator.port,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+            CONF_POLLING_PROFILE: POLLING_PROFILE_BALANCED,
+        },
+        options={CONF_TRACK_ENTITIES: True},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    emulator.tracks[2].peak = -120
+
+    # Only the meters of the master and tracks 1 and 2 are shown
+    registry = er.async_get(hass)
+    for index in range(3, 301):
+        registry.async_update_entity(
+            f"sensor.track_{index}_peak", disabled_by=er.RegistryEntryDisabler.USER
+        )
+    await hass.async_block_till_done()
+
+    with patch.object(
+        coordinator.client,
+        "async_get_tracks",
+        wraps=coordinator.client.async_get_tracks,
+    ) as get_tracks:
+        for _ in range(int(SECONDS / METER_SAMPLE_INTERVAL)):
+            freezer.tick(METER_SAMPLE_INTERVAL)
+            async_fire_time_changed(hass)
+            await hass.async_block_till_done()
+
+    # At most one small request per sample interval, none of the full table
+    assert SECONDS <= get_tracks.call_count <= SECONDS / METER_SAMPLE_INTERVAL
+    assert {call.args for call in get_tracks.call_args_list} == {(0, 2)}
+    assert coordinator.meters.stats("Track 2").maximum == -12.0
+    assert coordinator.meters.stats("Track 3") is None
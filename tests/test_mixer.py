@@ -0,0 +1,192 @@
+"""Test bulk track changes and track lists of Reaper integration."""
+from datetime import timedelta
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+import voluptuous as vol
+
+from custom_components.reaper.const import (
+    ATTR_TRACKS,
+    CONF_HOSTNAME,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+    FLAG_MUTED,
+    FLAG_RECORD_ARMED,
+    SERVICE_GET_TRACKS,
+    SERVICE_SET_TRACKS,
+)
+from custom_components.reaper.sensor import MAX_LIST_ATTRIBUTE_ITEMS
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.util.dt as dt_util
+
+MEDIA_PLAYER = "media_player.127_0_0_1_reaper_transport"
+
+
+async def test_set_tracks(hass: HomeAssistant, reaper_emulator):
+    """Test that track changes are sent in one request and followed by one refresh."""
+    emulator = await reaper_emulator()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "127.0.0.1",
+            CONF_PORT: emulator.port,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    requests = emulator.requests
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_TRACKS,
+        {
+            ATTR_ENTITY_ID: MEDIA_PLAYER,
+            ATTR_TRACKS: [
+                {"track": "*", "mute": True},
+                {"track": ["Track 2", 3], "volume": -6, "pan": 0.5},
+                {"track": 3, "mute": False},
+            ],
+        },
+        blocking=True,
+    )
+
+    assert emulator.requests == requests + 1
+    assert emulator.commands == [
+        "SET/TRACK/1/MUTE/1",
+        "SET/TRACK/2/MUTE/1",
+        "SET/TRACK/4/MUTE/1",
+        "SET/TRACK/2/VOL/0.501187",
+        "SET/TRACK/2/PAN/0.500000",
+        "SET/TRACK/3/VOL/0.501187",
+        "SET/TRACK/3/PAN/0.500000",
+        "SET/TRACK/3/MUTE/0",
+    ]
+    assert [bool(track.flags & FLAG_MUTED) for track in emulator.tracks] == [
+        False,
+        True,
+        True,
+        False,
+        True,
+    ]
+
+    # Bad selectors fail against the cached track table, before any request
+    for selector in (5, "Vocals", ["Track 1", 9]):
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_SET_TRACKS,
+                {
+                    ATTR_ENTITY_ID: MEDIA_PLAYER,
+                    ATTR_TRACKS: [{"track": selector, "solo": True}],
+                },
+                blocking=True,
+            )
+    assert emulator.requests == requests + 1
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    assert emulator.requests == requests + 2
+    assert round(coordinator.data.tracks[3].volume, 3) == 0.501
+    assert coordinator.data.tracks[4].flags & FLAG_MUTED
+
+
+async def test_track_names_like_indexes(hass: HomeAssistant, reaper_emulator):
+    """Test that names that look like numbers select tracks by name."""
+    emulator = await reaper_emulator()
+    emulator.tracks[2].name = "1"
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "127.0.0.1",
+            CONF_PORT: emulator.port,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_TRACKS,
+        {
+            ATTR_ENTITY_ID: MEDIA_PLAYER,
+            ATTR_TRACKS: [{"track": "1", "mute": True}, {"track": 1, "solo": True}],
+        },
+        blocking=True,
+    )
+    assert emulator.commands == ["SET/TRACK/2/MUTE/1", "SET/TRACK/1/SOLO/1"]
+
+    for selector in (-1, True):
+        with pytest.raises(vol.Invalid):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_SET_TRACKS,
+                {
+                    ATTR_ENTITY_ID: MEDIA_PLAYER,
+                    ATTR_TRACKS: [{"track": selector, "mute": True}],
+                },
+                blocking=True,
+            )
+
+
+async def test_get_tracks(hass: HomeAssistant, reaper_emulator):
+    """Test that long track lists are capped in attributes and returned in full."""
+    emulator = await reaper_emulator(tracks=50)
+    for track in emulator.tracks[1:41]:
+        track.flags |= FLAG_RECORD_ARMED
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "127.0.0.1",
+            CONF_PORT: emulator.port,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.number_of_armed_tracks")
+    assert state.state == "40"
+    assert len(state.attributes["armed_tracks"]) == MAX_LIST_ATTRIBUTE_ITEMS
+    assert state.attributes["armed_tracks_digest"]
+    assert "armed_tracks" in state.state_info["unrecorded_attributes"]
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_GET_TRACKS,
+        {ATTR_ENTITY_ID: MEDIA_PLAYER},
+        blocking=True,
+        return_response=True,
+    )
+    tracks = response[MEDIA_PLAYER]
+    assert tracks["armed_tracks"] == [f"Track {index}" for index in range(1, 41)]
+    assert len(tracks["tracks"]) == 51
+    assert tracks["tracks"][40] == {
+        "index": 40,
+        "key": "Track 40",
+        "name": "Track 40",
+        "volume": 0.0,
+        "pan": 0.0,
+        "mute": False,
+        "solo": False,
+        "record_arm": True,
+    }
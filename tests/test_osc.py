@@ -0,0 +1,216 @@
+"""Test OSC push updates of Reaper integration."""
+import asyncio
+from datetime import timedelta
+import socket
+import struct
+
+import async_timeout
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.reaper.const import (
+    CONF_HOSTNAME,
+    CONF_OSC_PORT,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_TRACK_ENTITIES,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+    PLAY_STATE_PLAYING,
+    PLAY_STATE_RECORDING,
+)
+from custom_components.reaper.osc import (
+    PUSH_LIVE_WINDOW,
+    apply_messages,
+    decode_packet,
+)
+from custom_components.reaper.polling import PUSH_SWEEP_INTERVAL
+from homeassistant.const import EVENT_STATE_CHANGED, STATE_ON, STATE_PLAYING
+from homeassistant.core import Event, HomeAssistant, callback
+import homeassistant.util.dt as dt_util
+
+from .emulator import PLAYING, osc_bundle, osc_message
+
+MEDIA_PLAYER = "media_player.127_0_0_1_reaper_transport"
+
+
+def test_decode_packet():
+    """Test that nested bundles are flattened and malformed packets rejected."""
+    packet = osc_bundle(
+        osc_message("/record", 1.0),
+        osc_bundle(osc_message("/track/1/name", "Piano"), osc_message("/click", True)),
+        osc_message("/track/2/volume/db", -6.0, 3),
+    )
+
+    assert decode_packet(packet) == [
+        ("/record", (1.0,)),
+        ("/track/1/name", ("Piano",)),
+        ("/click", (True,)),
+        ("/track/2/volume/db", (-6.0, 3)),
+    ]
+    for malformed in (packet[:-2], b"/play\0\0\0,x\0\0", b"play\0\0\0\0"):
+        with pytest.raises((ValueError, struct.error)):
+            decode_packet(malformed)
+
+
+async def test_apply_messages(hass: HomeAssistant, bypass_get_data):
+    """Test that messages are applied to a copy of the snapshot."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 8080,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    snapshot = hass.data[DOMAIN][entry.entry_id].data
+
+    pushed, resync = apply_messages(
+        snapshot,
+        [
+            ("/record", (1.0,)),
+            ("/play", (1.0,)),
+            ("/beat/str", ("7.3.50",)),
+            ("/track/1/recarm", (0.0,)),
+            ("/track/3/mute", (1.0,)),
+            ("/track/3/volume/db", (-6.0,)),
+            ("/track/99/mute", (1.0,)),
+            ("/unknown", ("ignored",)),
+        ],
+    )
+    assert not resync
+    assert pushed.play_state == pushed.transport.play_state == PLAY_STATE_RECORDING
+    assert pushed.beatpos.full_beat_position == 6 * 4 + 2.5
+    assert pushed.armed_tracks == ()
+    assert pushed.tracks[3].flags & 8
+    assert round(pushed.tracks[3].volume, 3) == 0.501
+    assert pushed.changed_keys(snapshot) >= {
+        "play_state",
+        "beatpos",
+        "armed_tracks",
+        "track/Drums/flags",
+        "track/Drums/volume",
+    }
+    assert "track/Bass/flags" not in pushed.changed_keys(snapshot)
+
+    # Nothing changes: the very same snapshot comes back
+    assert apply_messages(snapshot, [("/click", (1.0,))]) == (snapshot, False)
+
+    # A track name that differs from the table drops the track changes
+    pushed, resync = apply_messages(
+        snapshot, [("/track/1/name", ("Vocals",)), ("/track/1/mute", (1.0,))]
+    )
+    assert resync
+    assert pushed is snapshot
+
+
+async def test_push(hass: HomeAssistant, reaper_emulator):
+    """Test that pushed messages update only the affected entities, without polls."""
+    emulator = await reaper_emulator()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        osc_port = sock.getsockname()[1]
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "127.0.0.1",
+            CONF_PORT: emulator.port,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+        options={CONF_OSC_PORT: osc_port, CONF_TRACK_ENTITIES: True},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert not coordinator.pushed
+
+    written: list[str] = []
+
+    @callback
+    def state_changed(event: Event) -> None:
+        written.append(event.data["entity_id"])
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, state_changed)
+    sender, _ = await hass.loop.create_datagram_endpoint(
+        asyncio.DatagramProtocol, remote_addr=("127.0.0.1", osc_port)
+    )
+
+    async def push(*messages: bytes) -> None:
+        datagrams = coordinator.push.datagrams
+        written.clear()
+        sender.sendto(osc_bundle(*messages))
+        async with async_timeout.timeout(1):
+            while coordinator.push.datagrams == datagrams:
+                await asyncio.sleep(0.01)
+        await hass.async_block_till_done()
+
+    requests = emulator.requests
+    emulator.metronome = True
+    await push(osc_message("/click", 1.0))
+    assert hass.states.get("switch.metronome").state == STATE_ON
+    assert written == ["switch.metronome"]
+    assert coordinator.update_interval == timedelta(seconds=PUSH_SWEEP_INTERVAL)
+
+    emulator.play_state = PLAYING
+    await push(
+        osc_message("/stop", 0.0),
+        osc_message("/play", 1.0),
+        osc_message("/time", 12.5),
+        osc_message("/beat/str", "7.2.00"),
+    )
+    assert hass.states.get(MEDIA_PLAYER).state == STATE_PLAYING
+    assert set(written) == {MEDIA_PLAYER, "sensor.play_state"}
+
+    emulator.tracks[1].flags |= 64
+    await push(osc_message("/track/1/recarm", 1.0))
+    assert hass.states.get("switch.track_1_record_arm").state == STATE_ON
+    assert hass.states.get("sensor.number_of_armed_tracks").state == "1"
+    assert set(written) == {
+        "switch.track_1_record_arm",
+        "sensor.number_of_armed_tracks",
+    }
+
+    emulator.tracks[2].volume = 0.501187
+    await push(osc_message("/track/2/volume/db", -6.0))
+    assert hass.states.get("number.track_2_volume").state == "-6.0"
+    assert written == ["number.track_2_volume"]
+    assert emulator.requests == requests
+
+    # Packets from the host that cannot be decoded are dropped
+    sender.sendto(b"/play\0\0\0,x\0\0")
+    async with async_timeout.timeout(1):
+        while not coordinator.push.malformed:
+            await asyncio.sleep(0.01)
+
+    # A name that does not match the track table gets it refetched
+    emulator.tracks[2].name = "Vocals"
+    await push(osc_message("/track/2/name", "Vocals"))
+    assert emulator.requests > requests
+    assert coordinator.data.tracks[2].name == "Vocals"
+    assert hass.states.get("switch.track_1_record_arm").state == STATE_ON
+
+    # REAPER stops pushing: polls go back to the profile interval
+    sender.close()
+    assert coordinator.update_interval == timedelta(seconds=PUSH_SWEEP_INTERVAL)
+    coordinator.push.received_at -= PUSH_LIVE_WINDOW
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=PUSH_LIVE_WINDOW + 1)
+    )
+    await hass.async_block_till_done()
+    assert not coordinator.pushed
+    assert coordinator.update_interval == coordinator.polling.interval(
+        PLAY_STATE_PLAYING
+    )
+    assert coordinator.update_interval < timedelta(seconds=PUSH_SWEEP_INTERVAL)
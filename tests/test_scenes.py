@@ -0,0 +1,99 @@
+"""Test mixer scenes of Reaper integration."""
+from datetime import timedelta
+from time import perf_counter
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.reaper.const import (
+    CONF_HOSTNAME,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DOMAIN,
+    FLAG_MUTED,
+    FLAG_RECORD_ARMED,
+    SERVICE_CAPTURE_SCENE,
+    SERVICE_RECALL_SCENE,
+)
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_NAME
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.util.dt as dt_util
+
+MEDIA_PLAYER = "media_player.127_0_0_1_reaper_transport"
+
+
+async def test_capture_and_recall(hass: HomeAssistant, hass_storage, reaper_emulator):
+    """Test that a recall only sends the tracks that differ, in few requests."""
+    emulator = await reaper_emulator(tracks=300)
+    for index, track in enumerate(emulator.tracks[1:], 1):
+        track.volume = index / 300
+        track.pan = index % 3 - 1.0
+        if index % 2:
+            track.flags |= FLAG_MUTED
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "127.0.0.1",
+            CONF_PORT: emulator.port,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async def call(service: str, name: str) -> None:
+        await hass.services.async_call(
+            DOMAIN,
+            service,
+            {ATTR_ENTITY_ID: MEDIA_PLAYER, ATTR_NAME: name},
+            blocking=True,
+        )
+
+    requests = emulator.requests
+    await call(SERVICE_CAPTURE_SCENE, "Room")
+    assert emulator.requests == requests
+    scene = hass_storage[f"{DOMAIN}.{entry.entry_id}.scenes"]["data"]["scenes"]["Room"]
+    assert len(scene) == 301
+    assert scene["Track 3"] == [0.01, -1.0, True, False, False]
+
+    with pytest.raises(HomeAssistantError):
+        await call(SERVICE_RECALL_SCENE, "Studio")
+
+    # The mix is changed outside of Home Assistant, unseen by the polls
+    for track in emulator.tracks[1:101]:
+        track.volume = 1.0
+    emulator.tracks[7].flags = FLAG_RECORD_ARMED
+    emulator.tracks[8].pan = 0.25
+    emulator.commands.clear()
+    requests = emulator.requests
+
+    started = perf_counter()
+    await call(SERVICE_RECALL_SCENE, "Room")
+    assert perf_counter() - started < 0.5
+
+    # One track fetch to diff against, then as few command chains as fit
+    assert len(emulator.commands) == 100 + 2 + 1
+    assert emulator.requests - requests == 1 + 2
+    assert "SET/TRACK/7/MUTE/1" in emulator.commands
+    assert "SET/TRACK/7/RECARM/0" in emulator.commands
+    assert "SET/TRACK/8/PAN/1.000000" in emulator.commands
+    assert emulator.tracks[50].volume == pytest.approx(50 / 300, abs=1e-6)
+
+    # Nothing differs: nothing but the track fetch is sent
+    emulator.commands.clear()
+    await call(SERVICE_RECALL_SCENE, "Room")
+    assert emulator.commands == []
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    assert coordinator.data.tracks[7].flags == FLAG_MUTED
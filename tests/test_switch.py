@@ -1,17 +1,39 @@
-"""Test sensor of Reaper integration."""
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+"""Test switch of Reaper integration."""
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    load_fixture,
+)
 
+from custom_components.reaper.api import ReaperError
 from custom_components.reaper.const import (
+    CMD_STOP,
     CONF_HOSTNAME,
     CONF_PASSWORD,
     CONF_PORT,
     CONF_UPDATE_INTERVAL,
     CONF_USERNAME,
     DOMAIN,
+    PLAY_STATE_RECORDING,
+    PLAY_STATE_STOPPED,
+)
+from custom_components.reaper.models import parse_status
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    SERVICE_TURN_OFF,
+    SERVICE_TURN_ON,
+    STATE_OFF,
+    STATE_ON,
 )
-from homeassistant.const import STATE_OFF, STATE_ON
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_registry as er
+from homeassistant.util.dt import utcnow
 
 
 async def test_switch(hass: HomeAssistant, bypass_get_data):
@@ -64,3 +86,148 @@ async def test_switch(hass: HomeAssistant, bypass_get_data):
 
     assert entry
     assert entry.unique_id == "192.168.0.5-repeat"
+
+
+async def test_switch_optimistic(hass: HomeAssistant):
+    """Test that switches update optimistically and reconcile once."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 9999,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=parse_status(load_fixture("reaper_status_data.txt")),
+    ) as mock_status, patch(
+        "custom_components.reaper.ReaperClient.async_send_command", return_value=""
+    ) as mock_send:
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        fetches = mock_status.call_count
+
+        await hass.services.async_call(
+            SWITCH_DOMAIN,
+            SERVICE_TURN_OFF,
+            {ATTR_ENTITY_ID: "switch.metronome"},
+            blocking=True,
+        )
+
+        mock_send.assert_called_once_with("41746")
+        assert hass.states.get("switch.metronome").state == STATE_OFF
+
+        for service in (SERVICE_TURN_ON, SERVICE_TURN_OFF):
+            await hass.services.async_call(
+                SWITCH_DOMAIN,
+                service,
+                {ATTR_ENTITY_ID: ["switch.metronome", "switch.repeat"]},
+                blocking=True,
+            )
+
+        # Commands for both switches are chained into one request per call
+        assert [
+            sorted(call.args[0].split(";")) for call in mock_send.call_args_list[1:]
+        ] == [["41745", "SET/REPEAT/1"], ["41746", "SET/REPEAT/0"]]
+        assert hass.states.get("switch.repeat").state == STATE_OFF
+        assert mock_status.call_count == fetches
+
+        async_fire_time_changed(hass, utcnow() + timedelta(seconds=1))
+        await hass.async_block_till_done()
+
+        # REAPER still reports both switches on, so the optimistic state is
+        # rolled back by a single reconciliation refresh.
+        assert mock_status.call_count == fetches + 1
+        assert hass.states.get("switch.metronome").state == STATE_ON
+        assert hass.states.get("switch.repeat").state == STATE_ON
+
+
+async def test_switch_optimistic_before_send(hass: HomeAssistant):
+    """Test that optimistic state is shown while sending and rolled back on errors."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOSTNAME: "192.168.0.5",
+            CONF_PORT: 9999,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    stopped = parse_status(load_fixture("reaper_status_data.txt"))
+    sent: list[tuple[str, str]] = []
+    released = asyncio.Event()
+
+    async def send_command(command: str) -> str:
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        sent.append(
+            (hass.states.get("switch.recording").state, coordinator.data.play_state)
+        )
+        await released.wait()
+        if command == CMD_STOP:
+            raise ReaperError(500, "Internal Server Error")
+        return ""
+
+    with patch(
+        "custom_components.reaper.ReaperClient.async_get_status",
+        return_value=stopped,
+    ) as mock_status, patch(
+        "custom_components.reaper.ReaperClient.async_send_command",
+        side_effect=send_command,
+    ), patch(
+        "custom_components.reaper.ReaperClient.async_get_markers",
+        return_value=stopped.markers,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+
+        turn_on = hass.async_create_task(
+            hass.services.async_call(
+                SWITCH_DOMAIN,
+                SERVICE_TURN_ON,
+                {ATTR_ENTITY_ID: "switch.recording"},
+                blocking=True,
+            )
+        )
+        while not sent:
+            await asyncio.sleep(0)
+
+        # Shown before the command is answered, in the transport section too
+        assert sent == [(STATE_ON, PLAY_STATE_RECORDING)]
+        assert coordinator.data.transport.play_state == PLAY_STATE_RECORDING
+
+        # A fetch answered before REAPER ran the command keeps it
+        await coordinator.async_refresh()
+        assert mock_status.call_count == 2
+        assert hass.states.get("switch.recording").state == STATE_ON
+
+        released.set()
+        await turn_on
+        assert hass.states.get("switch.recording").state == STATE_ON
+
+        with pytest.raises(ReaperError):
+            await hass.services.async_call(
+                SWITCH_DOMAIN,
+                SERVICE_TURN_OFF,
+                {ATTR_ENTITY_ID: "switch.recording"},
+                blocking=True,
+            )
+
+        # The failed stop is rolled back to the recording that was shown
+        assert sent[-1] == (STATE_OFF, PLAY_STATE_STOPPED)
+        assert hass.states.get("switch.recording").state == STATE_ON
+        assert coordinator.data.transport.play_state == PLAY_STATE_RECORDING
+
+        async_fire_time_changed(hass, utcnow() + timedelta(seconds=1))
+        await hass.async_block_till_done()
+
+        # REAPER never started recording
+        assert hass.states.get("switch.recording").state == STATE_OFF
+        assert coordinator.data.transport.play_state == PLAY_STATE_STOPPED